@@ -0,0 +1,3 @@
+"""
+Offline, reproducible benchmarks for the retrieval pipeline.
+"""
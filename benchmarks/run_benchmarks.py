@@ -0,0 +1,224 @@
+"""
+Offline benchmark suite for the retrieval strategies.
+
+Everything runs against local stand-ins (HashingEmbedder, InMemoryGraphQuerier,
+FakeGenerativeModel, GazetteerExtractor), so results are reproducible and
+need neither Neo4j nor a Gemini key:
+
+    python -m benchmarks.run_benchmarks --scales 1 10 100
+    python -m benchmarks.run_benchmarks --update-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+from europe_kg_rag.generation import ContextAssembler, FakeGenerativeModel, build_answer_prompt
+from europe_kg_rag.graph import InMemoryGraphQuerier
+from europe_kg_rag.retrieval import (
+    STRATEGIES,
+    HashingEmbedder,
+    RetrievalBackends,
+    VectorRetriever,
+    run_strategy,
+)
+from europe_kg_rag.retrieval.fusion import reciprocal_rank_fusion
+
+from .synthetic import GazetteerExtractor, SyntheticWorld, build_world
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+# Latency/throughput ratios beyond this are reported as regressions.
+DEFAULT_TOLERANCE = 0.25
+
+
+def _percentile(samples: Sequence[float], q: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, round(q / 100.0 * (len(ordered) - 1)))]
+
+
+def _measure(
+    operation: Callable[[object], object],
+    inputs: Sequence[object],
+    memory_sample: int = 20,
+) -> Dict[str, float]:
+    latencies: List[float] = []
+    started = time.perf_counter()
+    for item in inputs:
+        call_started = time.perf_counter()
+        operation(item)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    # tracemalloc slows Python down a lot, so peak memory comes from a separate short pass.
+    tracemalloc.start()
+    for item in inputs[:memory_sample]:
+        operation(item)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "calls": len(inputs),
+        "throughput_per_s": len(inputs) / elapsed if elapsed else 0.0,
+        "mean_ms": statistics.fmean(latencies) * 1000.0 if latencies else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000.0,
+        "p95_ms": _percentile(latencies, 95) * 1000.0,
+        "p99_ms": _percentile(latencies, 99) * 1000.0,
+        "peak_memory_kb": peak / 1024.0,
+    }
+
+
+def benchmark_world(world: SyntheticWorld, workdir: Path) -> Dict[str, Dict[str, float]]:
+    corpus_path = workdir / f"corpus_{world.scale}.json"
+    corpus_path.write_text(json.dumps(world.corpus), encoding="utf-8")
+
+    build_started = time.perf_counter()
+    retriever = VectorRetriever(
+        model_name="hashing",
+        faiss_index_path=workdir / f"index_{world.scale}.faiss",
+        corpus_path=corpus_path,
+        embedder=HashingEmbedder(),
+    )
+    kg_querier = InMemoryGraphQuerier.from_dataset(world.dataset)
+    setup_seconds = time.perf_counter() - build_started
+
+    backends = RetrievalBackends(
+        kg_querier=kg_querier,
+        vector_retriever=retriever,
+        entity_extractor=GazetteerExtractor(),
+    )
+    assembler = ContextAssembler()
+    llm = FakeGenerativeModel()
+
+    results: Dict[str, Dict[str, float]] = {"setup": {"seconds": setup_seconds}}
+    for strategy in STRATEGIES:
+        def answer(question, strategy=strategy):
+            assembled = assembler.assemble_text(run_strategy(strategy, question, backends))
+            return llm.generate_content(build_answer_prompt(assembled.text, question)).text
+
+        results[f"strategy:{strategy}"] = _measure(answer, world.questions)
+
+    extractor = backends.entity_extractor
+    entities = [entity for question in world.questions for entity in extractor.extract_entities(question)]
+    results["component:vector_retrieve"] = _measure(lambda q: retriever.retrieve(q, k=5), world.questions)
+    results["component:vector_retrieve_batch16"] = _measure(
+        lambda chunk: retriever.retrieve_batch(chunk, k=5),
+        [world.questions[start:start + 16] for start in range(0, len(world.questions), 16)],
+    )
+    results["component:kg_neighbours"] = _measure(
+        lambda entity: kg_querier.query_neighbours_batch([entity]), entities
+    )
+    fusion_inputs = [
+        (
+            [f"[KG] fact {question} {rank}" for rank in range(20)],
+            [f"[TEXT] doc {question} {rank}" for rank in range(5)],
+        )
+        for question in world.questions
+    ]
+    results["component:fusion"] = _measure(
+        lambda lists: reciprocal_rank_fusion(list(lists), k=5), fusion_inputs
+    )
+    return results
+
+
+def compare_with_baseline(
+    results: Dict[str, Dict[str, Dict[str, float]]],
+    baseline: Dict[str, Dict[str, Dict[str, float]]],
+    tolerance: float,
+) -> List[str]:
+    """Return human-readable regression lines (empty when nothing regressed)."""
+    regressions: List[str] = []
+    for scale, cases in results.items():
+        for case, metrics in cases.items():
+            reference = baseline.get(scale, {}).get(case)
+            if not reference:
+                continue
+            for metric in ("p50_ms", "p95_ms"):
+                if reference.get(metric) and metrics[metric] > reference[metric] * (1 + tolerance):
+                    regressions.append(
+                        f"scale {scale} {case} {metric}: {metrics[metric]:.3f} vs baseline {reference[metric]:.3f}"
+                    )
+            floor = reference.get("throughput_per_s", 0.0) / (1 + tolerance)
+            if floor and metrics["throughput_per_s"] < floor:
+                regressions.append(
+                    f"scale {scale} {case} throughput: {metrics['throughput_per_s']:.1f}/s "
+                    f"vs baseline {reference['throughput_per_s']:.1f}/s"
+                )
+    return regressions
+
+
+def _print_report(results: Dict[str, Dict[str, Dict[str, float]]]) -> None:
+    for scale, cases in results.items():
+        print(f"\n=== scale x{scale} (setup {cases['setup']['seconds']:.2f}s) ===")
+        print(f"{'case':<36}{'ops/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'peak KB':>12}")
+        for case, metrics in cases.items():
+            if case == "setup":
+                continue
+            print(
+                f"{case:<36}{metrics['throughput_per_s']:>10.1f}{metrics['p50_ms']:>10.3f}"
+                f"{metrics['p95_ms']:>10.3f}{metrics['p99_ms']:>10.3f}{metrics['peak_memory_kb']:>12.1f}"
+            )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the offline retrieval benchmark suite.")
+    parser.add_argument(
+        "--scales", type=int, nargs="+", default=[1, 10, 100], help="Data multipliers (e.g. 10 100 1000)."
+    )
+    parser.add_argument("--questions", type=int, default=200, help="Questions per scale.")
+    parser.add_argument(
+        "--baseline", type=Path, default=DEFAULT_BASELINE, help="Baseline JSON to compare against."
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Overwrite the baseline with this run."
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown ratio before flagging."
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Also write this run's results as JSON.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in args.scales:
+            world = build_world(scale, questions=args.questions)
+            results[str(scale)] = benchmark_world(world, Path(tmp))
+
+    _print_report(results)
+    payload = {"python": platform.python_version(), "machine": platform.machine(), "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        print(f"\nBaseline written to {args.baseline}")
+        return
+    if not args.baseline.exists():
+        print(f"\nNo baseline at {args.baseline}; run with --update-baseline to create one.")
+        return
+
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("\nRegressions against baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        sys.exit(1)
+    print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Deterministic synthetic Europe-like worlds for offline benchmarks.
+
+Scale 1 roughly matches the shipped data (50 countries, ~540 rivers, ~80
+corpus documents); every other scale multiplies those counts.
+"""
+
+from __future__ import annotations
+
+import random
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+from europe_kg_rag.data.models import Country, GraphDataset, River
+
+BASE_COUNTRIES = 50
+BASE_RIVERS = 540
+BASE_DOCUMENTS = 80
+
+_ENTITY_PATTERN = re.compile(r"\b(?:Country|City|River)-\d+\b")
+
+_QUESTION_TEMPLATES = (
+    "What is the capital of {country} and can you describe it?",
+    "Which countries border {country}?",
+    "Tell me about the geography of {country}.",
+    "Which countries does {river} flow through?",
+    "Where does {river} end up?",
+)
+
+
+@dataclass(slots=True)
+class SyntheticWorld:
+    scale: int
+    dataset: GraphDataset
+    corpus: List[dict] = field(default_factory=list)
+    questions: List[str] = field(default_factory=list)
+
+
+class GazetteerExtractor:
+    """Stand-in for the spaCy extractor that recognises synthetic entity names."""
+
+    def extract_entities(self, text: str) -> List[str]:
+        if not text:
+            return []
+        return _ENTITY_PATTERN.findall(text)
+
+    def extract_entities_batch(self, texts, batch_size: int = 64) -> List[List[str]]:
+        return [self.extract_entities(text) for text in texts]
+
+
+def build_world(scale: int, questions: int = 200, seed: int = 13) -> SyntheticWorld:
+    rng = random.Random(seed)
+    country_count = BASE_COUNTRIES * scale
+    river_count = BASE_RIVERS * scale
+
+    countries = []
+    for idx in range(country_count):
+        neighbours = {f"Country-{rng.randrange(country_count)}" for _ in range(rng.randint(1, 6))}
+        neighbours.discard(f"Country-{idx}")
+        countries.append(
+            Country(
+                name=f"Country-{idx}",
+                capital=f"City-{idx}",
+                eu_member=rng.random() < 0.5,
+                borders_with=sorted(neighbours),
+            )
+        )
+
+    rivers = []
+    for idx in range(river_count):
+        # Roughly a third of rivers drain into a sea, the rest into an earlier river.
+        parent = f"River-{rng.randrange(idx)}" if idx and rng.random() < 0.66 else f"Sea-{idx % 40}"
+        rivers.append(
+            River(
+                name=f"River-{idx}",
+                length=float(rng.randint(100, 3000)),
+                basin=float(rng.randint(1_000, 800_000)),
+                parent=parent,
+                countries=[f"Country-{rng.randrange(country_count)}" for _ in range(rng.randint(1, 4))],
+            )
+        )
+
+    corpus = []
+    for idx in range(BASE_DOCUMENTS * scale):
+        country = countries[idx % country_count]
+        river = rivers[rng.randrange(river_count)]
+        corpus.append(
+            {
+                "id": country.name if idx < country_count else f"{country.name}#{idx}",
+                "text": (
+                    f"{country.name} is a country in Europe whose capital is {country.capital}. "
+                    f"It borders {', '.join(country.borders_with) or 'no other country'}. "
+                    f"{river.name} is {int(river.length)} km long and drains into {river.parent}."
+                ),
+            }
+        )
+
+    question_list = [
+        rng.choice(_QUESTION_TEMPLATES).format(
+            country=f"Country-{rng.randrange(country_count)}",
+            river=f"River-{rng.randrange(river_count)}",
+        )
+        for _ in range(questions)
+    ]
+    return SyntheticWorld(
+        scale=scale,
+        dataset=GraphDataset(countries=countries, rivers=rivers),
+        corpus=corpus,
+        questions=question_list,
+    )
@@ -0,0 +1,180 @@
+"""
+Rebuild the data pipeline, skipping stages whose inputs and outputs are unchanged:
+
+    python build_data.py                 # every offline stage
+    python build_data.py cities          # one stage plus whatever it depends on
+    python build_data.py index --dry-run # show what a corpus + FAISS rebuild would run
+
+Stages that need the network, Neo4j or the embedding API (``graph``, ``corpus``,
+``index``) only run when named or with ``--all``.
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from config import (
+    BUILD_MANIFEST_PATH,
+    BUILD_MAX_WORKERS,
+    CORPUS_PATH,
+    COUNTRY_ATTRIBUTES_PATH,
+    EMBEDDING_MODEL,
+    FAISS_INDEX_PATH,
+    GRAPH_SOURCE_PATH,
+)
+from europe_kg_rag.data import BuildPipeline, Stage, StageResult
+
+PYTHON = sys.executable
+RAW_COUNTRIES = "data/raw_data/europe_countries.json"
+RAW_RIVERS = "data/raw_data/europe_rivers.json"
+RAW_MOUNTAINS = "data/raw_data/europe_mountains.json"
+CRAWLED_POPULATION = "data/crawled_data/total-population-by-country-2025.json"
+CRAWLED_CITIES = "data/crawled_data/europe-cities-by-population-2025.json"
+RIVERS_CSV = "data/crawled_data/rivers/list_of_rivers_of_europe.csv"
+RIVERS_JSON = "data/crawled_data/rivers/list_of_rivers_of_europe.json"
+COUNTRY_CODES = "data/crawled_data/mapping_country_name.txt"
+ENTITIES = "data/database/entities"
+RELATIONS = "data/database/relations"
+
+
+def _build_vector_index() -> None:
+    # Imported in the worker: the embedding client is only needed for this stage.
+    from europe_kg_rag.retrieval import VectorRetriever
+
+    # Rebuilds only when the index's digest sidecar no longer matches the corpus.
+    VectorRetriever(model_name=EMBEDDING_MODEL, faiss_index_path=FAISS_INDEX_PATH, corpus_path=CORPUS_PATH)
+
+
+def _normalize(part: str, outputs: list) -> Stage:
+    return Stage(
+        name=part,
+        action=[PYTHON, "data/normalize_data.py", "--parts", part],
+        inputs=["data/normalize_data.py", RAW_COUNTRIES, CRAWLED_POPULATION]
+        + {"rivers": [RAW_RIVERS], "cities": [CRAWLED_CITIES]}.get(part, []),
+        outputs=outputs,
+        description=f"Normalize {part} into database entities and relations",
+    )
+
+
+def build_stages() -> list:
+    passages = "passages" in Path(CORPUS_PATH).stem
+    return [
+        Stage(
+            name="rivers_csv",
+            action=[PYTHON, "data/process_rivers_csv.py", "--input", RIVERS_CSV, "--output", RIVERS_JSON],
+            inputs=["data/process_rivers_csv.py", RIVERS_CSV],
+            outputs=[RIVERS_JSON],
+            description="Parse the exported Wikipedia rivers table",
+        ),
+        Stage(
+            name="rivers_countries",
+            action=[PYTHON, "data/processing_data_rivers.py", "--input", RIVERS_JSON, "--output", RAW_RIVERS],
+            inputs=["data/processing_data_rivers.py", RIVERS_JSON, COUNTRY_CODES, RAW_COUNTRIES],
+            outputs=[RAW_RIVERS],
+            description="Map river country codes to country names",
+        ),
+        _normalize("countries", [f"{ENTITIES}/europe_countries.json", f"{RELATIONS}/BORDERS_WITH.json"]),
+        _normalize(
+            "rivers",
+            [
+                f"{ENTITIES}/europe_rivers.json",
+                f"{ENTITIES}/europe_sea.json",
+                f"{RELATIONS}/TRIBUTARY_OF.json",
+            ],
+        ),
+        _normalize(
+            "cities",
+            [
+                f"{ENTITIES}/europe_cities.json",
+                f"{RELATIONS}/LOCATED_IN.json",
+                f"{RELATIONS}/CAPITAL_OF.json",
+            ],
+        ),
+        Stage(
+            name="mountains",
+            action=[
+                PYTHON,
+                "data/processing_data_mountains.py",
+                "--input-json",
+                RAW_MOUNTAINS,
+                "--output",
+                f"{ENTITIES}/europe_mountains.json",
+            ],
+            inputs=["data/processing_data_mountains.py", RAW_MOUNTAINS, f"{ENTITIES}/europe_countries.json"],
+            outputs=[f"{ENTITIES}/europe_mountains.json", f"{RELATIONS}/LOCATED_IN_1.json"],
+            description="Normalize mountains and link them to countries",
+        ),
+        Stage(
+            name="graph",
+            action=[PYTHON, "setup_neo4j_kg.py"],
+            inputs=[
+                "setup_neo4j_kg.py",
+                f"{GRAPH_SOURCE_PATH}/europe_countries.json",
+                f"{GRAPH_SOURCE_PATH}/europe_rivers.json",
+                COUNTRY_ATTRIBUTES_PATH,
+            ],
+            optional=True,
+            description="Rebuild the Neo4j knowledge graph",
+        ),
+        Stage(
+            name="corpus",
+            action=[PYTHON, "data/fetch_corpus.py", "--source", RAW_COUNTRIES, "--output", CORPUS_PATH]
+            + (["--passages"] if passages else []),
+            inputs=[
+                "data/fetch_corpus.py",
+                RAW_COUNTRIES,
+                RAW_RIVERS,
+                f"{ENTITIES}/europe_cities.json",
+                f"{ENTITIES}/europe_mountains.json",
+            ],
+            outputs=[CORPUS_PATH],
+            optional=True,
+            description="Fetch the Wikipedia text corpus",
+        ),
+        Stage(
+            name="index",
+            action=_build_vector_index,
+            inputs=[CORPUS_PATH],
+            outputs=[FAISS_INDEX_PATH],
+            optional=True,
+            description="Embed the corpus and write the FAISS index",
+        ),
+    ]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Incremental, parallel data build.")
+    parser.add_argument("targets", nargs="*", help="Stages to build (default: all offline stages).")
+    parser.add_argument("--all", action="store_true", help="Include graph, corpus and index stages.")
+    parser.add_argument("--force", action="store_true", help="Rebuild the named stages (default: all) even if up to date.")
+    parser.add_argument("--dry-run", action="store_true", help="Only report which stages would run.")
+    parser.add_argument("--workers", type=int, default=BUILD_MAX_WORKERS, help="Parallel worker processes.")
+    parser.add_argument("--list", action="store_true", help="List stages and their dependencies.")
+    return parser.parse_args()
+
+
+def _print_result(result: StageResult) -> None:
+    timing = f" in {result.seconds:.2f}s" if result.seconds else ""
+    reason = f" ({result.reason})" if result.reason else ""
+    print(f"[{result.status:>10}] {result.name}{reason}{timing}", flush=True)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    pipeline = BuildPipeline(build_stages(), manifest_path=BUILD_MANIFEST_PATH, max_workers=args.workers)
+    if args.list:
+        for name in pipeline.order:
+            stage = pipeline.stages[name]
+            depends = ", ".join(sorted(pipeline.dependencies[name])) or "-"
+            flag = " (optional)" if stage.optional else ""
+            print(f"{name}{flag}: {stage.description} [after: {depends}]")
+        sys.exit(0)
+
+    report = pipeline.run(
+        args.targets,
+        include_optional=args.all,
+        force=args.force,
+        dry_run=args.dry_run,
+        on_result=_print_result,
+    )
+    sys.exit(0 if report.ok else 1)
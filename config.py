@@ -8,4 +8,85 @@ GEMINI_API_KEY = ""
 
 # Vector Database Settings
 EMBEDDING_MODEL = "gemini-embedding-001"
-FAISS_INDEX_PATH = "data/vector_db.faiss"
\ No newline at end of file
+# Point at data/text_passages.json (python data/fetch_corpus.py --passages) for chunked
+# full articles; the index is rebuilt automatically when the corpus contents change.
+CORPUS_PATH = "data/text_corpus.json"
+# One index per corpus, next to it (data/text_corpus.faiss plus its .digest sidecar)
+FAISS_INDEX_PATH = CORPUS_PATH.rsplit(".", 1)[0] + ".faiss"
+COLLAPSE_PASSAGES_PER_ENTITY = True
+
+# Wikipedia corpus fetcher (data/fetch_corpus.py): MediaWiki endpoint, politeness and page cache
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+WIKIPEDIA_RATE_PER_SECOND = 5.0
+WIKIPEDIA_MAX_CONCURRENCY = 4
+WIKIPEDIA_CACHE_PATH = "data/cache/wikipedia_pages.sqlite"
+
+# Geospatial city index for proximity questions ("cities within 200 km of Basel");
+# set to None to disable
+GEO_DATABASE_PATH = "data/database"
+
+# Source data for the Neo4j graph (countries with capitals/borders, rivers with countries)
+GRAPH_SOURCE_PATH = "data/raw_data"
+
+# Columnar attribute store for ranking/aggregate questions ("top 5 most populous EU members") and the
+# river-network index for tributary/outlet/basin questions: graph source data joined with normalized
+# country attributes; set ATTRIBUTE_SOURCE_PATH to None to disable
+ATTRIBUTE_SOURCE_PATH = GRAPH_SOURCE_PATH
+COUNTRY_ATTRIBUTES_PATH = "data/database/entities/europe_countries.json"
+# Binary snapshot of the cleaned GraphDataset, memory-mapped on later loads while the sources are unchanged
+DATASET_SNAPSHOT_PATH = "data/cache/graph_dataset.snap"
+
+# Published artifact versions (corpus, FAISS index, graph snapshot) written by publish_version.py; a serving
+# process polls the active version and swaps to it without a restart. Set to None to serve the paths above
+ARTIFACT_STORE_PATH = "data/versions"
+ARTIFACT_KEEP_VERSIONS = 3
+ARTIFACT_CHECK_INTERVAL_SECONDS = 30
+
+# Generation Settings
+CONTEXT_TOKEN_BUDGET = 2048
+MAX_PASSAGE_TOKENS = 256
+
+# LLM response cache (set LLM_CACHE_TTL_SECONDS to None to keep entries forever)
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = "data/cache/llm_responses.sqlite"
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 3600
+
+# Experiment runner concurrency (per-backend caps on in-flight calls)
+EXPERIMENT_MAX_WORKERS = 8
+GEMINI_MAX_CONCURRENCY = 4
+EMBEDDING_MAX_CONCURRENCY = 8
+NEO4J_MAX_CONCURRENCY = 8
+
+# Tracing (also enabled by EUROPE_KG_RAG_TRACING=1); spans go to a JSON-lines log
+TRACE_LOG_PATH = "data/traces/spans.jsonl"
+METRICS_PORT = 9464
+
+# Retrieval evaluation: labelled questions, embedding cache and FAISS index
+# configurations to compare (name -> (index factory string, search parameters))
+EVAL_QUESTIONS_PATH = "data/eval/questions.jsonl"
+EMBEDDING_CACHE_PATH = "data/cache/embeddings.sqlite"
+# Query embeddings from concurrent threads are coalesced into one API call per window
+EMBEDDING_BATCH_WINDOW_MS = 5
+EMBEDDING_MAX_BATCH_SIZE = 32
+EVAL_INDEX_CONFIGS = {
+    "flat": ("Flat", None),
+    "hnsw32-ef16": ("HNSW32", "efSearch=16"),
+    "hnsw32-ef64": ("HNSW32", "efSearch=64"),
+}
+
+# HTTP query service (python main.py --serve)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_BATCH_WINDOW_MS = 5
+SERVICE_MAX_BATCH_SIZE = 16
+SERVICE_MAX_PENDING = 256
+SERVICE_REQUEST_TIMEOUT_SECONDS = 30
+
+# Semantic cache: reuse context/answers for near-duplicate questions (cosine similarity)
+SEMANTIC_CACHE_ENABLED = True
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_ENTRIES = 1024
+
+# Data build pipeline (python build_data.py): stage fingerprints and parallel workers
+BUILD_MANIFEST_PATH = "data/cache/build_manifest.json"
+BUILD_MAX_WORKERS = 4
@@ -1,14 +1,22 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
+import os
 import re
+import sys
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 from urllib.parse import urlparse
 
 import pandas as pd
 import requests
 from lxml import html
+from pandas.io.parsers import TextParser
+from requests.adapters import HTTPAdapter
 
 DEFAULT_HEADERS: Dict[str, str] = {
     "User-Agent": (
@@ -17,6 +25,11 @@ DEFAULT_HEADERS: Dict[str, str] = {
         "Chrome/124.0.0.0 Safari/537.36"
     )
 }
+DEFAULT_CACHE_DIR = "data/cache/wikipedia_tables"
+FORMATS = ("csv", "parquet")
+
+# Same whitespace folding as pandas.read_html, so the CSV output keeps its previous shape.
+_RE_WHITESPACE = re.compile(r"[\r\n]+|\s{2,}")
 
 
 def _slugify(text: str) -> str:
@@ -25,24 +38,91 @@ def _slugify(text: str) -> str:
     return cleaned.strip("_")
 
 
+def _cell_text(cell) -> str:
+    return _RE_WHITESPACE.sub(" ", cell.text_content()).strip()
+
+
+def _expand_spans(rows: list, remainder: Optional[list] = None, overflow: bool = True) -> Tuple[list, list]:
+    """Text rows of ``rows`` (``<tr>`` elements), copying rowspan/colspan cells into the cells they cover."""
+    texts_by_row = []
+    remainder = remainder or []
+    for row in rows:
+        texts, next_remainder, index = [], [], 0
+        for cell in row.xpath("./td|./th"):
+            while remainder and remainder[0][0] <= index:
+                prev_index, prev_text, prev_rowspan = remainder.pop(0)
+                texts.append(prev_text)
+                if prev_rowspan > 1:
+                    next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+                index += 1
+            text = _cell_text(cell)
+            rowspan = int(cell.get("rowspan") or 1)
+            colspan = int(cell.get("colspan") or 1)
+            for _ in range(colspan):
+                texts.append(text)
+                if rowspan > 1:
+                    next_remainder.append((index, text, rowspan - 1))
+                index += 1
+        for prev_index, prev_text, prev_rowspan in remainder:
+            texts.append(prev_text)
+            if prev_rowspan > 1:
+                next_remainder.append((prev_index, prev_text, prev_rowspan - 1))
+        texts_by_row.append(texts)
+        remainder = next_remainder
+
+    while not overflow and remainder:
+        texts_by_row.append([text for _, text, _ in remainder])
+        remainder = [(index, text, span - 1) for index, text, span in remainder if span > 1]
+    return texts_by_row, remainder
+
+
+def _table_to_frame(table) -> Optional[pd.DataFrame]:
+    """DataFrame for one ``<table>`` element of an already-parsed document (``read_html`` semantics)."""
+    head_rows = [row for thead in table.xpath(".//thead") for row in thead.xpath("./tr")]
+    body_rows = table.xpath(".//tbody//tr") + table.xpath("./tr")
+    foot_rows = table.xpath(".//tfoot//tr")
+    if not head_rows:
+        while body_rows and all(cell.tag == "th" for cell in body_rows[0].xpath("./td|./th")):
+            head_rows.append(body_rows.pop(0))
+
+    head, remainder = _expand_spans(head_rows)
+    body, remainder = _expand_spans(body_rows, remainder, overflow=bool(foot_rows))
+    foot, _ = _expand_spans(foot_rows, remainder, overflow=False)
+    rows = head + body + foot
+    if not body or not any(rows):
+        return None
+
+    header = None
+    if head:
+        header = 0 if len(head) == 1 else [i for i, row in enumerate(head) if any(row)]
+    width = max(len(row) for row in rows)
+    rows = [row + [""] * (width - len(row)) for row in rows]
+    with TextParser(rows, header=header, thousands=",") as parser:
+        dataframe = parser.read()
+    return None if dataframe.empty else dataframe
+
+
 def _extract_tables(html_content: str) -> List[Tuple[pd.DataFrame, str]]:
-    """Extract tables and optional captions from raw HTML."""
+    """Extract tables and optional captions from raw HTML, parsing the document once."""
     document = html.fromstring(html_content)
+    for element in document.xpath("//br"):
+        element.tail = "\n" + (element.tail or "")
+    for element in document.xpath("//table//style"):
+        element.drop_tree()
+    for element in document.xpath("//table//*[@style]"):
+        if "display:none" in element.get("style", "").replace(" ", ""):
+            element.drop_tree()
+
     tables: List[Tuple[pd.DataFrame, str]] = []
     for table_element in document.xpath("//table[.//tr]"):
         caption_nodes = table_element.xpath(".//caption")
         caption_text = caption_nodes[0].text_content().strip() if caption_nodes else ""
-
-        table_html = html.tostring(table_element, encoding="unicode")
         try:
-            dataframe = pd.read_html(table_html)[0]
-        except (ValueError, ImportError):
+            dataframe = _table_to_frame(table_element)
+        except (ValueError, pd.errors.ParserError):
             continue
-
-        if dataframe.empty:
-            continue
-
-        tables.append((dataframe, caption_text))
+        if dataframe is not None:
+            tables.append((dataframe, caption_text))
     return tables
 
 
@@ -61,60 +141,226 @@ def _build_filename(base_slug: str, caption: str, index: int, used_names: Set[st
     return unique_name
 
 
-def export_wikipedia_tables(url: str, output_dir: str = "data/wikipedia_tables") -> List[Path]:
-    """
-    Download all tables from a Wikipedia page and export them as CSV files.
+def _write_parquet(dataframe: pd.DataFrame, path: Path) -> None:
+    # Text columns may mix numbers and markers ("—", footnotes); store them as strings so they type cleanly.
+    text_columns = dataframe.columns[dataframe.dtypes == object]
+    dataframe.astype({column: "string" for column in text_columns}).to_parquet(path, index=False)
 
-    Returns a list of Paths to the generated CSV files.
-    """
-    response = requests.get(url, timeout=20, headers=DEFAULT_HEADERS)
-    response.raise_for_status()
 
-    tables = _extract_tables(response.text)
+def _export_document(html_content: str, base_slug: str, output_dir: str, formats: Sequence[str]) -> List[str]:
+    """Process-pool worker: parse one page and write every table in each requested format."""
+    tables = _extract_tables(html_content)
     if not tables:
         raise ValueError("No tables were found on the provided page.")
 
     output_path = Path(output_dir)
     output_path.mkdir(parents=True, exist_ok=True)
-
-    base_slug = _slugify(urlparse(url).path.rsplit("/", 1)[-1])
-    exported_paths: List[Path] = []
+    exported_paths: List[str] = []
     used_names: Set[str] = set()
-
     for index, (dataframe, caption) in enumerate(tables, start=1):
         filename = _build_filename(base_slug, caption, index, used_names)
         used_names.add(filename)
+        if "csv" in formats:
+            csv_path = output_path / f"{filename}.csv"
+            dataframe.to_csv(csv_path, index=False)
+            exported_paths.append(str(csv_path))
+        if "parquet" in formats:
+            parquet_path = output_path / f"{filename}.parquet"
+            _write_parquet(dataframe, parquet_path)
+            exported_paths.append(str(parquet_path))
+    return exported_paths
 
-        csv_path = output_path / f"{filename}.csv"
-        dataframe.to_csv(csv_path, index=False)
-        exported_paths.append(csv_path)
 
-    return exported_paths
+class PageCache:
+    """Disk cache of page bodies with their ``ETag``/``Last-Modified`` validators and last export."""
+
+    def __init__(self, cache_dir: str | Path = DEFAULT_CACHE_DIR) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, url: str) -> Tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+        return self.cache_dir / f"{key}.html", self.cache_dir / f"{key}.json"
+
+    def load(self, url: str) -> Tuple[Optional[str], dict]:
+        body_path, meta_path = self._paths(url)
+        if not (body_path.exists() and meta_path.exists()):
+            return None, {}
+        with meta_path.open(encoding="utf-8") as handle:
+            meta = json.load(handle)
+        return body_path.read_text(encoding="utf-8"), meta
+
+    def store(self, url: str, body: Optional[str], meta: dict) -> None:
+        body_path, meta_path = self._paths(url)
+        if body is not None:
+            _atomic_write(body_path, body)
+        _atomic_write(meta_path, json.dumps({**meta, "url": url}, indent=2))
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    temporary.write_text(text, encoding="utf-8")
+    os.replace(temporary, path)
+
+
+@dataclass(slots=True)
+class PageExport:
+    url: str
+    status: str = "failed"  # "exported", "unchanged" (304 with outputs in place) or "failed"
+    not_modified: bool = False
+    paths: List[Path] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+class TableExporter:
+    """Export the tables of many pages: pooled conditional GETs in threads, table extraction in processes."""
+
+    def __init__(
+        self,
+        output_dir: str = "data/wikipedia_tables",
+        formats: Sequence[str] = FORMATS,
+        cache_dir: str | Path | None = DEFAULT_CACHE_DIR,
+        max_workers: int = 4,
+        timeout: float = 20.0,
+    ) -> None:
+        self.output_dir = output_dir
+        self.formats = [fmt for fmt in FORMATS if fmt in formats]
+        self.cache = PageCache(cache_dir) if cache_dir else None
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        adapter = HTTPAdapter(pool_connections=self.max_workers, pool_maxsize=self.max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, url: str) -> Tuple[str, bool, dict]:
+        """Page body, whether the server answered 304, and the cache metadata (validators, last export)."""
+        cached_body, meta = self.cache.load(url) if self.cache else (None, {})
+        headers = {}
+        if cached_body is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        response = self.session.get(url, timeout=self.timeout, headers=headers)
+        if response.status_code == 304 and cached_body is not None:
+            return cached_body, True, meta
+        response.raise_for_status()
+        if "charset" not in response.headers.get("Content-Type", ""):
+            response.encoding = "utf-8"  # requests would otherwise assume ISO-8859-1 for text/html
+        meta = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+        }
+        if self.cache:
+            self.cache.store(url, response.text, meta)
+        return response.text, False, meta
+
+    def _up_to_date(self, meta: dict) -> bool:
+        export = meta.get("export") or {}
+        return (
+            export.get("output_dir") == self.output_dir
+            and export.get("formats") == self.formats
+            and bool(export.get("paths"))
+            and all(Path(path).exists() for path in export["paths"])
+        )
+
+    def export(self, urls: Sequence[str]) -> List[PageExport]:
+        results = {url: PageExport(url=url) for url in dict.fromkeys(urls)}
+        metas: Dict[str, dict] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as fetchers, ProcessPoolExecutor(
+            max_workers=self.max_workers
+        ) as parsers:
+            fetches = {fetchers.submit(self.fetch, url): url for url in results}
+            extractions: Dict[Future, str] = {}
+            for future in as_completed(fetches):
+                url = fetches[future]
+                try:
+                    body, not_modified, metas[url] = future.result()
+                except requests.RequestException as exc:
+                    results[url].error = f"{type(exc).__name__}: {exc}"
+                    continue
+                results[url].not_modified = not_modified
+                if not_modified and self._up_to_date(metas[url]):
+                    results[url].status = "unchanged"
+                    results[url].paths = [Path(path) for path in metas[url]["export"]["paths"]]
+                    continue
+                base_slug = _slugify(urlparse(url).path.rsplit("/", 1)[-1])
+                task = parsers.submit(_export_document, body, base_slug, self.output_dir, self.formats)
+                extractions[task] = url
+
+            for future in as_completed(extractions):
+                url = extractions[future]
+                try:
+                    paths = future.result()
+                except Exception as exc:
+                    results[url].error = f"{type(exc).__name__}: {exc}"
+                    continue
+                results[url].status = "exported"
+                results[url].paths = [Path(path) for path in paths]
+                if self.cache:
+                    export = {"output_dir": self.output_dir, "formats": self.formats, "paths": paths}
+                    self.cache.store(url, None, {**metas[url], "export": export})
+        return list(results.values())
+
+
+def export_wikipedia_tables(
+    urls: str | Sequence[str],
+    output_dir: str = "data/wikipedia_tables",
+    formats: Sequence[str] = FORMATS,
+    cache_dir: str | Path | None = DEFAULT_CACHE_DIR,
+    max_workers: int = 4,
+) -> List[PageExport]:
+    """
+    Download all tables from one or more Wikipedia pages and export them as CSV and Parquet files.
+
+    Unchanged pages (HTTP 304 against the cached validators) are not re-parsed when their
+    previous exports are still on disk.
+    """
+    if isinstance(urls, str):
+        urls = [urls]
+    return TableExporter(output_dir, formats, cache_dir, max_workers).export(urls)
 
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
-        description="Export Wikipedia tables to CSV files."
+        description="Export Wikipedia tables to CSV and Parquet files."
     )
-    parser.add_argument("url", help="URL of the Wikipedia page to export.")
+    parser.add_argument("urls", nargs="+", help="URLs of the Wikipedia pages to export.")
     parser.add_argument(
         "-o",
         "--output-dir",
         default="data/wikipedia_tables",
-        help="Directory where CSV files will be stored (created if missing).",
+        help="Directory where table files will be stored (created if missing).",
     )
+    parser.add_argument(
+        "--formats", nargs="+", choices=FORMATS, default=list(FORMATS), help="Output formats per table."
+    )
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Conditional-GET page cache.")
+    parser.add_argument("--no-cache", action="store_true", help="Always download and re-export every page.")
+    parser.add_argument("--workers", type=int, default=4, help="Parallel downloads and parser processes.")
     return parser.parse_args()
 
 
 def main() -> None:
     args = _parse_args()
-    try:
-        exported_paths = export_wikipedia_tables(args.url, args.output_dir)
-    except Exception as exc:  # pragma: no cover - CLI surface for clarity
-        raise SystemExit(f"Error: {exc}")
-
-    for path in exported_paths:
-        print(path)
+    results = export_wikipedia_tables(
+        args.urls,
+        args.output_dir,
+        formats=args.formats,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        max_workers=args.workers,
+    )
+    for result in results:
+        if result.error:
+            print(f"Error: {result.url}: {result.error}", file=sys.stderr)
+            continue
+        print(f"{result.url}: {result.status}")
+        for path in result.paths:
+            print(f"  {path}")
+    if any(result.error for result in results):
+        raise SystemExit(1)
 
 
 if __name__ == "__main__":
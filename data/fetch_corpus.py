@@ -2,54 +2,142 @@
 # Author: Felix Do
 # Data: 2025-10-12
 
+import argparse
 import json
-import wikipediaapi
-import time
+import os
+import sys
 
-def create_text_corpus():
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import (
+    WIKIPEDIA_API_URL,
+    WIKIPEDIA_CACHE_PATH,
+    WIKIPEDIA_MAX_CONCURRENCY,
+    WIKIPEDIA_RATE_PER_SECOND,
+)
+from europe_kg_rag.data.wikipedia import CorpusBuilder, PageCache, WikipediaFetcher
+from europe_kg_rag.retrieval.chunking import chunk_document
+
+ENTITY_TYPES = ("countries", "capitals", "rivers", "cities", "mountains")
+RIVERS_PATH = "data/raw_data/europe_rivers.json"
+CITIES_PATH = "data/database/entities/europe_cities.json"
+MOUNTAINS_PATH = "data/database/entities/europe_mountains.json"
+
+
+def _names(path, key, field="name"):
     try:
-        with open("data/europe_data.json", "r") as file:
-            europe_data = json.load(file)
+        with open(path, "r") as file:
+            return [item[field] for item in json.load(file)[key] if item.get(field)]
     except FileNotFoundError:
-        print("Error: europe_data.json not found.")
-        return
+        print(f"Error: {path} not found.")
+        return []
+
+
+def load_entities(source_path, types=ENTITY_TYPES):
+    """Page titles for the requested entity types, de-duplicated in a stable order."""
+    entities = []
+    if "countries" in types:
+        entities.extend(_names(source_path, "countries"))
+    if "capitals" in types:
+        entities.extend(_names(source_path, "countries", "capital"))
+    if "rivers" in types:
+        # River chains are named mouth-first ("Elbe <- Vltava <- Teplá Vltava"); the article is the first.
+        entities.extend(name.split(" <- ")[0].strip() for name in _names(RIVERS_PATH, "rivers"))
+    if "cities" in types:
+        entities.extend(_names(CITIES_PATH, "cities"))
+    if "mountains" in types:
+        entities.extend(_names(MOUNTAINS_PATH, "mountains"))
+    return list(dict.fromkeys(entity for entity in entities if entity))
+
+
+def summary_records(entity_name, page):
+    summary = page.summary.split('.')
+    return [{"id": entity_name, "text": '.'.join(summary[:3]) + '.'}]
 
-    wiki = wikipediaapi.Wikipedia(language='en', user_agent='MyCoolAIResearch/1.0 (phongdntvn@gmail.com)')
 
-    corpus = []
-    entities = set()
+def passage_records(entity_name, page, max_tokens=128, overlap_tokens=32):
+    body = page.text[len(page.summary):] if page.text.startswith(page.summary) else page.text
+    return chunk_document(
+        entity_name,
+        body,
+        summary=page.summary,
+        max_tokens=max_tokens,
+        overlap_tokens=overlap_tokens,
+    )
 
-    for country in europe_data["countries"]:
-        entities.add(country["name"])
-        entities.add(country['capital'])
 
+def _fetcher(args):
+    return WikipediaFetcher(
+        api_url=args.api_url,
+        rate_per_second=args.rate,
+        max_concurrency=args.concurrency,
+        cache=PageCache(args.cache) if args.cache else None,
+    )
+
+
+def _build(args, entities, output_path, make_records, full):
     print(f"Found {len(entities)} entities.")
+    fetcher = _fetcher(args)
+
+    def on_page(page, records):
+        if not page.exists:
+            print(f"Entity {page.title} not found on Wikipedia.")
+        elif full:
+            print(f"{page.title}: {records} passages")
+
+    report = CorpusBuilder(fetcher, make_records, full=full).build(entities, output_path, on_page=on_page)
+    print(
+        f"Fetched {report.fetched}, cached {report.cached}, resumed {report.resumed}, "
+        f"missing {len(report.missing)}, failed {len(report.failed)} "
+        f"({fetcher.requests_sent} requests, {fetcher.retries} retries)."
+    )
+    if not report.complete:
+        print(f"Failed: {', '.join(report.failed)}. Re-run the same command to resume.")
+        return False
+    print(f"Corpus ({report.written} records) saved to {output_path}")
+    return True
+
+
+def create_text_corpus(args, output_path="data/text_corpus.json"):
+    entities = load_entities(args.source, args.types)
+    return _build(args, entities, output_path, summary_records, full=False)
+
+
+def create_passage_corpus(args, output_path="data/text_passages.json"):
+    """Fetch full articles and store the summary plus overlapping body passages per entity."""
+    entities = load_entities(args.source, args.types)
 
-    for i, entity_name in enumerate(entities):
-        if not entity_name:
-            continue
-        page = wiki.page(entity_name)
-        if page.exists():
-            summary = page.summary.split('.')
-            short_summary = '.'.join(summary[:3]) + '.'
+    def make_records(entity_name, page):
+        return passage_records(entity_name, page, args.max_tokens, args.overlap_tokens)
 
-            corpus.append({
-                "id": entity_name,
-                "text": short_summary
-            })
-        else:
-            print(f"Entity {entity_name} not found on Wikipedia.")
+    return _build(args, entities, output_path, make_records, full=True)
 
-        time.sleep(1)
 
-    output_path = "data/text_corpus.json"
-    with open(output_path, "w") as file:
-        json.dump(corpus, file, indent=4, ensure_ascii=False)
-    
-    print(f"Text corpus saved to {output_path}")
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Build the Wikipedia text corpus.")
+    parser.add_argument("--source", default="data/europe_data.json", help="Countries JSON with name/capital.")
+    parser.add_argument(
+        "--passages",
+        action="store_true",
+        help="Fetch full articles and split them into overlapping passages instead of 3-sentence summaries.",
+    )
+    parser.add_argument("--output", default=None, help="Output path (defaults per mode).")
+    parser.add_argument("--max-tokens", type=int, default=128, help="Passage size in estimated tokens.")
+    parser.add_argument("--overlap-tokens", type=int, default=32, help="Overlap between passages.")
+    parser.add_argument(
+        "--types", nargs="+", choices=ENTITY_TYPES, default=list(ENTITY_TYPES), help="Entity types to fetch."
+    )
+    parser.add_argument("--api-url", default=WIKIPEDIA_API_URL, help="MediaWiki API endpoint (or a stub).")
+    parser.add_argument("--rate", type=float, default=WIKIPEDIA_RATE_PER_SECOND, help="Requests per second.")
+    parser.add_argument("--concurrency", type=int, default=WIKIPEDIA_MAX_CONCURRENCY, help="Parallel fetches.")
+    parser.add_argument("--cache", default=WIKIPEDIA_CACHE_PATH, help="SQLite page cache; empty to disable.")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    create_text_corpus()
-    
-        
\ No newline at end of file
+    args = _parse_args()
+    if args.passages:
+        ok = create_passage_corpus(args, args.output or "data/text_passages.json")
+    else:
+        ok = create_text_corpus(args, args.output or "data/text_corpus.json")
+    sys.exit(0 if ok else 1)
@@ -1,242 +1,269 @@
-import os
+from __future__ import annotations
+
+import argparse
 import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
 
 
-COUNTRIES_RAW_DATA_PATH = "./data/raw_data/europe_countries.json"
-DATA_COUNTRIES_PATH = "./data/crawled_data/total-population-by-country-2025.json"
+COUNTRIES_RAW_DATA_PATH = "data/raw_data/europe_countries.json"
+DATA_COUNTRIES_PATH = "data/crawled_data/total-population-by-country-2025.json"
+RIVER_RAW_DATA = "data/raw_data/europe_rivers.json"
+CITY_RAW_DATA = "data/crawled_data/europe-cities-by-population-2025.json"
+MIN_RIVER_LENGTH = 100
 
-with open(DATA_COUNTRIES_PATH) as f:
-        data_countries = json.load(f)
 
-def find_country(country_name):
-    for country in data_countries:
-        if country['country'].lower() == country_name.lower():
-            return country
-    return None
+def make_id(kind: str, name: str) -> str:
+    return f"{kind}:{name.upper().replace(' ', '_')}"
 
 
-def standardization_countries():
-    with open(COUNTRIES_RAW_DATA_PATH) as f:
-        data = json.load(f)
+def _key(name: Optional[str]) -> str:
+    return (name or "").strip().casefold()
 
-    countries = []
-    for country in data['countries']:
-        name = country['name']
-        id = f"country:{name.upper().replace(' ', '_')}"
 
-        country_information = find_country(name)
-        if country_information is None:
-            print(f"Country {name} not found")
-
-        population = country_information['pop2025']
-        area_km2 = country_information['area']
-        density = country_information['density']
-        cca2 = country_information['cca2']
-        cca3 = country_information['cca3']
-        population_work_rank = country_information['rank']
-
-        item = {
-            "id": id,
-            "name": name,
-            "population": population,
-            "area_km2": area_km2,
-            "density": density,
-            "iso2": cca2,
-            "iso3": cca3,
-            "population_work_rank": population_work_rank
-        }
-
-        countries.append(item)
-    with open("data/database/entities/europe_countries.json", "w") as f:
-        json.dump({"countries": countries}, f, indent=4, ensure_ascii=False)
-
-
-def standardization_rivers():
-    RIVER_RAW_DATA = "./data/raw_data/europe_rivers.json"
-    STANDARD_DATABASE_RIVER = "./data/database/entities/europe_rivers.json"
-    with open(RIVER_RAW_DATA) as f:
-        data = json.load(f)
+class NameIndex:
+    """Case-insensitive name -> record lookup built once per entity file (first occurrence wins)."""
 
-    rivers = []
-    for river in data['rivers']:
-        name = river['name']
-        id = f"river:{name.upper().replace(' ', '_')}"
-        length = river['length']
-        basin = river['basin']
-        flow = river['flow']
-        parent = river['parent']
-        mounth = river['mounth']
-        if length >= 100:
-            item = {
-                "id": id,
-                "name": name,
-                "length": length,
-                "basin": basin,
-                "flow": flow,
-                "mounth": mounth
-            }
-        rivers.append(item)
-    with open(STANDARD_DATABASE_RIVER, "w") as f:
-        json.dump({"rivers": rivers}, f, indent=4, ensure_ascii=False)
+    def __init__(self, records: Iterable[dict] = (), name_field: str = "name") -> None:
+        self.name_field = name_field
+        self._records: Dict[str, dict] = {}
+        for record in records:
+            self.add(record)
 
+    def add(self, record: dict) -> None:
+        self._records.setdefault(_key(record[self.name_field]), record)
 
-def establish_relation_borders_with():
-    COUNTRY_DATABASE = "./data/database/entities/europe_countries.json"
-    COUNTRY_RAW_DATA = "./data/raw_data/europe_countries.json"
-    with open(COUNTRY_DATABASE) as f:
-        data_countries = json.load(f)
-    with open(COUNTRY_RAW_DATA) as f:
-        data = json.load(f)
+    def get(self, name: Optional[str]) -> Optional[dict]:
+        return self._records.get(_key(name))
 
-    relations = []
-    for country in data['countries']:
-        for country_data in data_countries['countries']:
-            if country_data['name'] == country['name']:
-                source_id = country_data['id']
-        for country_name in country['borders_with']:
-            seen = False
-            for country_data in data_countries['countries']:
-                if country_data['name'] == country_name:
-                    id = country_data['id']
-                    relations.append({
-                        "source_id": source_id,
-                        "target_id": id,
-                        "type": "BORDERS_WITH"
-                    })
-                    seen = True
-                    break
-            if not seen:
-                print(f"Country {country_name} not found")
-
-    with open("./data/database/relations/BORDERS_WITH.json", "w") as f:
-        json.dump({"relations": relations}, f, indent=4, ensure_ascii=False)
-
-
-def establish_relation_river_tributary():
-    COUNTRY_DATABASE = "./data/database/entities/europe_rivers.json"
-    COUNTRY_RAW_DATA = "./data/raw_data/europe_rivers.json"
-    SEA_DATABASE = "./data/database/entities/sea.json"
-    with open(COUNTRY_DATABASE) as f:
-        data_rivers = json.load(f)
-    with open(COUNTRY_RAW_DATA) as f:
-        data = json.load(f)
+    def __contains__(self, name: Optional[str]) -> bool:
+        return _key(name) in self._records
 
-    relations = []
-    sea_database = []
-    for river in data['rivers']:
-        for river_data in data_rivers['rivers']:
-            if river_data['name'] == river['name']:
-                source_id = river_data['id']
-        seen = False
-        for river_data in data_rivers['rivers']:
-            if river_data['name'] == river['parent']:
-                target_id = river_data['id']
-                seen = True
-                break
-        if not seen:
-            print(f"River {river['parent']} not found")
-            sea_id = f"sea:{river['parent'].upper().replace(' ', '_')}"
-            if sea_id not in [sea['id'] for sea in sea_database]:
-
-                sea_database.append({
-                    "name": river['parent'],
-                    "id": sea_id
-                })
-            target_id = sea_id
-        relations.append({
-            "source_id": source_id,
-            "target_id": target_id,
-            "type": "TRIBUTARY_OF"
-        })
 
+class UnresolvedNames:
+    """Names that could not be joined, grouped by what was being resolved."""
 
-    with open("./data/database/relations/TRIBUTARY_OF.json", "w") as f:
-        json.dump({"relations": relations}, f, indent=4, ensure_ascii=False)
-    with open("./data/database/entities/europe_sea.json", "w") as f:
-        json.dump({"sea": sea_database}, f, indent=4, ensure_ascii=False)
+    def __init__(self) -> None:
+        self.by_kind: Dict[str, Dict[str, List[str]]] = defaultdict(dict)
 
+    def add(self, kind: str, name: Optional[str], referenced_by: str = "") -> None:
+        self.by_kind[kind].setdefault(str(name), [])
+        if referenced_by:
+            self.by_kind[kind][str(name)].append(referenced_by)
 
-def standardization_cities():
-    CITY_RAW_DATA = "data/crawled_data/europe-cities-by-population-2025.json"
-    CITY_DATABASE = "data/database/entities/europe_cities.json"
-    COUNTRY_RAW_DATA = "data/raw_data/europe_countries.json"
-    COUNTRY_DATABASE = "data/database/entities/europe_countries.json"
+    def print_summary(self) -> None:
+        if not self.by_kind:
+            print("All names resolved.")
+            return
+        for kind, names in sorted(self.by_kind.items()):
+            described = (
+                f"{name} (from {', '.join(sources)})" if sources else name
+                for name, sources in sorted(names.items())
+            )
+            print(f"Unresolved {kind} ({len(names)}): {'; '.join(described)}")
 
-    with open(CITY_RAW_DATA) as f:
-        raw_data_city = json.load(f)
-    with open(COUNTRY_RAW_DATA) as f:
-        raw_data_country = json.load(f)
-    with open(COUNTRY_DATABASE) as f:
-        database_country = json.load(f)
+    def to_dict(self) -> dict:
+        return {kind: dict(sorted(names.items())) for kind, names in sorted(self.by_kind.items())}
 
 
-    cities = []
+def _load_json(path: Path):
+    with path.open(encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def _write_json(path: Path, payload: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as fh:
+        json.dump(payload, fh, indent=4, ensure_ascii=False)
+
+
+def standardization_countries(
+    raw_countries: List[dict], crawled: NameIndex, unresolved: UnresolvedNames
+) -> List[dict]:
+    countries = []
+    for country in raw_countries:
+        name = country["name"]
+        country_information = crawled.get(name)
+        if country_information is None:
+            unresolved.add("crawled country", name)
+            continue
+        countries.append(
+            {
+                "id": make_id("country", name),
+                "name": name,
+                "population": country_information["pop2025"],
+                "area_km2": country_information["area"],
+                "density": country_information["density"],
+                "iso2": country_information["cca2"],
+                "iso3": country_information["cca3"],
+                "population_work_rank": country_information["rank"],
+            }
+        )
+    return countries
+
+
+def standardization_rivers(raw_rivers: List[dict]) -> List[dict]:
+    rivers = []
+    for river in raw_rivers:
+        length = river["length"]
+        if length is None or length < MIN_RIVER_LENGTH:
+            continue
+        rivers.append(
+            {
+                "id": make_id("river", river["name"]),
+                "name": river["name"],
+                "length": length,
+                "basin": river["basin"],
+                "flow": river["flow"],
+                "mounth": river["mounth"],
+            }
+        )
+    return rivers
+
+
+def establish_relation_borders_with(
+    raw_countries: List[dict], countries: NameIndex, unresolved: UnresolvedNames
+) -> List[dict]:
     relations = []
-    for city in raw_data_city:
-        name = city['city']
-        id = f"city:{name.upper().replace(' ', '_')}"
-        population = city['population']
-        lat = city['lat']
-        lon = city['lng']
-        country = city['country']
-
-        seen_country = False
-        for country_data in database_country['countries']:
-            if country_data['name'].lower() == country.lower():
-                country_id = country_data['id']
-                seen_country = True
-
-                break
-        if not seen_country:
-            print(f"Country {country} not found")
-
-        cities.append({
-            "id": id,
-            "name": name,
-            "population": population,
-            "lat": lat,
-            "lon": lon
-        })
-        relations.append({
-            "source_id": id,
-            "target_id": country_id,
-            "type": "LOCATED_IN"
-        })
-
-    for country in raw_data_country['countries']:
-        capital_name = country['capital']
-        country_id = f"country:{country['name'].upper().replace(' ', '_')}"
-        seen = False
-        for city in cities:
-            if city['name'] == capital_name:
-                capital_id = city['id']
-                seen = True
-                break
-        if not seen:
-            print(f"Capital {capital_name} not found")
-        relations.append({
-            "source_id": capital_id,
-            "target_id": country_id,
-            "type": "CAPITAL_OF"
-        })
-
-
-    with open(CITY_DATABASE, "w") as f:
-        json.dump({"cities": cities}, f, indent=4, ensure_ascii=False)
-    with open("./data/database/relations/LOCATED_IN.json", "w") as f:
-        json.dump({"relations": relations}, f, indent=4, ensure_ascii=False)
-    with open("./data/database/relations/CAPITAL_OF.json", "w") as f:
-        json.dump({"relations": relations}, f, indent=4, ensure_ascii=False)
-
-
-def main():
-    # standardization_countries()
-    # standardization_rivers()
-    standardization_cities()
-
-    # establish_relation_borders_with()
-    # establish_relation_river_tributary()
+    for country in raw_countries:
+        source = countries.get(country["name"])
+        if source is None:
+            unresolved.add("country", country["name"])
+            continue
+        for neighbour_name in country["borders_with"]:
+            target = countries.get(neighbour_name)
+            if target is None:
+                unresolved.add("country", neighbour_name, referenced_by=country["name"])
+                continue
+            relations.append({"source_id": source["id"], "target_id": target["id"], "type": "BORDERS_WITH"})
+    return relations
+
+
+def establish_relation_river_tributary(
+    raw_rivers: List[dict], rivers: NameIndex, unresolved: UnresolvedNames
+) -> tuple[List[dict], List[dict]]:
+    """Link each kept river to its parent river, or to a sea entity when the parent is not a river."""
+    relations = []
+    seas: Dict[str, dict] = {}
+    for river in raw_rivers:
+        source = rivers.get(river["name"])
+        if source is None:
+            continue  # filtered out by standardization_rivers
+        parent = river["parent"]
+        if not parent:
+            unresolved.add("river parent", river["name"])
+            continue
+        target = rivers.get(parent)
+        if target is None:
+            sea_id = make_id("sea", parent)
+            seas.setdefault(sea_id, {"name": parent, "id": sea_id})
+            target_id = sea_id
+        else:
+            target_id = target["id"]
+        relations.append({"source_id": source["id"], "target_id": target_id, "type": "TRIBUTARY_OF"})
+    return relations, list(seas.values())
+
+
+def standardization_cities(
+    raw_cities: List[dict], raw_countries: List[dict], countries: NameIndex, unresolved: UnresolvedNames
+) -> tuple[List[dict], List[dict], List[dict]]:
+    cities = []
+    located_in = []
+    for city in raw_cities:
+        city_id = make_id("city", city["city"])
+        cities.append(
+            {
+                "id": city_id,
+                "name": city["city"],
+                "population": city["population"],
+                "lat": city["lat"],
+                "lon": city["lng"],
+            }
+        )
+        country = countries.get(city["country"])
+        if country is None:
+            unresolved.add("country", city["country"], referenced_by=city["city"])
+            continue
+        located_in.append({"source_id": city_id, "target_id": country["id"], "type": "LOCATED_IN"})
+
+    city_index = NameIndex(cities)
+    capital_of = []
+    for country in raw_countries:
+        if not country["capital"]:
+            continue
+        capital = city_index.get(country["capital"])
+        if capital is None:
+            unresolved.add("capital", country["capital"], referenced_by=country["name"])
+            continue
+        country_id = make_id("country", country["name"])
+        capital_of.append({"source_id": capital["id"], "target_id": country_id, "type": "CAPITAL_OF"})
+    return cities, located_in, capital_of
+
+
+PARTS = ("countries", "rivers", "cities")
+
+
+def normalize(
+    output_dir: Path, report_path: Optional[Path] = None, parts: Iterable[str] = PARTS
+) -> UnresolvedNames:
+    """Rebuild the entity and relation files of ``parts`` in one pass over the raw inputs.
+
+    Parts only share read-only inputs, so the build pipeline can run them in parallel.
+    """
+    parts = set(parts)
+    raw_countries = _load_json(Path(COUNTRIES_RAW_DATA_PATH))["countries"]
+    crawled_countries = NameIndex(_load_json(Path(DATA_COUNTRIES_PATH)), name_field="country")
+    unresolved = UnresolvedNames()
+    entities, relations = output_dir / "entities", output_dir / "relations"
+
+    countries = standardization_countries(raw_countries, crawled_countries, unresolved)
+    country_index = NameIndex(countries)
+    if "countries" in parts:
+        borders = establish_relation_borders_with(raw_countries, country_index, unresolved)
+        _write_json(entities / "europe_countries.json", {"countries": countries})
+        _write_json(relations / "BORDERS_WITH.json", {"relations": borders})
+
+    if "rivers" in parts:
+        raw_rivers = _load_json(Path(RIVER_RAW_DATA))["rivers"]
+        rivers = standardization_rivers(raw_rivers)
+        tributaries, seas = establish_relation_river_tributary(raw_rivers, NameIndex(rivers), unresolved)
+        _write_json(entities / "europe_rivers.json", {"rivers": rivers})
+        _write_json(entities / "europe_sea.json", {"sea": seas})
+        _write_json(relations / "TRIBUTARY_OF.json", {"relations": tributaries})
+
+    if "cities" in parts:
+        cities, located_in, capital_of = standardization_cities(
+            _load_json(Path(CITY_RAW_DATA)), raw_countries, country_index, unresolved
+        )
+        _write_json(entities / "europe_cities.json", {"cities": cities})
+        _write_json(relations / "LOCATED_IN.json", {"relations": located_in})
+        _write_json(relations / "CAPITAL_OF.json", {"relations": capital_of})
+
+    unresolved.print_summary()
+    if report_path is not None:
+        _write_json(report_path, unresolved.to_dict())
+    return unresolved
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Normalize raw/crawled data into database entities and relations."
+    )
+    parser.add_argument(
+        "--output-dir", default="data/database", type=Path, help="Database root to write into."
+    )
+    parser.add_argument("--report", default=None, type=Path, help="Optional JSON report of unresolved names.")
+    parser.add_argument(
+        "--parts", nargs="+", choices=PARTS, default=list(PARTS), help="Which entity groups to rebuild."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    normalize(args.output_dir, args.report, args.parts)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -3,29 +3,36 @@ from __future__ import annotations
 import argparse
 import csv
 import json
+import os
+import sys
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, Iterator, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from europe_kg_rag.data.ndjson import is_ndjson, write_ndjson
 
 Row = Dict[str, Optional[str]]
 
-with open("data/database/entities/europe_countries.json") as f:
-    data_countries = json.load(f)
-country_names = data_countries['countries']
-country_names = [country['name'].lower() for country in country_names]
+COUNTRIES_PATH = Path("data/database/entities/europe_countries.json")
+
 
+def load_country_names(countries_path: Path = COUNTRIES_PATH) -> FrozenSet[str]:
+    """Lower-cased country names, loaded once for validating every row."""
+    with countries_path.open(encoding="utf-8") as fh:
+        return frozenset(country["name"].lower() for country in json.load(fh)["countries"])
 
-def _read_csv_file(csv_path: Path) -> List[Row]:
+
+def _iter_csv_file(
+    csv_path: Path, known_countries: FrozenSet[str], unknown: Counter
+) -> Iterator[Row]:
     with csv_path.open(newline="", encoding="utf-8") as fh:
         reader = csv.DictReader(fh)
         if reader.fieldnames is None:
-            return []
+            return
 
-        rows: List[Row] = []
         for row in reader:
-            countries = [c.lower().strip() for c in row['Country'].split('/')]
-            for country in countries:
-                if country not in country_names:
-                    print(country)
             if not row:
                 continue
             if not any((value or "").strip() for value in row.values()):
@@ -35,24 +42,45 @@ def _read_csv_file(csv_path: Path) -> List[Row]:
                 key: (value.strip() if isinstance(value, str) else value)
                 for key, value in row.items()
             }
-            rows.append(normalized)
-
-    return rows
+            for country in (normalized.get("Country") or "").split("/"):
+                country = country.strip().lower()
+                if country and country not in known_countries:
+                    unknown[country] += 1
+            yield normalized
 
 
-def convert_mountains_folder_to_json(input_dir: Path, output_path: Path) -> None:
+def iter_mountain_rows(
+    input_dir: Path, known_countries: FrozenSet[str], unknown: Optional[Counter] = None
+) -> Iterator[Row]:
+    """Stream the rows of every CSV in ``input_dir``; country names not in ``known_countries`` are counted."""
     if not input_dir.exists():
         raise FileNotFoundError(f"Input directory not found: {input_dir}")
     if not input_dir.is_dir():
         raise NotADirectoryError(f"Input path is not a directory: {input_dir}")
 
-    mountains: List[Row] = []
+    unknown = unknown if unknown is not None else Counter()
     for csv_path in sorted(input_dir.glob("*.csv")):
-        mountains.extend(_read_csv_file(csv_path))
+        yield from _iter_csv_file(csv_path, known_countries, unknown)
 
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as fh:
-        json.dump({"mountains": mountains}, fh, ensure_ascii=False, indent=2)
+
+def convert_mountains_folder_to_json(
+    input_dir: Path, output_path: Path, countries_path: Path = COUNTRIES_PATH
+) -> Counter:
+    """Write the mountains as JSON, or one record per line when ``output_path`` is .ndjson/.jsonl."""
+    unknown: Counter = Counter()
+    rows = iter_mountain_rows(input_dir, load_country_names(countries_path), unknown)
+    if is_ndjson(output_path):
+        write_ndjson(rows, output_path)
+    else:
+        mountains = list(rows)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with output_path.open("w", encoding="utf-8") as fh:
+            json.dump({"mountains": mountains}, fh, ensure_ascii=False, indent=2)
+
+    if unknown:
+        described = ", ".join(f"{name} ({count})" for name, count in sorted(unknown.items()))
+        print(f"Unknown countries ({len(unknown)}): {described}")
+    return unknown
 
 
 def _parse_args() -> argparse.Namespace:
@@ -69,14 +97,20 @@ def _parse_args() -> argparse.Namespace:
         "--output",
         default=Path("data/crawled_data/mountains/list_of_european_ultra_prominent_peaks.json"),
         type=Path,
-        help="Path to write the JSON output.",
+        help="Path to write the JSON output (.ndjson/.jsonl streams one record per line).",
+    )
+    parser.add_argument(
+        "--countries",
+        default=COUNTRIES_PATH,
+        type=Path,
+        help="Countries JSON used to validate the Country column.",
     )
     return parser.parse_args()
 
 
 def main() -> None:
     args = _parse_args()
-    convert_mountains_folder_to_json(args.input_dir, args.output)
+    convert_mountains_folder_to_json(args.input_dir, args.output, args.countries)
 
 
 if __name__ == "__main__":
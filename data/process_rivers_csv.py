@@ -1,25 +1,33 @@
 from __future__ import annotations
 
-from __future__ import annotations
-
 import argparse
 import csv
 import json
+import os
 import re
+import sys
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from europe_kg_rag.data.ndjson import is_ndjson, write_ndjson
 
 PREPOSITION_PATTERN = re.compile(
     r"\b(near|at|in|into|onto|to|on|by|via|off|within|between)\b",
     flags=re.IGNORECASE,
 )
+REFERENCE_PATTERN = re.compile(r"\[[^\]]*]")  # reference-style brackets such as [12] or [note 1]
+WHITESPACE_PATTERN = re.compile(r"\s+")
+LEADING_NUMBER_PATTERN = re.compile(r"\d+")
+NUMBER_PATTERN = re.compile(r"\d+(?:\.\d+)?")
+MISSING_VALUES = frozenset({"-", "?", "—"})
 
 
 def _clean_text(value: str) -> str:
     cleaned = value.replace("\xa0", " ").strip()
-    cleaned = re.sub(r"\[[^\]]*]", "", cleaned)  # drop reference-style brackets
-    cleaned = re.sub(r"\s+", " ", cleaned)
+    cleaned = REFERENCE_PATTERN.sub("", cleaned)
+    cleaned = WHITESPACE_PATTERN.sub(" ", cleaned)
     return cleaned
 
 
@@ -31,7 +39,7 @@ def _clean_name(value: str) -> str:
 
 def _parse_numeric(value: str) -> Optional[float | int | str]:
     text = _clean_text(value)
-    if not text or text in {"-", "?", "—"}:
+    if not text or text in MISSING_VALUES:
         return None
 
     normalized = text.replace(",", "").replace("~", "").replace("−", "-")
@@ -42,7 +50,7 @@ def _parse_numeric(value: str) -> Optional[float | int | str]:
             return float(normalized)
         return int(normalized)
     except ValueError:
-        match = re.search(r"\d+(?:\.\d+)?", normalized)
+        match = NUMBER_PATTERN.search(normalized)
         if match:
             number = match.group()
             return float(number) if "." in number else int(number)
@@ -51,9 +59,9 @@ def _parse_numeric(value: str) -> Optional[float | int | str]:
 
 def _parse_rank(value: str) -> Optional[int]:
     text = _clean_text(value)
-    if not text or text in {"-", "?", "—"}:
+    if not text or text in MISSING_VALUES:
         return None
-    match = re.match(r"\d+", text)
+    match = LEADING_NUMBER_PATTERN.match(text)
     return int(match.group()) if match else None
 
 
@@ -97,10 +105,8 @@ def _extract_name(levels: List[str]) -> Optional[str]:
     return None
 
 
-def convert_rivers_csv_to_json(
-    csv_path: Path,
-    output_path: Path,
-) -> None:
+def iter_rivers_csv(csv_path: Path) -> Iterator[dict]:
+    """Yield one river record per CSV row, keeping only the tributary stack in memory."""
     with csv_path.open(newline="", encoding="utf-8") as fh:
         reader = csv.reader(fh)
 
@@ -108,7 +114,6 @@ def convert_rivers_csv_to_json(
         for _ in range(3):
             next(reader, None)
 
-        rivers = []
         stack: List[Optional[str]] = [None] * 5  # track hierarchy depth
 
         for row in reader:
@@ -134,7 +139,7 @@ def convert_rivers_csv_to_json(
             else:
                 parent = mouth_parent
 
-            river_entry = {
+            yield {
                 "name": name,
                 "rank_of_length": _parse_rank(row[0]),
                 "rank_of_area": _parse_rank(row[1]),
@@ -147,13 +152,22 @@ def convert_rivers_csv_to_json(
                 "countries": _parse_countries(row[12]),
             }
 
-            rivers.append(river_entry)
 
+def convert_rivers_csv_to_json(
+    csv_path: Path,
+    output_path: Path,
+) -> None:
+    rivers = list(iter_rivers_csv(csv_path))
     output_path.parent.mkdir(parents=True, exist_ok=True)
     with output_path.open("w", encoding="utf-8") as fh:
         json.dump({"rivers": rivers}, fh, ensure_ascii=False, indent=2)
 
 
+def convert_rivers_csv_to_ndjson(csv_path: Path, output_path: Path) -> int:
+    """Stream rivers to newline-delimited JSON without materializing the list; returns the count."""
+    return write_ndjson(iter_rivers_csv(csv_path), output_path)
+
+
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Convert the exported List of rivers of Europe CSV into structured JSON."
@@ -168,14 +182,17 @@ def _parse_args() -> argparse.Namespace:
         "--output",
         default="data/crawled_data/rivers/list_of_rivers_of_europe.json",
         type=Path,
-        help="Path to write the JSON output.",
+        help="Path to write the JSON output (.ndjson/.jsonl streams one record per line).",
     )
     return parser.parse_args()
 
 
 def main() -> None:
     args = _parse_args()
-    convert_rivers_csv_to_json(args.input, args.output)
+    if is_ndjson(args.output):
+        convert_rivers_csv_to_ndjson(args.input, args.output)
+    else:
+        convert_rivers_csv_to_json(args.input, args.output)
 
 
 if __name__ == "__main__":
@@ -1,4 +1,11 @@
+import argparse
 import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from europe_kg_rag.data.ndjson import is_ndjson, iter_ndjson, write_ndjson
 
 
 def load_dict_country():
@@ -11,7 +18,7 @@ def load_dict_country():
     return dict_country
 
 
-def process_country_name(data):
+def process_country_name(data, europe_data_path="data/raw_data/europe_countries.json"):
     dict_country = load_dict_country()
     non_exist_country = []
 
@@ -22,7 +29,7 @@ def process_country_name(data):
     if not non_exist_country:
         print("All countries of rivers database are available.")
 
-    with open("data/database/updated_europe_data.json") as f:
+    with open(europe_data_path) as f:
         europe_data = json.load(f)
     list_countries = list(dict_country.values())
     for country in europe_data['countries']:
@@ -32,21 +39,54 @@ def process_country_name(data):
         print("All countries of europe database are available.")
     print("\n".join(non_exist_country))
 
-    for i, river in enumerate(data['rivers']):
-        countries = []
-        for country in river['countries'].split():
-            countries.append(dict_country[country])
-        data['rivers'][i]['countries'] = countries
-
+    data['rivers'] = list(map_country_codes(data['rivers'], dict_country))
     return data
 
 
+def map_country_codes(rivers, dict_country):
+    """Yield each river with its space-separated country codes replaced by country names."""
+    for river in rivers:
+        river['countries'] = [dict_country[country] for country in river['countries'].split()]
+        yield river
+
+
+def stream_country_names(input_path, output_path):
+    """NDJSON in, NDJSON out: map country codes one river at a time; returns the river count."""
+    dict_country = load_dict_country()
+    try:
+        return write_ndjson(map_country_codes(iter_ndjson(input_path), dict_country), output_path)
+    except KeyError as exc:
+        raise KeyError(f"Country code {exc} is missing from the mapping") from None
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Map river country codes to country names.")
+    parser.add_argument(
+        "--input",
+        default="data/crawled_data/rivers/list_of_rivers_of_europe.json",
+        help="Rivers JSON, or .ndjson/.jsonl to stream one river per line.",
+    )
+    parser.add_argument("--output", default="data/raw_data/europe_rivers.json")
+    parser.add_argument(
+        "--countries",
+        default="data/raw_data/europe_countries.json",
+        help="Countries JSON used to report names missing from the code mapping.",
+    )
+    return parser.parse_args()
+
+
 def main():
-    with open("data/crawled_data/rivers/list_of_rivers_of_europe.json", "r") as file:
+    args = _parse_args()
+    if is_ndjson(args.input):
+        output = args.output if is_ndjson(args.output) else os.path.splitext(args.output)[0] + ".ndjson"
+        stream_country_names(args.input, output)
+        return
+
+    with open(args.input, "r") as file:
         data = json.load(file)
 
-    processed_data = process_country_name(data)
-    with open("data/database/europe_rivers.json", "w") as file:
+    processed_data = process_country_name(data, args.countries)
+    with open(args.output, "w") as file:
         json.dump(processed_data, file, indent=4, ensure_ascii=False)
 
 
@@ -2,4 +2,4 @@
 Core package for the Europe KG + RAG toolkit.
 """
 
-__all__ = ["data", "graph", "retrieval"]
+__all__ = ["data", "experiments", "generation", "graph", "observability", "retrieval", "service"]
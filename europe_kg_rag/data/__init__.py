@@ -1,4 +1,50 @@
+from .artifacts import ArtifactError, ArtifactStore, ArtifactVersion
 from .loader import DatabaseLoader
 from .models import Country, GraphDataset, River
+from .ndjson import is_ndjson, iter_json_array, iter_ndjson, write_ndjson
+from .pipeline import BuildPipeline, BuildReport, FileHasher, Stage, StageResult
+from .schema import FieldSpec, Schema, SchemaError, ValidationReport, validate_records
+from .snapshot import GraphSnapshot, SnapshotError, write_snapshot
+from .wikipedia import (
+    CorpusBuilder,
+    CorpusBuildReport,
+    FetchError,
+    PageCache,
+    TokenBucket,
+    WikipediaFetcher,
+    WikipediaPage,
+)
 
-__all__ = ["DatabaseLoader", "Country", "GraphDataset", "River"]
+__all__ = [
+    "ArtifactError",
+    "ArtifactStore",
+    "ArtifactVersion",
+    "DatabaseLoader",
+    "Country",
+    "GraphDataset",
+    "River",
+    "is_ndjson",
+    "iter_json_array",
+    "iter_ndjson",
+    "write_ndjson",
+    "GraphSnapshot",
+    "SnapshotError",
+    "write_snapshot",
+    "BuildPipeline",
+    "BuildReport",
+    "FileHasher",
+    "Stage",
+    "StageResult",
+    "FieldSpec",
+    "Schema",
+    "SchemaError",
+    "ValidationReport",
+    "validate_records",
+    "CorpusBuilder",
+    "CorpusBuildReport",
+    "FetchError",
+    "PageCache",
+    "TokenBucket",
+    "WikipediaFetcher",
+    "WikipediaPage",
+]
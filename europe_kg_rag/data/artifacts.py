@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from .snapshot import source_digest
+
+MANIFEST_NAME = "manifest.json"
+CURRENT_NAME = "CURRENT"
+SIDECAR_SUFFIX = ".digest"
+
+
+class ArtifactError(ValueError):
+    """A version is missing, incomplete or cannot be published."""
+
+
+@dataclass(slots=True)
+class ArtifactVersion:
+    """One immutable set of serving artifacts; ``graph_database`` names the Neo4j database built for it."""
+
+    version: str
+    path: Path
+    corpus: Path
+    faiss_index: Optional[Path] = None
+    snapshot: Optional[Path] = None
+    graph_database: Optional[str] = None
+    created_at: float = 0.0
+
+    @classmethod
+    def from_manifest(cls, directory: Path) -> "ArtifactVersion":
+        manifest_path = directory / MANIFEST_NAME
+        if not manifest_path.exists():
+            raise ArtifactError(f"No manifest in {directory}")
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        files = manifest.get("files", {})
+
+        def file(name: str) -> Optional[Path]:
+            return directory / files[name] if files.get(name) else None
+
+        return cls(
+            version=manifest["version"],
+            path=directory,
+            corpus=directory / files["corpus"],
+            faiss_index=file("faiss_index"),
+            snapshot=file("snapshot"),
+            graph_database=manifest.get("graph_database"),
+            created_at=manifest.get("created_at", 0.0),
+        )
+
+
+class ArtifactStore:
+    """Versioned artifact directories under ``root`` plus a ``CURRENT`` pointer that is replaced atomically.
+
+    A version directory is staged under a temporary name and renamed into place only once complete,
+    so readers never see a partial version; activating one is a single ``os.replace`` of the pointer.
+    """
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def publish(
+        self,
+        corpus: str | Path,
+        faiss_index: str | Path | None = None,
+        snapshot: str | Path | None = None,
+        graph_database: str | None = None,
+        activate: bool = True,
+    ) -> ArtifactVersion:
+        """Copy the artifacts into a new version (content-addressed, so republishing is a no-op)."""
+        sources = {"corpus": corpus, "faiss_index": faiss_index, "snapshot": snapshot}
+        paths = {name: Path(path) for name, path in sources.items() if path is not None}
+        for path in paths.values():
+            if not path.is_file():
+                raise ArtifactError(f"Cannot publish missing artifact: {path}")
+        version = source_digest(paths.values(), salt=graph_database or "").hex()[:12]
+        directory = self.root / version
+        if not directory.exists():
+            staging = self.root / f".staging-{version}-{os.getpid()}"
+            shutil.rmtree(staging, ignore_errors=True)
+            staging.mkdir(parents=True)
+            try:
+                # Copies, not hard links: the live index and corpus are rewritten in place by rebuilds.
+                for path in paths.values():
+                    shutil.copy2(path, staging / path.name)
+                    # Sidecars (the FAISS index's corpus digest) travel with their artifact.
+                    sidecar = path.with_name(path.name + SIDECAR_SUFFIX)
+                    if sidecar.is_file():
+                        shutil.copy2(sidecar, staging / sidecar.name)
+                manifest = {
+                    "version": version,
+                    "created_at": time.time(),
+                    "graph_database": graph_database,
+                    "files": {name: path.name for name, path in paths.items()},
+                }
+                (staging / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+                os.replace(staging, directory)
+            except BaseException:
+                shutil.rmtree(staging, ignore_errors=True)
+                raise
+        if activate:
+            self.activate(version)
+        return self.get(version)
+
+    def activate(self, version: str) -> None:
+        self.get(version)  # refuse to point at a missing version
+        pointer = self.root / CURRENT_NAME
+        temporary = pointer.with_name(f"{CURRENT_NAME}.{os.getpid()}.tmp")
+        temporary.write_text(version, encoding="utf-8")
+        os.replace(temporary, pointer)
+
+    def current_id(self) -> Optional[str]:
+        """Cheap poll target: the active version id, or None before anything is published."""
+        try:
+            return (self.root / CURRENT_NAME).read_text(encoding="utf-8").strip() or None
+        except FileNotFoundError:
+            return None
+
+    def current(self) -> Optional[ArtifactVersion]:
+        version = self.current_id()
+        return self.get(version) if version else None
+
+    def get(self, version: str) -> ArtifactVersion:
+        directory = self.root / version
+        if not directory.is_dir():
+            raise ArtifactError(f"Unknown artifact version: {version}")
+        return ArtifactVersion.from_manifest(directory)
+
+    def versions(self) -> List[ArtifactVersion]:
+        """Published versions, oldest first."""
+        if not self.root.exists():
+            return []
+        found = [
+            ArtifactVersion.from_manifest(path)
+            for path in self.root.iterdir()
+            if path.is_dir() and not path.name.startswith(".") and (path / MANIFEST_NAME).exists()
+        ]
+        return sorted(found, key=lambda item: item.created_at)
+
+    def prune(self, keep: int = 3) -> List[str]:
+        """Delete all but the newest ``keep`` versions, never the active one; returns the removed ids."""
+        current = self.current_id()
+        removed = []
+        for item in self.versions()[: -keep or None]:
+            if item.version != current:
+                shutil.rmtree(item.path, ignore_errors=True)
+                removed.append(item.version)
+        return removed
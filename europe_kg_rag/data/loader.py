@@ -1,105 +1,126 @@
 from __future__ import annotations
 
-import json
 from pathlib import Path
-from typing import Any, Iterable, Optional
+from typing import Iterable, Iterator
 
 from .models import Country, GraphDataset, River
-
-
-def _as_bool(value: Any) -> bool:
-    if isinstance(value, bool):
-        return value
-    if value is None:
-        return False
-    text = str(value).strip().lower()
-    return text in {"yes", "y", "true", "1"}
-
-
-def _as_float(value: Any) -> Optional[float]:
-    if value in (None, ""):
-        return None
-    try:
-        return float(value)
-    except (TypeError, ValueError):
-        return None
-
-
-def _as_int(value: Any) -> Optional[int]:
-    float_value = _as_float(value)
-    if float_value is None:
-        return None
-    return int(float_value)
-
-
-def _clean_string(value: Any) -> str:
-    if value is None:
-        return ""
-    return str(value).strip()
+from .ndjson import is_ndjson, iter_json_array, iter_ndjson
+from .schema import (
+    COUNTRY_SCHEMA,
+    ENTITY_SCHEMA,
+    RELATION_SCHEMA,
+    RIVER_SCHEMA,
+    Schema,
+    ValidationReport,
+    validate_records,
+)
+from .snapshot import GraphSnapshot, SnapshotError, source_digest, write_snapshot
 
 
 class DatabaseLoader:
-    """Load graph-ready data from the local JSON database."""
-
-    def __init__(self, base_path: str | Path = "data/database") -> None:
+    """Load graph-ready data from the local JSON database.
+
+    Each entity file may also be newline-delimited JSON (``europe_countries.ndjson``, one record
+    per line), read lazily by ``iter_countries``/``iter_rivers``. When both forms exist the more
+    recently written one wins, so a stale NDJSON file never shadows regenerated JSON.
+
+    With ``snapshot_path`` the cleaned dataset is also written to a binary snapshot, which later
+    ``load`` calls memory-map instead of parsing, as long as the source files are byte-identical.
+
+    Every iterator parses incrementally (JSON arrays included) and validates records against
+    the schemas in ``schema.py``; problems are counted in ``self.report``. ``on_error`` picks
+    whether bad values are dropped (``coerce``), bad records skipped (``skip``) or fatal (``raise``).
+    """
+
+    def __init__(
+        self,
+        base_path: str | Path = "data/database",
+        country_attributes_path: str | Path | None = None,
+        snapshot_path: str | Path | None = None,
+        on_error: str = "coerce",
+    ) -> None:
         self.base_path = Path(base_path)
-        self.countries_path = self.base_path / "europe_countries.json"
-        self.rivers_path = self.base_path / "europe_rivers.json"
+        self.countries_path = self._resolve("europe_countries")
+        self.rivers_path = self._resolve("europe_rivers")
+        # Normalized entities (data/normalize_data.py) carrying population/area/density by name.
+        self.country_attributes_path = Path(country_attributes_path) if country_attributes_path else None
+        self.snapshot_path = Path(snapshot_path) if snapshot_path else None
+        self.on_error = on_error
+        self.report = ValidationReport()
 
     def load(self) -> GraphDataset:
-        countries_payload = self._load_json(self.countries_path).get("countries", [])
-        rivers_payload = self._load_json(self.rivers_path).get("rivers", [])
-        return GraphDataset(
-            countries=[self._build_country(item) for item in countries_payload],
-            rivers=[self._build_river(item) for item in rivers_payload],
+        if self.snapshot_path is None:
+            return self._parse()
+        digest = source_digest(
+            [self.countries_path, self.rivers_path, self.country_attributes_path], salt=str(self.base_path)
         )
+        try:
+            with GraphSnapshot(self.snapshot_path, expected_digest=digest) as snapshot:
+                return snapshot.to_dataset()
+        except SnapshotError:
+            pass
+        dataset = self._parse()
+        write_snapshot(dataset, self.snapshot_path, digest)
+        return dataset
+
+    def _parse(self) -> GraphDataset:
+        return GraphDataset(countries=list(self.iter_countries()), rivers=list(self.iter_rivers()))
+
+    def iter_countries(self, report: ValidationReport | None = None) -> Iterator[Country]:
+        payloads = self._iter_records(self.countries_path, "countries")
+        if self.country_attributes_path is not None:
+            payloads = self._merge_country_attributes(payloads)
+        for item in self._validate(payloads, COUNTRY_SCHEMA, self.countries_path, report):
+            yield Country(**item)
+
+    def iter_rivers(self, report: ValidationReport | None = None) -> Iterator[River]:
+        for item in self._validate(
+            self._iter_records(self.rivers_path, "rivers"), RIVER_SCHEMA, self.rivers_path, report
+        ):
+            yield River(**item)
+
+    def iter_entities(self, kind: str, report: ValidationReport | None = None) -> Iterator[dict]:
+        """Normalized entity records (``entities/europe_<kind>.json``) with at least ``id`` and ``name``."""
+        path = self._resolve(f"entities/europe_{kind}")
+        yield from self._validate(self._iter_records(path, kind), ENTITY_SCHEMA, path, report)
+
+    def iter_relations(self, relation_file: str, report: ValidationReport | None = None) -> Iterator[dict]:
+        """``{source_id, target_id, type}`` records of ``relations/<relation_file>.json``, one at a time."""
+        path = self._resolve(f"relations/{relation_file}")
+        yield from self._validate(self._iter_records(path, "relations"), RELATION_SCHEMA, path, report)
+
+    def _validate(
+        self, records: Iterable[dict], schema: Schema, path: Path, report: ValidationReport | None
+    ) -> Iterator[dict]:
+        report = self.report if report is None else report
+        return validate_records(records, schema, report, self.on_error, source=path.name)
+
+    def _resolve(self, stem: str) -> Path:
+        candidates = [self.base_path / f"{stem}{suffix}" for suffix in (".ndjson", ".jsonl", ".json")]
+        existing = [path for path in candidates if path.exists()]
+        if not existing:
+            return candidates[-1]
+        # Newest first; on equal mtimes the NDJSON form (listed first) wins.
+        return max(existing, key=lambda path: path.stat().st_mtime_ns)
 
-    def _load_json(self, path: Path) -> dict:
+    @staticmethod
+    def _iter_records(path: Path, key: str) -> Iterator[dict]:
         if not path.exists():
             raise FileNotFoundError(f"Expected data file is missing: {path}")
-        with path.open("r", encoding="utf-8") as handle:
-            return json.load(handle)
-
-    def _build_country(self, payload: dict) -> Country:
-        return Country(
-            name=_clean_string(payload.get("name")),
-            capital=_clean_string(payload.get("capital")),
-            eu_member=_as_bool(payload.get("eu_member")),
-            borders_with=self._normalize_string_list(payload.get("borders_with", [])),
-        )
-
-    def _build_river(self, payload: dict) -> River:
-        countries = self._normalize_string_list(payload.get("countries", []))
-        mouth = payload.get("mouth")
-        if mouth is None:
-            mouth = payload.get("mounth")  # historical typo in upstream data
-
-        return River(
-            name=_clean_string(payload.get("name")),
-            length=_as_float(payload.get("length")),
-            basin=_as_float(payload.get("basin")),
-            flow=_as_float(payload.get("flow")),
-            mouth=_clean_string(mouth),
-            parent=_clean_string(payload.get("parent")),
-            rank_of_length=_as_int(payload.get("rank_of_length")),
-            rank_of_area=_as_int(payload.get("rank_of_area")),
-            rank_of_flow=_as_int(payload.get("rank_of_flow")),
-            countries=countries,
-        )
-
-    @staticmethod
-    def _normalize_string_list(values: Any) -> list[str]:
-        if not values:
-            return []
-        if isinstance(values, str):
-            candidates: Iterable[str] = [values]
-        elif isinstance(values, Iterable):
-            candidates = values
-        else:
-            return []
-        normalized: list[str] = []
-        for candidate in candidates:
-            text = str(candidate).strip()
-            if text:
-                normalized.append(text)
-        return normalized
+        return iter_ndjson(path) if is_ndjson(path) else iter_json_array(path, key)
+
+    def _merge_country_attributes(self, countries_payload: Iterable[dict]) -> Iterator[dict]:
+        attributes = {
+            _name_key(item): item for item in self._iter_records(self.country_attributes_path, "countries")
+        }
+        for payload in countries_payload:
+            if not isinstance(payload, dict):
+                yield payload  # rejected by validation
+                continue
+            extra = attributes.get(_name_key(payload), {})
+            overrides = {key: extra[key] for key in ("population", "area_km2", "density") if key in extra}
+            yield {**payload, **overrides}
+
+
+def _name_key(record: dict) -> str:
+    return str(record.get("name") or "").strip().lower()
@@ -10,6 +10,9 @@ class Country:
     capital: str
     eu_member: bool
     borders_with: List[str] = field(default_factory=list)
+    population: Optional[int] = None
+    area_km2: Optional[float] = None
+    density: Optional[float] = None
 
 
 @dataclass(slots=True)
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Iterable, Iterator
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+
+def is_ndjson(path: str | Path) -> bool:
+    return Path(path).suffix.lower() in NDJSON_SUFFIXES
+
+
+def iter_ndjson(path: str | Path) -> Iterator[dict]:
+    """Yield one record per non-blank line without reading the whole file."""
+    path = Path(path)
+    with path.open("r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_number}: invalid JSON record ({exc.msg})") from exc
+
+
+def write_ndjson(records: Iterable[dict], path: str | Path) -> int:
+    """Stream ``records`` to ``path`` one line each (atomically replaced); returns the record count."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    count = 0
+    try:
+        with temporary.open("w", encoding="utf-8") as handle:
+            for record in records:
+                handle.write(json.dumps(record, ensure_ascii=False))
+                handle.write("\n")
+                count += 1
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    os.replace(temporary, path)
+    return count
+
+
+_NUMBER_CHARS = frozenset("0123456789+-.eE")
+
+
+class _JsonStream:
+    """Character buffer over a text file that decodes one JSON value at a time."""
+
+    def __init__(self, handle, chunk_size: int) -> None:
+        self.handle = handle
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.handle.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def next_char(self, consume: bool = True) -> str:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.buffer):
+                char = self.buffer[self.position]
+                self.position += consume
+                return char
+            if not self._fill():
+                return ""
+
+    def value(self):
+        self.next_char(consume=False)
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number cut off by the chunk boundary ("2.5" of "2.5e3") decodes early; read on and retry.
+            cut = end == len(self.buffer) or (
+                isinstance(value, (int, float)) and self.buffer[end] in _NUMBER_CHARS
+            )
+            if cut and self._fill():
+                continue
+            self.position = end
+            return value
+
+
+def iter_json_array(path: str | Path, key: str, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """Yield the items of the top-level ``{"<key>": [...]}`` array incrementally.
+
+    Only one item (plus a read chunk) is held in memory at a time; other top-level keys are
+    decoded and discarded. A missing key yields nothing.
+    """
+    path = Path(path)
+    with path.open("r", encoding="utf-8") as handle:
+        stream = _JsonStream(handle, chunk_size)
+        if stream.next_char() != "{":
+            raise ValueError(f"{path}: expected a JSON object")
+        if stream.next_char(consume=False) == "}":
+            return
+        while True:
+            name = stream.value()
+            if stream.next_char() != ":":
+                raise ValueError(f"{path}: malformed object near key {name!r}")
+            if name == key and stream.next_char(consume=False) == "[":
+                stream.next_char()
+                if stream.next_char(consume=False) == "]":
+                    return
+                while True:
+                    yield stream.value()
+                    separator = stream.next_char()
+                    if separator == "]":
+                        return
+                    if separator != ",":
+                        raise ValueError(f"{path}: malformed array {key!r}")
+            stream.value()
+            separator = stream.next_char()
+            if separator == "}":
+                return
+            if separator != ",":
+                raise ValueError(f"{path}: malformed object after key {name!r}")
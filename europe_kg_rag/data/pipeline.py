@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Union
+
+Action = Union[Sequence[str], Callable[[], None]]
+
+UP_TO_DATE = "up-to-date"
+BUILT = "built"
+FAILED = "failed"
+BLOCKED = "blocked"
+STALE = "stale"
+
+
+@dataclass(slots=True)
+class Stage:
+    """One build step: a command line (or picklable function) with declared inputs and outputs."""
+
+    name: str
+    action: Action
+    inputs: Sequence[str] = ()
+    outputs: Sequence[str] = ()
+    # Optional stages (network, Neo4j, paid APIs) only run when targeted explicitly.
+    optional: bool = False
+    description: str = ""
+
+
+@dataclass(slots=True)
+class StageResult:
+    name: str
+    status: str
+    reason: str = ""
+    seconds: float = 0.0
+
+
+@dataclass(slots=True)
+class BuildReport:
+    results: List[StageResult] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return all(result.status in (UP_TO_DATE, BUILT, STALE) for result in self.results)
+
+
+class FileHasher:
+    """SHA-256 of files and directory trees, reusing digests while size and mtime are unchanged."""
+
+    def __init__(self, cache: Optional[Dict[str, list]] = None) -> None:
+        self.cache: Dict[str, list] = cache if cache is not None else {}
+
+    def digest(self, path: Path) -> Optional[str]:
+        if path.is_dir():
+            combined = hashlib.sha256()
+            for child in sorted(p for p in path.rglob("*") if p.is_file()):
+                combined.update(str(child.relative_to(path)).encode())
+                combined.update((self._file_digest(child) or "").encode())
+            return combined.hexdigest()
+        if path.is_file():
+            return self._file_digest(path)
+        return None
+
+    def _file_digest(self, path: Path) -> str:
+        stat = path.stat()
+        key = str(path)
+        cached = self.cache.get(key)
+        if cached and cached[0] == stat.st_size and cached[1] == stat.st_mtime_ns:
+            return cached[2]
+        sha = hashlib.sha256()
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                sha.update(block)
+        digest = sha.hexdigest()
+        self.cache[key] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest
+
+
+def _covers(output: str, path: str) -> bool:
+    output_path, other = Path(output), Path(path)
+    return output_path == other or output_path in other.parents or other in output_path.parents
+
+
+def _execute(action: Action, cwd: str) -> float:
+    started = time.perf_counter()
+    if callable(action):
+        action()
+    else:
+        subprocess.run(list(action), cwd=cwd, check=True)
+    return time.perf_counter() - started
+
+
+class BuildPipeline:
+    """Make-style runner: a stage reruns only when its inputs, action or outputs changed.
+
+    Dependencies are inferred from paths (a stage depends on whichever stage declares
+    one of its inputs as an output). Independent stages run in parallel worker processes.
+    """
+
+    def __init__(
+        self,
+        stages: Iterable[Stage],
+        manifest_path: str | Path = "data/cache/build_manifest.json",
+        root: str | Path = ".",
+        max_workers: int = 4,
+    ) -> None:
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage name: {stage.name}")
+            self.stages[stage.name] = stage
+        self.root = Path(root)
+        self.manifest_path = self.root / manifest_path
+        self.max_workers = max_workers
+        self.dependencies = self._infer_dependencies()
+        self.order = self._topological_order()
+        self._manifest = self._load_manifest()
+        self._hasher = FileHasher(self._manifest.setdefault("files", {}))
+
+    def _infer_dependencies(self) -> Dict[str, Set[str]]:
+        owners: Dict[str, str] = {}
+        for stage in self.stages.values():
+            for output in stage.outputs:
+                if output in owners:
+                    raise ValueError(f"{output} is produced by both {owners[output]} and {stage.name}")
+                owners[output] = stage.name
+        return {
+            stage.name: {
+                owner
+                for path in stage.inputs
+                for output, owner in owners.items()
+                if owner != stage.name and _covers(output, path)
+            }
+            for stage in self.stages.values()
+        }
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}
+
+        def visit(name: str, trail: List[str]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Stage dependency cycle: {' -> '.join(trail + [name])}")
+            state[name] = 1
+            for dependency in sorted(self.dependencies[name]):
+                visit(dependency, trail + [name])
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, [])
+        return order
+
+    def select(self, targets: Sequence[str] = (), include_optional: bool = False) -> List[str]:
+        """Stages needed for ``targets`` (default: every non-optional stage), in build order."""
+        unknown = [target for target in targets if target not in self.stages]
+        if unknown:
+            raise ValueError(f"Unknown stage(s): {', '.join(unknown)}")
+        roots = list(targets) or [
+            name for name, stage in self.stages.items() if include_optional or not stage.optional
+        ]
+        needed: Set[str] = set()
+        pending = list(roots)
+        while pending:
+            name = pending.pop()
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.dependencies[name])
+        return [name for name in self.order if name in needed]
+
+    def fingerprint(self, stage: Stage) -> tuple[Optional[str], str]:
+        """Hash of the stage's action and inputs, or ``(None, reason)`` when an input is missing."""
+        sha = hashlib.sha256()
+        sha.update(repr(_describe(stage.action)).encode())
+        for path in sorted(stage.inputs):
+            digest = self._hasher.digest(self.root / path)
+            if digest is None:
+                return None, f"missing input {path}"
+            sha.update(path.encode())
+            sha.update(digest.encode())
+        return sha.hexdigest(), ""
+
+    def stale_reason(self, stage: Stage, fingerprint: str) -> str:
+        """Why ``stage`` needs to run, or an empty string when it is up to date."""
+        record = self._manifest.get("stages", {}).get(stage.name)
+        if record is None:
+            return "never built"
+        if record.get("fingerprint") != fingerprint:
+            return "inputs or command changed"
+        for output in stage.outputs:
+            digest = self._hasher.digest(self.root / output)
+            if digest is None:
+                return f"missing output {output}"
+            if record.get("outputs", {}).get(output) != digest:
+                return f"output {output} modified"
+        return ""
+
+    def run(
+        self,
+        targets: Sequence[str] = (),
+        include_optional: bool = False,
+        force: bool = False,
+        dry_run: bool = False,
+        on_result: Callable[[StageResult], None] | None = None,
+    ) -> BuildReport:
+        selected = self.select(targets, include_optional)
+        # ``force`` applies to the named targets only; their dependencies still rebuild only when stale.
+        forced = set(targets or selected) if force else set()
+        report = BuildReport()
+        done: Set[str] = set()
+        rebuilt: Set[str] = set()
+        failed: Set[str] = set()
+        remaining = list(selected)
+        running: Dict[Future, tuple] = {}
+
+        def finish(result: StageResult) -> None:
+            report.results.append(result)
+            if on_result:
+                on_result(result)
+
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            while remaining or running:
+                for name in list(remaining):
+                    dependencies = self.dependencies[name] & set(selected)
+                    if dependencies & failed:
+                        remaining.remove(name)
+                        failed.add(name)
+                        finish(StageResult(name, BLOCKED, f"after {', '.join(sorted(dependencies & failed))}"))
+                        continue
+                    if not dependencies <= done:
+                        continue
+                    remaining.remove(name)
+                    stage = self.stages[name]
+                    fingerprint, reason = self.fingerprint(stage)
+                    if fingerprint is None and not (dry_run and dependencies & rebuilt):
+                        failed.add(name)
+                        finish(StageResult(name, FAILED, reason))
+                        continue
+                    if name in forced:
+                        reason = "forced"
+                    elif fingerprint is not None:
+                        reason = self.stale_reason(stage, fingerprint)
+                    if dry_run and not reason and dependencies & rebuilt:
+                        reason = f"after {', '.join(sorted(dependencies & rebuilt))}"
+                    if not reason:
+                        done.add(name)
+                        finish(StageResult(name, UP_TO_DATE))
+                    elif dry_run:
+                        done.add(name)
+                        rebuilt.add(name)
+                        finish(StageResult(name, STALE, reason))
+                    else:
+                        future = pool.submit(_execute, stage.action, str(self.root))
+                        running[future] = (name, fingerprint, reason)
+
+                if not running:
+                    continue
+                completed, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    name, fingerprint, reason = running.pop(future)
+                    try:
+                        seconds = future.result()
+                    except Exception as exc:
+                        failed.add(name)
+                        finish(StageResult(name, FAILED, str(exc)))
+                        continue
+                    missing = [out for out in self.stages[name].outputs if not (self.root / out).exists()]
+                    if missing:
+                        failed.add(name)
+                        finish(StageResult(name, FAILED, f"did not produce {', '.join(missing)}"))
+                        continue
+                    self._record(self.stages[name], fingerprint)
+                    done.add(name)
+                    rebuilt.add(name)
+                    finish(StageResult(name, BUILT, reason, seconds))
+        return report
+
+    def _record(self, stage: Stage, fingerprint: str) -> None:
+        self._manifest.setdefault("stages", {})[stage.name] = {
+            "fingerprint": fingerprint,
+            "outputs": {output: self._hasher.digest(self.root / output) for output in stage.outputs},
+            "built_at": time.time(),
+        }
+        self._save_manifest()
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {}
+        with self.manifest_path.open(encoding="utf-8") as handle:
+            return json.load(handle)
+
+    def _save_manifest(self) -> None:
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.manifest_path.with_suffix(".tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            json.dump(self._manifest, handle, indent=2, sort_keys=True)
+        os.replace(temporary, self.manifest_path)
+
+
+def _describe(action: Action) -> object:
+    if callable(action):
+        return f"{getattr(action, '__module__', '')}.{getattr(action, '__qualname__', repr(action))}"
+    # The interpreter path differs between environments; it should not invalidate builds.
+    return ["python" if part == sys.executable else part for part in action]
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+TRUE_VALUES = frozenset({"yes", "y", "true", "1"})
+FALSE_VALUES = frozenset({"no", "n", "false", "0", ""})
+ON_ERROR = ("coerce", "skip", "raise")
+
+
+class SchemaError(ValueError):
+    """A record failed validation while ``on_error="raise"``."""
+
+
+@dataclass(slots=True)
+class FieldSpec:
+    """One field: ``kind`` is str, int, float, bool or str_list; ``aliases`` are legacy key names."""
+
+    name: str
+    kind: str = "str"
+    required: bool = False
+    aliases: Tuple[str, ...] = ()
+
+
+def _coerce(kind: str, value: Any) -> Tuple[Any, Optional[str]]:
+    """Cleaned value plus a problem label when ``value`` had to be dropped (loader semantics)."""
+    if kind == "str":
+        return ("", None) if value is None else (str(value).strip(), None)
+    if kind in ("int", "float"):
+        problem = "not an integer" if kind == "int" else "not a number"
+        if value in (None, ""):
+            return None, None
+        if isinstance(value, bool):
+            return None, problem
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            return None, problem
+        if number != number or number in (float("inf"), float("-inf")):
+            return None, problem
+        return (int(number) if kind == "int" else number), None
+    if kind == "bool":
+        if isinstance(value, bool):
+            return value, None
+        if value is None:
+            return False, None
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return True, None
+        return False, (None if text in FALSE_VALUES else "not a boolean")
+    if kind == "str_list":
+        if not value:
+            return [], None
+        if isinstance(value, str):
+            value = [value]
+        elif not isinstance(value, (list, tuple)):
+            return [], "not a list"
+        return [text for text in (str(item).strip() for item in value) if text], None
+    raise ValueError(f"Unknown field kind: {kind}")
+
+
+@dataclass(slots=True)
+class Schema:
+    name: str
+    fields: Tuple[FieldSpec, ...]
+    # Keep keys not declared in ``fields`` (generic entity/relation records carry arbitrary properties).
+    passthrough: bool = False
+
+    def check(self, record: Any) -> Tuple[Dict[str, Any], List[Tuple[str, str]]]:
+        """Cleaned record and its ``(field, problem)`` list; a failed required field empties the value."""
+        if not isinstance(record, dict):
+            return {}, [("<record>", "not an object")]
+        cleaned: Dict[str, Any] = dict(record) if self.passthrough else {}
+        problems: List[Tuple[str, str]] = []
+        for spec in self.fields:
+            raw = record.get(spec.name)
+            for alias in spec.aliases:
+                if raw is None:
+                    raw = record.get(alias)
+                cleaned.pop(alias, None)
+            value, problem = _coerce(spec.kind, raw)
+            if problem is not None:
+                problems.append((spec.name, problem))
+            elif spec.required and value in (None, "", []):
+                problems.append((spec.name, "missing"))
+            cleaned[spec.name] = value
+        return cleaned, problems
+
+
+@dataclass(slots=True)
+class ValidationReport:
+    seen: int = 0
+    accepted: int = 0
+    flagged: int = 0  # records with at least one problem, whether coerced or rejected
+    rejected: int = 0
+    problems: Counter = field(default_factory=Counter)  # (schema, field, problem) -> count
+    samples: List[str] = field(default_factory=list)
+    max_samples: int = 20
+
+    def record(self, schema: str, location: str, problems: List[Tuple[str, str]]) -> None:
+        for field_name, problem in problems:
+            self.problems[(schema, field_name, problem)] += 1
+        if problems and len(self.samples) < self.max_samples:
+            described = ", ".join(f"{name}: {problem}" for name, problem in problems)
+            self.samples.append(f"{location}: {described}")
+
+    def summary(self) -> str:
+        lines = [
+            f"{self.seen} records, {self.accepted} accepted, {self.flagged} with problems, "
+            f"{self.rejected} rejected"
+        ]
+        for (schema, field_name, problem), count in sorted(self.problems.items()):
+            lines.append(f"  {schema}.{field_name}: {problem} x{count}")
+        return "\n".join(lines)
+
+
+def validate_records(
+    records: Iterable[Any],
+    schema: Schema,
+    report: ValidationReport,
+    on_error: str = "coerce",
+    source: str = "",
+) -> Iterator[Dict[str, Any]]:
+    """Check each record against ``schema`` as it streams past, counting problems in ``report``.
+
+    ``coerce`` keeps the record with bad values dropped (a failed required field still rejects it),
+    ``skip`` rejects any record with a problem, ``raise`` stops at the first problem.
+    """
+    if on_error not in ON_ERROR:
+        raise ValueError(f"on_error must be one of {', '.join(ON_ERROR)}")
+    for index, record in enumerate(records):
+        report.seen += 1
+        cleaned, problems = schema.check(record)
+        if problems:
+            report.flagged += 1
+            location = f"{source or schema.name}[{index}]"
+            report.record(schema.name, location, problems)
+            if on_error == "raise":
+                described = ", ".join(f"{name}: {problem}" for name, problem in problems)
+                raise SchemaError(f"{location}: {described}")
+            fatal = any(name == "<record>" or _is_required(schema, name) for name, _ in problems)
+            if on_error == "skip" or fatal:
+                report.rejected += 1
+                continue
+        report.accepted += 1
+        yield cleaned
+
+
+def _is_required(schema: Schema, name: str) -> bool:
+    return any(spec.name == name and spec.required for spec in schema.fields)
+
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+
+def is_identifier(value: str) -> bool:
+    """Safe to splice into Cypher as a label or relationship type."""
+    return bool(_IDENTIFIER.match(value or ""))
+
+
+COUNTRY_SCHEMA = Schema(
+    "country",
+    (
+        FieldSpec("name", required=True),
+        FieldSpec("capital"),
+        FieldSpec("eu_member", "bool"),
+        FieldSpec("borders_with", "str_list"),
+        FieldSpec("population", "int"),
+        FieldSpec("area_km2", "float"),
+        FieldSpec("density", "float"),
+    ),
+)
+RIVER_SCHEMA = Schema(
+    "river",
+    (
+        FieldSpec("name", required=True),
+        FieldSpec("length", "float"),
+        FieldSpec("basin", "float"),
+        FieldSpec("flow", "float"),
+        FieldSpec("mouth", aliases=("mounth",)),  # historical typo in upstream data
+        FieldSpec("parent"),
+        FieldSpec("rank_of_length", "int"),
+        FieldSpec("rank_of_area", "int"),
+        FieldSpec("rank_of_flow", "int"),
+        FieldSpec("countries", "str_list"),
+    ),
+)
+ENTITY_SCHEMA = Schema(
+    "entity", (FieldSpec("id", required=True), FieldSpec("name", required=True)), passthrough=True
+)
+RELATION_SCHEMA = Schema(
+    "relation",
+    (
+        FieldSpec("source_id", required=True),
+        FieldSpec("target_id", required=True),
+        FieldSpec("type", required=True),
+    ),
+    passthrough=True,
+)
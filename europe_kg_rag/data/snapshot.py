@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from .models import Country, GraphDataset, River
+
+SNAPSHOT_MAGIC = b"EKGSNAP\0"
+SNAPSHOT_VERSION = 1
+# magic, format version, section count, SHA-256 of the source files
+_HEADER = struct.Struct("<8sII32s")
+_SECTION = struct.Struct("<QQ")  # byte offset, item count
+_ALIGN = 8
+
+NO_STRING = 0xFFFFFFFF
+NO_INT = np.iinfo(np.int64).min
+
+# Fixed section order; relationship lists are CSR pairs (offsets into a flat array of string ids).
+SECTIONS = (
+    ("string_offsets", "<u4"),
+    ("string_bytes", "u1"),
+    ("country_name", "<u4"),
+    ("country_capital", "<u4"),
+    ("country_eu_member", "u1"),
+    ("country_population", "<i8"),
+    ("country_area_km2", "<f8"),
+    ("country_density", "<f8"),
+    ("country_border_offsets", "<u4"),
+    ("country_borders", "<u4"),
+    ("river_name", "<u4"),
+    ("river_length", "<f8"),
+    ("river_basin", "<f8"),
+    ("river_flow", "<f8"),
+    ("river_mouth", "<u4"),
+    ("river_parent", "<u4"),
+    ("river_rank_of_length", "<i8"),
+    ("river_rank_of_area", "<i8"),
+    ("river_rank_of_flow", "<i8"),
+    ("river_country_offsets", "<u4"),
+    ("river_countries", "<u4"),
+)
+
+
+class SnapshotError(ValueError):
+    """The snapshot is missing, truncated, from another format version, or built from other sources."""
+
+
+def source_digest(paths: Iterable[Path | None], salt: str = "") -> bytes:
+    """SHA-256 over the raw bytes of the source files (no parsing), in the given order."""
+    sha = hashlib.sha256(f"{SNAPSHOT_VERSION}:{salt}".encode())
+    for path in paths:
+        if path is None:
+            continue
+        sha.update(str(path).encode())
+        with Path(path).open("rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                sha.update(block)
+    return sha.digest()
+
+
+class _StringTable:
+    def __init__(self) -> None:
+        self.ids: Dict[str, int] = {}
+        self.values: List[str] = []
+
+    def intern(self, value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        index = self.ids.get(value)
+        if index is None:
+            index = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return index
+
+    def arrays(self) -> tuple[np.ndarray, np.ndarray]:
+        encoded = [value.encode("utf-8") for value in self.values]
+        offsets = np.zeros(len(encoded) + 1, dtype="<u4")
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        return offsets, np.frombuffer(b"".join(encoded), dtype="u1")
+
+
+def _int_column(values: Sequence[Optional[int]]) -> np.ndarray:
+    return np.array([NO_INT if value is None else value for value in values], dtype="<i8")
+
+
+def _float_column(values: Sequence[Optional[float]]) -> np.ndarray:
+    return np.array([np.nan if value is None else value for value in values], dtype="<f8")
+
+
+def _csr(lists: Sequence[List[str]], strings: _StringTable) -> tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(lists) + 1, dtype="<u4")
+    np.cumsum([len(items) for items in lists], out=offsets[1:])
+    values = np.array([strings.intern(item) for items in lists for item in items], dtype="<u4")
+    return offsets, values
+
+
+def write_snapshot(dataset: GraphDataset, path: str | Path, digest: bytes) -> Path:
+    """Serialize ``dataset`` (atomically) with ``digest`` identifying the sources it was built from."""
+    strings = _StringTable()
+    countries, rivers = dataset.countries, dataset.rivers
+    columns: Dict[str, np.ndarray] = {
+        "country_name": np.array([strings.intern(c.name) for c in countries], dtype="<u4"),
+        "country_capital": np.array([strings.intern(c.capital) for c in countries], dtype="<u4"),
+        "country_eu_member": np.array([c.eu_member for c in countries], dtype="u1"),
+        "country_population": _int_column([c.population for c in countries]),
+        "country_area_km2": _float_column([c.area_km2 for c in countries]),
+        "country_density": _float_column([c.density for c in countries]),
+        "river_name": np.array([strings.intern(r.name) for r in rivers], dtype="<u4"),
+        "river_length": _float_column([r.length for r in rivers]),
+        "river_basin": _float_column([r.basin for r in rivers]),
+        "river_flow": _float_column([r.flow for r in rivers]),
+        "river_mouth": np.array([strings.intern(r.mouth) for r in rivers], dtype="<u4"),
+        "river_parent": np.array([strings.intern(r.parent) for r in rivers], dtype="<u4"),
+        "river_rank_of_length": _int_column([r.rank_of_length for r in rivers]),
+        "river_rank_of_area": _int_column([r.rank_of_area for r in rivers]),
+        "river_rank_of_flow": _int_column([r.rank_of_flow for r in rivers]),
+    }
+    columns["country_border_offsets"], columns["country_borders"] = _csr(
+        [c.borders_with for c in countries], strings
+    )
+    columns["river_country_offsets"], columns["river_countries"] = _csr([r.countries for r in rivers], strings)
+    columns["string_offsets"], columns["string_bytes"] = strings.arrays()
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    position = _HEADER.size + _SECTION.size * len(SECTIONS)
+    directory, payloads = [], []
+    for name, dtype in SECTIONS:
+        data = np.ascontiguousarray(columns[name], dtype=dtype)
+        position += -position % _ALIGN
+        directory.append(_SECTION.pack(position, len(data)))
+        payloads.append((position, data.tobytes()))
+        position += data.nbytes
+
+    with temporary.open("wb") as handle:
+        handle.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(SECTIONS), digest))
+        handle.write(b"".join(directory))
+        for offset, payload in payloads:
+            handle.write(b"\0" * (offset - handle.tell()))
+            handle.write(payload)
+    os.replace(temporary, path)
+    return path
+
+
+class GraphSnapshot:
+    """Read-only, memory-mapped view of a snapshot; columns are numpy arrays over the mapping."""
+
+    def __init__(self, path: str | Path, expected_digest: bytes | None = None) -> None:
+        self.path = Path(path)
+        if not self.path.exists() or self.path.stat().st_size < _HEADER.size:
+            raise SnapshotError(f"No snapshot at {self.path}")
+        with self.path.open("rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.columns = self._map_columns(expected_digest)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _map_columns(self, expected_digest: bytes | None) -> Dict[str, np.ndarray]:
+        magic, version, count, digest = _HEADER.unpack_from(self._mmap, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or count != len(SECTIONS):
+            raise SnapshotError(f"{self.path} is not a version {SNAPSHOT_VERSION} dataset snapshot")
+        if expected_digest is not None and digest != expected_digest:
+            raise SnapshotError(f"{self.path} was built from different source files")
+        self.digest = digest
+        if len(self._mmap) < _HEADER.size + _SECTION.size * len(SECTIONS):
+            raise SnapshotError(f"{self.path} is truncated")
+        layout = [
+            _SECTION.unpack_from(self._mmap, _HEADER.size + index * _SECTION.size) for index in range(count)
+        ]
+        # Validate every section before creating views: an open view would keep the mapping from closing.
+        for (offset, items), (_, dtype) in zip(layout, SECTIONS):
+            if offset + items * np.dtype(dtype).itemsize > len(self._mmap):
+                raise SnapshotError(f"{self.path} is truncated")
+        return {
+            name: np.frombuffer(self._mmap, dtype=dtype, count=items, offset=offset)
+            for (offset, items), (name, dtype) in zip(layout, SECTIONS)
+        }
+
+    def strings(self) -> List[str]:
+        offsets = self.columns["string_offsets"].tolist()
+        data = self.columns["string_bytes"].tobytes()
+        return [data[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+    def to_dataset(self) -> GraphDataset:
+        """Materialize the dataclasses; values are already cleaned, so this is pure decoding."""
+        strings = self.strings()
+        c, r = {}, {}
+        for name, array in self.columns.items():
+            kind, column = name.split("_", 1)
+            if kind in ("country", "river"):
+                (c if kind == "country" else r)[column] = array.tolist()
+
+        def text(index: int) -> Optional[str]:
+            return None if index == NO_STRING else strings[index]
+
+        def whole(value: int) -> Optional[int]:
+            return None if value == NO_INT else value
+
+        def real(value: float) -> Optional[float]:
+            return None if value != value else value  # NaN marks a missing value
+
+        def lists(offsets: List[int], values: List[int]) -> List[List[str]]:
+            return [[strings[i] for i in values[start:end]] for start, end in zip(offsets, offsets[1:])]
+
+        borders = lists(c["border_offsets"], c["borders"])
+        countries = [
+            Country(
+                name=strings[c["name"][i]],
+                capital=strings[c["capital"][i]],
+                eu_member=bool(c["eu_member"][i]),
+                borders_with=borders[i],
+                population=whole(c["population"][i]),
+                area_km2=real(c["area_km2"][i]),
+                density=real(c["density"][i]),
+            )
+            for i in range(len(c["name"]))
+        ]
+        river_countries = lists(r["country_offsets"], r["countries"])
+        rivers = [
+            River(
+                name=strings[r["name"][i]],
+                length=real(r["length"][i]),
+                basin=real(r["basin"][i]),
+                flow=real(r["flow"][i]),
+                mouth=text(r["mouth"][i]),
+                parent=text(r["parent"][i]),
+                rank_of_length=whole(r["rank_of_length"][i]),
+                rank_of_area=whole(r["rank_of_area"][i]),
+                rank_of_flow=whole(r["rank_of_flow"][i]),
+                countries=river_countries[i],
+            )
+            for i in range(len(r["name"]))
+        ]
+        return GraphDataset(countries=countries, rivers=rivers)
+
+    def close(self) -> None:
+        self.columns = {}  # drop the views before unmapping
+        self._mmap.close()
+
+    def __enter__(self) -> "GraphSnapshot":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+
+import requests
+
+WIKIPEDIA_API_URL = "https://en.wikipedia.org/w/api.php"
+RETRYABLE_STATUS = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` requests per second with bursts of up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a token is available; returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+@dataclass(slots=True)
+class WikipediaPage:
+    title: str
+    exists: bool = False
+    resolved_title: str = ""
+    summary: str = ""
+    text: str = ""
+    error: Optional[str] = None
+    from_cache: bool = False
+
+
+class FetchError(RuntimeError):
+    """A page request failed after all retries (or with a non-retryable status)."""
+
+
+class PageCache:
+    """SQLite cache of parsed page responses keyed by (mode, title)."""
+
+    def __init__(self, path: str | Path = "data/cache/wikipedia_pages.sqlite") -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def get(self, key: str) -> Optional[WikipediaPage]:
+        with self._lock:
+            row = self._connection.execute("SELECT payload FROM pages WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        page = WikipediaPage(**json.loads(row[0]))
+        page.from_cache = True
+        return page
+
+    def put(self, key: str, page: WikipediaPage) -> None:
+        payload = json.dumps({name: value for name, value in asdict(page).items() if name != "from_cache"})
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO pages (key, payload, fetched_at) VALUES (?, ?, ?)",
+                (key, payload, time.time()),
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+class WikipediaFetcher:
+    """Concurrent, rate-limited MediaWiki extracts client with retries and an on-disk page cache.
+
+    ``api_url`` can point at any server speaking the ``action=query&prop=extracts`` API
+    (for example a local stub in tests).
+    """
+
+    def __init__(
+        self,
+        api_url: str = WIKIPEDIA_API_URL,
+        user_agent: str = "MyCoolAIResearch/1.0 (phongdntvn@gmail.com)",
+        rate_per_second: float = 5.0,
+        max_concurrency: int = 4,
+        max_retries: int = 4,
+        backoff_seconds: float = 0.5,
+        timeout: float = 20.0,
+        cache: PageCache | None = None,
+    ) -> None:
+        self.api_url = api_url
+        self.user_agent = user_agent
+        self.bucket = TokenBucket(rate_per_second)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.cache = cache
+        self.requests_sent = 0
+        self.retries = 0
+        self._sessions = threading.local()
+        self._counter_lock = threading.Lock()
+
+    def fetch(self, title: str, full: bool = False) -> WikipediaPage:
+        """Plain-text summary (``full=False``) or whole article of ``title``, following redirects."""
+        key = f"{'full' if full else 'intro'}:{title}"
+        if self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        page = self._parse(title, self._request(title, full), full)
+        if self.cache is not None:
+            self.cache.put(key, page)
+        return page
+
+    def fetch_many(self, titles: Iterable[str], full: bool = False) -> Iterator[WikipediaPage]:
+        """Yield pages as they complete; failures come back with ``error`` set instead of raising."""
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            futures = {executor.submit(self.fetch, title, full): title for title in titles}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as exc:
+                    yield WikipediaPage(title=futures[future], error=f"{type(exc).__name__}: {exc}")
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._sessions, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers["User-Agent"] = self.user_agent
+            self._sessions.session = session
+        return session
+
+    def _request(self, title: str, full: bool) -> dict:
+        params = {
+            "action": "query",
+            "format": "json",
+            "formatversion": "2",
+            "prop": "extracts",
+            "explaintext": "1",
+            "redirects": "1",
+            "titles": title,
+        }
+        if not full:
+            params["exintro"] = "1"
+
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            with self._counter_lock:
+                self.requests_sent += 1
+            retry_after: Optional[float] = None
+            try:
+                response = self._session().get(self.api_url, params=params, timeout=self.timeout)
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRYABLE_STATUS:
+                    raise FetchError(f"{title}: HTTP {response.status_code}")
+                failure = f"HTTP {response.status_code}"
+                retry_after = _retry_after(response.headers.get("Retry-After"))
+            except (requests.ConnectionError, requests.Timeout, ValueError) as exc:
+                failure = f"{type(exc).__name__}: {exc}"
+            if attempt == self.max_retries:
+                raise FetchError(f"{title}: {failure} after {self.max_retries + 1} attempts")
+            with self._counter_lock:
+                self.retries += 1
+            backoff = self.backoff_seconds * (2 ** attempt) * (1 + random.random() * 0.25)
+            time.sleep(max(backoff, retry_after or 0.0))
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def _parse(title: str, payload: dict, full: bool) -> WikipediaPage:
+        pages = payload.get("query", {}).get("pages", [])
+        if isinstance(pages, dict):  # formatversion=1 servers
+            pages = list(pages.values())
+        if not pages or pages[0].get("missing") or pages[0].get("invalid"):
+            return WikipediaPage(title=title, exists=False)
+        page = pages[0]
+        text = page.get("extract", "") or ""
+        summary = text.split("\n\n==", 1)[0].strip() if full else text.strip()
+        return WikipediaPage(
+            title=title,
+            exists=bool(text),
+            resolved_title=page.get("title", title),
+            summary=summary,
+            text=text,
+        )
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass(slots=True)
+class CorpusBuildReport:
+    written: int = 0
+    fetched: int = 0
+    cached: int = 0
+    resumed: int = 0
+    missing: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed
+
+
+class CorpusBuilder:
+    """Fetch pages for many entities and build a JSON corpus incrementally, resuming after failures.
+
+    Each finished entity is appended to ``<output>.partial.jsonl``; the checkpoint records the
+    byte offset that is known to be complete. The final JSON array (in entity order) is only
+    written once every entity has been fetched, then the staging files are removed.
+    """
+
+    def __init__(
+        self,
+        fetcher: WikipediaFetcher,
+        make_records: Callable[[str, WikipediaPage], List[dict]],
+        full: bool = False,
+        checkpoint_every: int = 10,
+    ) -> None:
+        self.fetcher = fetcher
+        self.make_records = make_records
+        self.full = full
+        self.checkpoint_every = max(1, checkpoint_every)
+
+    def build(
+        self,
+        entities: Sequence[str],
+        output_path: str | Path,
+        on_page: Callable[[WikipediaPage, int], None] | None = None,
+    ) -> CorpusBuildReport:
+        output_path = Path(output_path)
+        partial_path = Path(f"{output_path}.partial.jsonl")
+        checkpoint_path = Path(f"{output_path}.checkpoint")
+        report = CorpusBuildReport()
+
+        offset = self._load_checkpoint(checkpoint_path, output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        mode = "r+b" if offset is not None and partial_path.exists() else "wb"
+        with partial_path.open(mode) as partial:
+            done = set()
+            if mode == "r+b":
+                # Anything after the checkpoint may be a half-written line from a crash.
+                partial.truncate(offset)
+                partial.seek(0)
+                done = {json.loads(line)["entity"] for line in partial.read().decode("utf-8").splitlines()}
+                report.resumed = len(done)
+            pending = [entity for entity in dict.fromkeys(entities) if entity not in done]
+
+            since_checkpoint = 0
+            for page in self.fetcher.fetch_many(pending, full=self.full):
+                if page.error is not None:
+                    report.failed.append(page.title)
+                    continue
+                records = self.make_records(page.title, page) if page.exists else []
+                if not page.exists:
+                    report.missing.append(page.title)
+                if page.from_cache:
+                    report.cached += 1
+                else:
+                    report.fetched += 1
+                line = {"entity": page.title, "records": records}
+                partial.write((json.dumps(line, ensure_ascii=False) + "\n").encode("utf-8"))
+                if on_page:
+                    on_page(page, len(records))
+                since_checkpoint += 1
+                if since_checkpoint >= self.checkpoint_every:
+                    self._save_checkpoint(checkpoint_path, output_path, partial)
+                    since_checkpoint = 0
+            self._save_checkpoint(checkpoint_path, output_path, partial)
+
+        if report.failed:
+            return report
+
+        records_by_entity = {}
+        with partial_path.open("r", encoding="utf-8") as partial:
+            for line in partial:
+                item = json.loads(line)
+                records_by_entity[item["entity"]] = item["records"]
+        corpus = [
+            record for entity in dict.fromkeys(entities) for record in records_by_entity.get(entity, [])
+        ]
+        temporary = output_path.with_suffix(output_path.suffix + ".tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            json.dump(corpus, handle, indent=4, ensure_ascii=False)
+        os.replace(temporary, output_path)
+        partial_path.unlink()
+        checkpoint_path.unlink()
+        report.written = len(corpus)
+        return report
+
+    def _load_checkpoint(self, checkpoint_path: Path, output_path: Path) -> Optional[int]:
+        if not checkpoint_path.exists():
+            return None
+        with checkpoint_path.open("r", encoding="utf-8") as handle:
+            checkpoint = json.load(handle)
+        if checkpoint.get("output") != str(output_path) or checkpoint.get("full") != self.full:
+            raise ValueError(
+                f"Checkpoint {checkpoint_path} belongs to a different run; remove it to start over."
+            )
+        return checkpoint["offset"]
+
+    def _save_checkpoint(self, checkpoint_path: Path, output_path: Path, partial) -> None:
+        partial.flush()
+        os.fsync(partial.fileno())
+        temporary = checkpoint_path.with_suffix(checkpoint_path.suffix + ".tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            json.dump({"output": str(output_path), "full": self.full, "offset": partial.tell()}, handle)
+        os.replace(temporary, checkpoint_path)
@@ -0,0 +1,36 @@
+"""
+Batch experiment tooling for running retrieval strategies over question sets.
+"""
+
+from .batch import BatchAnswer, BatchAnswerer, BatchQuestion, iter_questions, prefetch_backends
+from .evaluation import (
+    EvalRecord,
+    EvalSummary,
+    LabelledQuestion,
+    RetrievalEvaluator,
+    evaluate_configurations,
+    load_labelled_questions,
+    summarize,
+)
+from .limits import ConcurrencyLimits, ThrottledBackend
+from .runner import ExperimentResult, ExperimentRunner, write_results
+
+__all__ = [
+    "BatchAnswer",
+    "BatchAnswerer",
+    "BatchQuestion",
+    "ConcurrencyLimits",
+    "EvalRecord",
+    "EvalSummary",
+    "ExperimentResult",
+    "ExperimentRunner",
+    "LabelledQuestion",
+    "RetrievalEvaluator",
+    "ThrottledBackend",
+    "evaluate_configurations",
+    "iter_questions",
+    "load_labelled_questions",
+    "prefetch_backends",
+    "summarize",
+    "write_results",
+]
@@ -0,0 +1,336 @@
+from __future__ import annotations
+
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from europe_kg_rag.generation import ContextAssembler
+from europe_kg_rag.graph.queries import NEIGHBOUR_QUERY
+from europe_kg_rag.observability import span, trace_request
+from europe_kg_rag.retrieval.router import default_router
+from europe_kg_rag.retrieval.strategies import STRATEGIES, RetrievalBackends, run_strategy
+
+from .runner import generation_error
+
+# Which backends each strategy reads from directly for the raw question; only
+# those are prefetched in bulk for a batch.
+_STRATEGY_BACKENDS: Dict[str, frozenset] = {
+    "KG-Only": frozenset({"kg"}),
+    "Text-Only": frozenset({"text"}),
+    "Hybrid-Naive": frozenset({"kg", "text"}),
+    "Entity-Driven": frozenset({"kg"}),
+    "Hybrid-Fusion": frozenset({"kg", "text"}),
+}
+
+
+@dataclass(slots=True)
+class BatchQuestion:
+    id: str
+    question: str
+
+
+@dataclass(slots=True)
+class BatchAnswer:
+    id: str
+    question: str
+    strategy: str
+    context: str = ""
+    answer: str = ""
+    context_tokens: int = 0
+    error: Optional[str] = None
+    trace_id: Optional[str] = None
+
+
+def iter_questions(
+    path: str | Path,
+    question_field: str = "question",
+    id_field: str = "id",
+    start_offset: int = 0,
+) -> Iterator[Tuple[Optional[BatchQuestion], int]]:
+    """Stream ``(question, end_offset)`` pairs from a JSONL file, one line at a time.
+
+    Blank or unusable lines yield ``None`` so callers can still advance their checkpoint.
+    """
+    with Path(path).open("rb") as handle:
+        handle.seek(start_offset)
+        while True:
+            line_start = handle.tell()
+            raw = handle.readline()
+            if not raw:
+                break
+            offset = handle.tell()
+            text = raw.decode("utf-8").strip()
+            if not text:
+                yield None, offset
+                continue
+            try:
+                payload = json.loads(text)
+            except json.JSONDecodeError:
+                print(f"Skipping malformed JSON at byte {line_start} of {path}")
+                yield None, offset
+                continue
+            question = payload.get(question_field) if isinstance(payload, dict) else None
+            if not question:
+                yield None, offset
+                continue
+            question_id = payload.get(id_field)
+            if question_id is None:
+                question_id = f"byte:{line_start}"
+            yield BatchQuestion(id=str(question_id), question=str(question)), offset
+
+
+class _PrefetchedExtractor:
+    def __init__(self, extractor, labelled: Dict[str, List[Tuple[str, Optional[str]]]]) -> None:
+        self._extractor = extractor
+        self._labelled = labelled
+
+    def extract_entities(self, text: str) -> List[str]:
+        cached = self._labelled.get(text)
+        if cached is not None:
+            return [name for name, _ in cached]
+        return self._extractor.extract_entities(text)
+
+    def extract_labelled_entities(self, text: str) -> List[Tuple[str, Optional[str]]]:
+        cached = self._labelled.get(text)
+        if cached is not None:
+            return list(cached)
+        if hasattr(self._extractor, "extract_labelled_entities"):
+            return self._extractor.extract_labelled_entities(text)
+        return [(name, None) for name in self._extractor.extract_entities(text)]
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._extractor, name)
+
+
+class _PrefetchedKnowledgeGraph:
+    def __init__(self, kg_querier, neighbours: Dict[str, List[dict]]) -> None:
+        self._kg_querier = kg_querier
+        self._neighbours = neighbours
+
+    def query(self, cypher_query: str, parameters: dict | None = None) -> list[dict]:
+        entity = (parameters or {}).get("entity")
+        if cypher_query == NEIGHBOUR_QUERY and entity in self._neighbours:
+            return [dict(record) for record in self._neighbours[entity]]
+        return self._kg_querier.query(cypher_query, parameters)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._kg_querier, name)
+
+
+class _PrefetchedVectors:
+    def __init__(self, vector_retriever, documents: Dict[Tuple[str, int], List[dict]]) -> None:
+        self._vector_retriever = vector_retriever
+        self._documents = documents
+
+    def retrieve(self, query_text: str, k: int = 5) -> List[dict]:
+        cached = self._documents.get((query_text, k))
+        return list(cached) if cached is not None else self._vector_retriever.retrieve(query_text, k=k)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._vector_retriever, name)
+
+
+def prefetch_backends(
+    backends: RetrievalBackends, strategy: str, texts: List[str], k: int = 5
+) -> RetrievalBackends:
+    """Resolve a batch's entity, KG and vector lookups with one bulk call per backend.
+
+    The returned backends answer those lookups from memory and fall through to the
+    real ones for anything else, so ``run_strategy`` can be called per question.
+    For ``Auto`` each question is routed first and only its route's backends are prefetched.
+    """
+    extractor = backends.entity_extractor
+    kg_querier = backends.kg_querier
+    vector_retriever = backends.vector_retriever
+
+    labelled: List[List[Tuple[str, Optional[str]]]] = []
+    if strategy == "Auto" or "kg" in _STRATEGY_BACKENDS.get(strategy, frozenset()):
+        labelled = _extract_batch(extractor, texts)
+        extractor = _PrefetchedExtractor(extractor, dict(zip(texts, labelled)))
+
+    if strategy == "Auto":
+        routes = [default_router.classify(text, entities).strategy for text, entities in zip(texts, labelled)]
+    else:
+        routes = [strategy] * len(texts)
+    needs = [_STRATEGY_BACKENDS.get(route, frozenset()) for route in routes]
+
+    if hasattr(kg_querier, "query_neighbours_batch"):
+        all_entities = [
+            name
+            for entities, need in zip(labelled, needs)
+            if "kg" in need
+            for name, _ in entities
+        ]
+        if all_entities:
+            kg_querier = _PrefetchedKnowledgeGraph(
+                kg_querier, kg_querier.query_neighbours_batch(all_entities)
+            )
+
+    if hasattr(vector_retriever, "retrieve_batch"):
+        unique_texts = list(dict.fromkeys(text for text, need in zip(texts, needs) if "text" in need))
+        if unique_texts:
+            documents = vector_retriever.retrieve_batch(unique_texts, k=k)
+            vector_retriever = _PrefetchedVectors(
+                vector_retriever,
+                {(text, k): docs for text, docs in zip(unique_texts, documents)},
+            )
+
+    return RetrievalBackends(
+        kg_querier=kg_querier,
+        vector_retriever=vector_retriever,
+        entity_extractor=extractor,
+        geo_index=backends.geo_index,
+        attribute_store=backends.attribute_store,
+        river_network=backends.river_network,
+    )
+
+
+def _extract_batch(extractor, texts: List[str]) -> List[List[Tuple[str, Optional[str]]]]:
+    if hasattr(extractor, "extract_labelled_entities_batch"):
+        return extractor.extract_labelled_entities_batch(texts)
+    if hasattr(extractor, "extract_entities_batch"):
+        entity_lists = extractor.extract_entities_batch(texts)
+    else:
+        entity_lists = [extractor.extract_entities(text) for text in texts]
+    return [[(name, None) for name in entities] for entities in entity_lists]
+
+
+class BatchAnswerer:
+    """Answer a JSONL question file through one strategy with resumable checkpoints."""
+
+    def __init__(
+        self,
+        backends: RetrievalBackends,
+        generate: Callable[[object, str], str],
+        strategy: str,
+        assembler: ContextAssembler | None = None,
+        batch_size: int = 16,
+        generation_workers: int = 4,
+        k: int = 5,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown model name: {strategy}")
+        self.backends = backends
+        self.generate = generate
+        self.strategy = strategy
+        self.assembler = assembler
+        self.batch_size = batch_size
+        self.generation_workers = generation_workers
+        self.k = k
+
+    def run(
+        self,
+        input_path: str | Path,
+        output_path: str | Path,
+        checkpoint_path: str | Path | None = None,
+        question_field: str = "question",
+        id_field: str = "id",
+    ) -> int:
+        """Process ``input_path`` and append answers to ``output_path``; returns answers written."""
+        output_path = Path(output_path)
+        checkpoint_path = Path(checkpoint_path or f"{output_path}.checkpoint")
+        checkpoint = self._load_checkpoint(checkpoint_path, input_path, output_path)
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        mode = "r+b" if checkpoint else "wb"
+        written = 0
+        with output_path.open(mode) as output:
+            if mode == "r+b":
+                # Drop anything written after the last checkpoint (e.g. a half-flushed batch).
+                output.truncate(checkpoint["output_offset"])
+                output.seek(checkpoint["output_offset"])
+
+            pending: List[BatchQuestion] = []
+            input_offset = checkpoint["input_offset"] if checkpoint else 0
+            questions = iter_questions(
+                input_path, question_field, id_field, start_offset=input_offset
+            )
+            for question, input_offset in questions:
+                if question is not None:
+                    pending.append(question)
+                if len(pending) >= self.batch_size:
+                    written += self._flush(pending, output)
+                    pending = []
+                    self._save_checkpoint(checkpoint_path, input_path, input_offset, output.tell())
+            written += self._flush(pending, output)
+            self._save_checkpoint(checkpoint_path, input_path, input_offset, output.tell())
+        return written
+
+    def answer_batch(self, questions: List[BatchQuestion]) -> List[BatchAnswer]:
+        with span("batch.prefetch", size=len(questions)):
+            backends = self._prefetch([question.question for question in questions])
+        with ThreadPoolExecutor(max_workers=max(1, self.generation_workers)) as executor:
+            return list(executor.map(lambda question: self._answer(question, backends), questions))
+
+    def _flush(self, questions: List[BatchQuestion], output) -> int:
+        if not questions:
+            return 0
+        for answer in self.answer_batch(questions):
+            output.write((json.dumps(asdict(answer), ensure_ascii=False) + "\n").encode("utf-8"))
+        output.flush()
+        os.fsync(output.fileno())
+        return len(questions)
+
+    def _answer(self, question: BatchQuestion, backends: RetrievalBackends) -> BatchAnswer:
+        answer = BatchAnswer(id=question.id, question=question.question, strategy=self.strategy)
+        with trace_request() as trace_id:
+            answer.trace_id = trace_id
+            self._fill_answer(answer, backends)
+        return answer
+
+    def _fill_answer(self, answer: BatchAnswer, backends: RetrievalBackends) -> None:
+        try:
+            context = run_strategy(self.strategy, answer.question, backends)
+            prompt_context: object = context
+            answer.context = context
+            if self.assembler is not None:
+                assembled = self.assembler.assemble_text(context)
+                prompt_context = assembled
+                answer.context = assembled.text
+                answer.context_tokens = assembled.total_tokens
+            generated = self.generate(prompt_context, answer.question)
+            answer.error = generation_error(generated)
+            if answer.error is None:
+                answer.answer = generated
+        except Exception as exc:  # keep going; the error is recorded with the question
+            answer.error = f"{type(exc).__name__}: {exc}"
+
+    def _prefetch(self, texts: List[str]) -> RetrievalBackends:
+        return prefetch_backends(self.backends, self.strategy, texts, k=self.k)
+
+    def _load_checkpoint(
+        self, checkpoint_path: Path, input_path: str | Path, output_path: Path
+    ) -> Optional[dict]:
+        if not checkpoint_path.exists():
+            return None
+        with checkpoint_path.open("r", encoding="utf-8") as handle:
+            checkpoint = json.load(handle)
+        if checkpoint.get("input") != str(input_path) or checkpoint.get("strategy") != self.strategy:
+            raise ValueError(
+                f"Checkpoint {checkpoint_path} belongs to a different run; remove it to start over."
+            )
+        size = output_path.stat().st_size if output_path.exists() else -1
+        if size < checkpoint.get("output_offset", 0):
+            # Resuming would skip every question whose answer was in the lost output.
+            print(f"{output_path} is missing or shorter than its checkpoint; starting over.")
+            return None
+        return checkpoint
+
+    def _save_checkpoint(
+        self, checkpoint_path: Path, input_path: str | Path, input_offset: int, output_offset: int
+    ) -> None:
+        temporary = checkpoint_path.with_suffix(checkpoint_path.suffix + ".tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    "input": str(input_path),
+                    "strategy": self.strategy,
+                    "input_offset": input_offset,
+                    "output_offset": output_offset,
+                },
+                handle,
+            )
+        os.replace(temporary, checkpoint_path)
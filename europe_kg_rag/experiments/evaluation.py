@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import json
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+from europe_kg_rag.generation import ContextAssembler
+from europe_kg_rag.generation.context import KG_SECTION, parse_context, parse_kg_fact, strip_tag
+from europe_kg_rag.retrieval.strategies import RetrievalBackends, run_strategy
+
+
+@dataclass(slots=True)
+class LabelledQuestion:
+    id: str
+    question: str
+    expected_entities: List[str] = field(default_factory=list)
+    expected_facts: List[tuple] = field(default_factory=list)
+    expected_doc_ids: List[str] = field(default_factory=list)
+
+
+@dataclass(slots=True)
+class EvalRecord:
+    question_id: str
+    strategy: str
+    config: str
+    doc_recall_at_k: Optional[float]
+    mrr: Optional[float]
+    fact_recall: Optional[float]
+    entity_recall: Optional[float]
+    context_precision: Optional[float]
+    latency_ms: float
+    prompt_tokens: int
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class EvalSummary:
+    strategy: str
+    config: str
+    questions: int
+    doc_recall_at_k: Optional[float]
+    mrr: Optional[float]
+    fact_recall: Optional[float]
+    entity_recall: Optional[float]
+    context_precision: Optional[float]
+    latency_p50_ms: float
+    latency_p95_ms: float
+    mean_prompt_tokens: float
+    errors: int
+
+
+def load_labelled_questions(path: str | Path) -> List[LabelledQuestion]:
+    """Read a JSONL question set (see ``data/eval/questions.jsonl`` for the schema)."""
+    questions: List[LabelledQuestion] = []
+    with Path(path).open("r", encoding="utf-8") as handle:
+        for line_number, line in enumerate(handle, start=1):
+            if not line.strip():
+                continue
+            payload = json.loads(line)
+            questions.append(
+                LabelledQuestion(
+                    id=str(payload.get("id", line_number)),
+                    question=payload["question"],
+                    expected_entities=list(payload.get("expected_entities", [])),
+                    expected_facts=[
+                        (fact["source"], fact["relation"].upper(), fact["target"])
+                        for fact in payload.get("expected_facts", [])
+                    ],
+                    expected_doc_ids=list(payload.get("expected_doc_ids", [])),
+                )
+            )
+    return questions
+
+
+def _fact_key(source: str, relation: str, target: str) -> tuple:
+    return (relation.upper(), frozenset((source.lower(), target.lower())))
+
+
+class RetrievalEvaluator:
+    """Score strategies on recall@k, MRR and context precision against labelled questions."""
+
+    def __init__(
+        self,
+        backends: RetrievalBackends,
+        assembler: ContextAssembler | None = None,
+        k: int = 5,
+    ) -> None:
+        self.backends = backends
+        self.assembler = assembler or ContextAssembler()
+        self.k = k
+        corpus = getattr(backends.vector_retriever, "corpus", [])
+        # Passage corpora link each record back to its entity; expected doc ids are entities.
+        self._doc_ids_by_text = {
+            doc["text"].strip(): str(doc.get("entity", doc["id"])) for doc in corpus
+        }
+
+    def warm_up(self, questions: Sequence[LabelledQuestion]) -> None:
+        """Embed every question in one batch so per-strategy lookups hit the embedding cache."""
+        embedder = getattr(self.backends.vector_retriever, "embedder", None)
+        if embedder is not None and questions:
+            embedder.embed([question.question for question in questions], "RETRIEVAL_QUERY")
+
+    def evaluate(
+        self,
+        questions: Sequence[LabelledQuestion],
+        strategies: Iterable[str],
+        config: str = "default",
+    ) -> List[EvalRecord]:
+        records: List[EvalRecord] = []
+        for strategy in strategies:
+            for question in questions:
+                records.append(self._evaluate_one(question, strategy, config))
+        return records
+
+    def _evaluate_one(self, question: LabelledQuestion, strategy: str, config: str) -> EvalRecord:
+        started = time.perf_counter()
+        try:
+            context = run_strategy(strategy, question.question, self.backends)
+        except Exception as exc:  # score the failure as zero recall rather than aborting the run
+            return EvalRecord(
+                question_id=question.id, strategy=strategy, config=config,
+                doc_recall_at_k=0.0 if question.expected_doc_ids else None,
+                mrr=0.0 if question.expected_doc_ids else None,
+                fact_recall=0.0 if question.expected_facts else None,
+                entity_recall=0.0 if question.expected_entities else None,
+                context_precision=None,
+                latency_ms=(time.perf_counter() - started) * 1000.0,
+                prompt_tokens=0,
+                error=f"{type(exc).__name__}: {exc}",
+            )
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        assembled = self.assembler.assemble_text(context)
+
+        items = parse_context(context)
+        doc_ids = [
+            self._doc_ids_by_text.get(strip_tag(item.text))
+            for item in items
+            if item.section != KG_SECTION
+        ]
+        facts = {
+            _fact_key(*fact)
+            for item in items
+            if item.section == KG_SECTION and (fact := parse_kg_fact(item.text))
+        }
+        return EvalRecord(
+            question_id=question.id,
+            strategy=strategy,
+            config=config,
+            doc_recall_at_k=self._doc_recall(question, doc_ids),
+            mrr=self._mrr(question, doc_ids),
+            fact_recall=self._fact_recall(question, facts),
+            entity_recall=self._entity_recall(question, context),
+            context_precision=self._context_precision(question, items),
+            latency_ms=latency_ms,
+            prompt_tokens=assembled.total_tokens,
+        )
+
+    def _doc_recall(self, question: LabelledQuestion, doc_ids: List[Optional[str]]) -> Optional[float]:
+        if not question.expected_doc_ids:
+            return None
+        retrieved = {doc_id for doc_id in doc_ids[: self.k] if doc_id}
+        return len(retrieved & set(question.expected_doc_ids)) / len(set(question.expected_doc_ids))
+
+    def _mrr(self, question: LabelledQuestion, doc_ids: List[Optional[str]]) -> Optional[float]:
+        if not question.expected_doc_ids:
+            return None
+        expected = set(question.expected_doc_ids)
+        for rank, doc_id in enumerate(doc_ids[: self.k], start=1):
+            if doc_id in expected:
+                return 1.0 / rank
+        return 0.0
+
+    @staticmethod
+    def _fact_recall(question: LabelledQuestion, facts: set) -> Optional[float]:
+        if not question.expected_facts:
+            return None
+        expected = {_fact_key(*fact) for fact in question.expected_facts}
+        return len(expected & facts) / len(expected)
+
+    @staticmethod
+    def _entity_recall(question: LabelledQuestion, context: str) -> Optional[float]:
+        if not question.expected_entities:
+            return None
+        lowered = context.lower()
+        found = sum(1 for entity in question.expected_entities if entity.lower() in lowered)
+        return found / len(question.expected_entities)
+
+    def _context_precision(self, question: LabelledQuestion, items) -> Optional[float]:
+        if not items:
+            return None
+        expected_docs = set(question.expected_doc_ids)
+        expected_facts = {_fact_key(*fact) for fact in question.expected_facts}
+        entities = [entity.lower() for entity in question.expected_entities]
+        relevant = 0
+        for item in items:
+            if item.section == KG_SECTION:
+                fact = parse_kg_fact(item.text)
+                hit = fact is not None and _fact_key(*fact) in expected_facts
+            else:
+                hit = self._doc_ids_by_text.get(strip_tag(item.text)) in expected_docs
+            if not hit and not expected_facts and item.section == KG_SECTION:
+                # Without labelled facts, a KG fact counts when it touches an expected entity.
+                lowered = item.text.lower()
+                hit = any(entity in lowered for entity in entities)
+            relevant += hit
+        return relevant / len(items)
+
+
+def evaluate_configurations(
+    configurations: Mapping[str, RetrievalBackends],
+    questions: Sequence[LabelledQuestion],
+    strategies: Iterable[str],
+    assembler: ContextAssembler | None = None,
+    k: int = 5,
+) -> List[EvalRecord]:
+    """Run every strategy against every backend configuration (e.g. one per FAISS index)."""
+    strategies = list(strategies)
+    records: List[EvalRecord] = []
+    for name, backends in configurations.items():
+        evaluator = RetrievalEvaluator(backends, assembler=assembler, k=k)
+        evaluator.warm_up(questions)
+        records.extend(evaluator.evaluate(questions, strategies, config=name))
+    return records
+
+
+def _mean(values: Iterable[Optional[float]]) -> Optional[float]:
+    present = [value for value in values if value is not None]
+    return statistics.fmean(present) if present else None
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, round(q / 100.0 * (len(ordered) - 1)))]
+
+
+def summarize(records: Iterable[EvalRecord]) -> List[EvalSummary]:
+    grouped: Dict[tuple, List[EvalRecord]] = {}
+    for record in records:
+        grouped.setdefault((record.strategy, record.config), []).append(record)
+
+    summaries: List[EvalSummary] = []
+    for (strategy, config), group in grouped.items():
+        latencies = [record.latency_ms for record in group]
+        summaries.append(
+            EvalSummary(
+                strategy=strategy,
+                config=config,
+                questions=len(group),
+                doc_recall_at_k=_mean(record.doc_recall_at_k for record in group),
+                mrr=_mean(record.mrr for record in group),
+                fact_recall=_mean(record.fact_recall for record in group),
+                entity_recall=_mean(record.entity_recall for record in group),
+                context_precision=_mean(record.context_precision for record in group),
+                latency_p50_ms=_percentile(latencies, 50),
+                latency_p95_ms=_percentile(latencies, 95),
+                mean_prompt_tokens=statistics.fmean(record.prompt_tokens for record in group),
+                errors=sum(1 for record in group if record.error),
+            )
+        )
+    return summaries
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+
+@dataclass(slots=True)
+class ConcurrencyLimits:
+    gemini: int = 4
+    embeddings: int = 8
+    neo4j: int = 8
+    extraction: int = 1
+
+
+class ThrottledBackend:
+    """Proxy that caps how many threads may call selected methods of a backend at once."""
+
+    def __init__(self, backend: Any, limit: int, methods: Iterable[str]) -> None:
+        if limit <= 0:
+            raise ValueError("limit must be positive.")
+        self._backend = backend
+        self._methods = frozenset(methods)
+        self._semaphore = threading.BoundedSemaphore(limit)
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._backend, name)
+        if name not in self._methods or not callable(attribute):
+            return attribute
+
+        def guarded(*args, **kwargs):
+            with self._semaphore:
+                return attribute(*args, **kwargs)
+
+        return guarded
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import csv
+import json
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+from europe_kg_rag.generation import ContextAssembler
+from europe_kg_rag.observability import trace_request
+from europe_kg_rag.retrieval.strategies import RetrievalBackends, run_strategy
+
+from .limits import ConcurrencyLimits, ThrottledBackend
+
+# ``generate_answer`` in main.py reports LLM failures as text instead of raising.
+GENERATION_ERROR_PREFIX = "Error:"
+
+
+def generation_error(answer: str) -> Optional[str]:
+    """The failure message when ``answer`` is a reported generation error, else None."""
+    return answer if answer.startswith(GENERATION_ERROR_PREFIX) else None
+
+
+@dataclass(slots=True)
+class ExperimentResult:
+    question_id: int
+    question: str
+    strategy: str
+    context: str = ""
+    answer: str = ""
+    context_tokens: int = 0
+    retrieval_seconds: float = 0.0
+    generation_seconds: float = 0.0
+    error: Optional[str] = None
+    trace_id: Optional[str] = None
+
+
+class ExperimentRunner:
+    """Run the question x strategy grid on a bounded thread pool."""
+
+    def __init__(
+        self,
+        backends: RetrievalBackends,
+        generate: Callable[[object, str], str],
+        limits: ConcurrencyLimits | None = None,
+        max_workers: int = 8,
+        assembler: ContextAssembler | None = None,
+    ) -> None:
+        self.limits = limits or ConcurrencyLimits()
+        self.max_workers = max_workers
+        self.assembler = assembler
+        self.backends = RetrievalBackends(
+            kg_querier=ThrottledBackend(
+                backends.kg_querier, self.limits.neo4j, ["query", "query_neighbours_batch"]
+            ),
+            vector_retriever=ThrottledBackend(
+                backends.vector_retriever,
+                self.limits.embeddings,
+                ["retrieve", "retrieve_batch", "retrieve_filtered"],
+            ),
+            entity_extractor=ThrottledBackend(
+                backends.entity_extractor,
+                self.limits.extraction,
+                [
+                    "extract_entities",
+                    "extract_entities_batch",
+                    "extract_labelled_entities",
+                    "extract_labelled_entities_batch",
+                ],
+            ),
+            geo_index=backends.geo_index,
+            attribute_store=backends.attribute_store,
+            river_network=backends.river_network,
+        )
+        self._generate = generate
+        self._generation_slots = threading.BoundedSemaphore(self.limits.gemini)
+
+    def run(self, questions: Sequence[str], strategies: Sequence[str]) -> Iterator[ExperimentResult]:
+        """Yield results in grid order (question-major) regardless of completion order."""
+        grid = (
+            (question_id, question, strategy)
+            for question_id, question in enumerate(questions)
+            for strategy in strategies
+        )
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight: deque[Future] = deque()
+            for question_id, question, strategy in grid:
+                in_flight.append(executor.submit(self._run_cell, question_id, question, strategy))
+                if len(in_flight) >= window:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    def run_to_file(
+        self,
+        questions: Sequence[str],
+        strategies: Sequence[str],
+        output_path: str | Path,
+    ) -> int:
+        return write_results(self.run(questions, strategies), output_path)
+
+    def _run_cell(self, question_id: int, question: str, strategy: str) -> ExperimentResult:
+        result = ExperimentResult(question_id=question_id, question=question, strategy=strategy)
+        with trace_request() as trace_id:
+            result.trace_id = trace_id
+            self._fill_result(result)
+        return result
+
+    def _fill_result(self, result: ExperimentResult) -> None:
+        question, strategy = result.question, result.strategy
+        try:
+            started = time.perf_counter()
+            context = run_strategy(strategy, question, self.backends)
+            result.retrieval_seconds = time.perf_counter() - started
+
+            if self.assembler is not None:
+                assembled = self.assembler.assemble_text(context)
+                result.context = assembled.text
+                result.context_tokens = assembled.total_tokens
+                prompt_context: object = assembled
+            else:
+                result.context = context
+                prompt_context = context
+
+            started = time.perf_counter()
+            with self._generation_slots:
+                answer = self._generate(prompt_context, question)
+            result.error = generation_error(answer)
+            if result.error is None:
+                result.answer = answer
+                result.generation_seconds = time.perf_counter() - started
+        except Exception as exc:  # one failing cell must not abort the whole grid
+            result.error = f"{type(exc).__name__}: {exc}"
+
+
+def write_results(results: Iterable, output_path: str | Path, record_type: type = ExperimentResult) -> int:
+    """Stream dataclass records to ``.jsonl`` or ``.csv`` (chosen by suffix); returns the row count."""
+    path = Path(output_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    count = 0
+    with path.open("w", encoding="utf-8", newline="") as handle:
+        if path.suffix.lower() == ".csv":
+            writer = csv.DictWriter(handle, fieldnames=[field.name for field in fields(record_type)])
+            writer.writeheader()
+            for result in results:
+                writer.writerow(asdict(result))
+                count += 1
+        else:
+            for result in results:
+                handle.write(json.dumps(asdict(result), ensure_ascii=False) + "\n")
+                handle.flush()
+                count += 1
+    return count
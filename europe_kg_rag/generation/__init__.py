@@ -0,0 +1,29 @@
+"""
+Answer generation helpers for turning retrieved context into LLM prompts.
+"""
+
+from .cache import CachedGenerativeModel, LLMResponseCache, make_cache_key
+from .context import AssembledContext, ContextAssembler, ContextItem, estimate_tokens
+from .fake import FakeGenerativeModel
+from .prompt import build_answer_prompt
+from .semantic_cache import SemanticCache, SemanticCacheEntry, SemanticCacheHit, data_version
+from .streaming import AnswerStream, StreamStats, stream_answer
+
+__all__ = [
+    "AnswerStream",
+    "AssembledContext",
+    "CachedGenerativeModel",
+    "ContextAssembler",
+    "ContextItem",
+    "FakeGenerativeModel",
+    "LLMResponseCache",
+    "SemanticCache",
+    "SemanticCacheEntry",
+    "SemanticCacheHit",
+    "StreamStats",
+    "build_answer_prompt",
+    "data_version",
+    "estimate_tokens",
+    "make_cache_key",
+    "stream_answer",
+]
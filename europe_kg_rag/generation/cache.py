@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+
+def _normalize_config(generation_config: Any) -> Any:
+    if generation_config is None:
+        return None
+    if isinstance(generation_config, dict):
+        return generation_config
+    if hasattr(generation_config, "to_dict"):
+        return generation_config.to_dict()
+    if hasattr(generation_config, "__dict__"):
+        return {key: value for key, value in vars(generation_config).items() if not key.startswith("_")}
+    return repr(generation_config)
+
+
+def make_cache_key(model_name: str, prompt: str, generation_config: Any = None) -> str:
+    """Stable key over (model, prompt hash, generation config)."""
+    payload = json.dumps(
+        {
+            "model": model_name,
+            "prompt_sha256": hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            "config": _normalize_config(generation_config),
+        },
+        sort_keys=True,
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with an in-memory LRU front."""
+
+    def __init__(
+        self,
+        path: str | Path = "data/cache/llm_responses.sqlite",
+        max_memory_entries: int = 512,
+        ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.max_memory_entries = max_memory_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._connection.execute(
+                    "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                entry = (row[0], row[1]) if row else None
+            if entry is None or self._is_expired(entry[1]):
+                if entry is not None:
+                    self._evict(key)
+                self.misses += 1
+                return None
+
+            self._remember(key, entry)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, response: str, model_name: str = "") -> None:
+        created_at = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at) VALUES (?, ?, ?, ?)",
+                (key, model_name, response, created_at),
+            )
+            self._connection.commit()
+            self._remember(key, (response, created_at))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._connection.execute("DELETE FROM responses")
+            self._connection.commit()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds is not None and time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, entry: Tuple[str, float]) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, key: str) -> None:
+        self._memory.pop(key, None)
+        self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+        self._connection.commit()
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    text: str
+    cached: bool = True
+
+
+class CachedGenerativeModel:
+    """Drop-in wrapper for ``genai.GenerativeModel`` that serves repeated prompts from cache."""
+
+    def __init__(self, model, cache: LLMResponseCache, model_name: str | None = None) -> None:
+        self.model = model
+        self.cache = cache
+        self.model_name = model_name or getattr(model, "model_name", type(model).__name__)
+
+    def generate_content(
+        self,
+        prompt: str,
+        generation_config: Any = None,
+        bypass_cache: bool = False,
+        stream: bool = False,
+        **kwargs,
+    ):
+        key = make_cache_key(self.model_name, prompt, generation_config)
+        if not bypass_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return iter([CachedResponse(text=cached)]) if stream else CachedResponse(text=cached)
+
+        if generation_config is not None:
+            kwargs["generation_config"] = generation_config
+        if stream:
+            return self._stream_and_store(key, self.model.generate_content(prompt, stream=True, **kwargs))
+        response = self.model.generate_content(prompt, **kwargs)
+        self.cache.put(key, response.text, model_name=self.model_name)
+        return response
+
+    def _stream_and_store(self, key: str, chunks: Iterable) -> Iterator:
+        parts = []
+        for chunk in chunks:
+            parts.append(getattr(chunk, "text", "") or "")
+            yield chunk
+        # Only a fully consumed stream is cached; an abandoned one would store a truncated answer.
+        self.cache.put(key, "".join(parts), model_name=self.model_name)
+
+    def __getattr__(self, name: str):
+        return getattr(self.model, name)
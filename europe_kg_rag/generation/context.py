@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+KG_SECTION = "kg"
+TEXT_SECTION = "text"
+
+SECTION_HEADERS: Dict[str, str] = {
+    KG_SECTION: "--- Knowledge Graph Facts ---",
+    TEXT_SECTION: "--- Related Descriptions ---",
+}
+
+_CHARS_PER_TOKEN = 4
+_TAG_PATTERN = re.compile(r"^\[(KG|TEXT)\]\s*", flags=re.IGNORECASE)
+_KG_FACT_PATTERN = re.compile(
+    r"^[\[(](?P<source>.+?)[\])]\s*-\[:(?P<relation>[^\]]+)\]->\s*[\[(](?P<target>.+?)[\])]$"
+)
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token) used for budgeting."""
+    if not text:
+        return 0
+    return max(1, -(-len(text) // _CHARS_PER_TOKEN))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to roughly ``max_tokens``, preferring a sentence or word boundary."""
+    if max_tokens <= 0:
+        return ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    limit = max_tokens * _CHARS_PER_TOKEN - 1
+    head = text[:limit]
+    sentence_end = head.rfind(". ")
+    if sentence_end >= limit // 2:
+        return head[: sentence_end + 1]
+    word_end = head.rfind(" ")
+    if word_end > 0:
+        head = head[:word_end]
+    return head.rstrip(" ,;:") + "…"
+
+
+@dataclass(slots=True)
+class ContextItem:
+    text: str
+    section: str = TEXT_SECTION
+    score: float = 0.0
+
+
+@dataclass(slots=True)
+class AssembledContext:
+    text: str
+    items: List[ContextItem] = field(default_factory=list)
+    tokens_by_section: Dict[str, int] = field(default_factory=dict)
+    dropped_duplicates: int = 0
+    dropped_over_budget: int = 0
+    truncated: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(self.tokens_by_section.values())
+
+    def usage_summary(self) -> str:
+        sections = ", ".join(f"{name}={tokens}" for name, tokens in self.tokens_by_section.items())
+        return (
+            f"total={self.total_tokens} ({sections}); "
+            f"duplicates={self.dropped_duplicates}, over_budget={self.dropped_over_budget}, "
+            f"truncated={self.truncated}"
+        )
+
+
+class ContextAssembler:
+    """Fit KG facts and text passages into a fixed prompt token budget."""
+
+    def __init__(
+        self,
+        max_tokens: int = 2048,
+        section_shares: Optional[Dict[str, float]] = None,
+        max_passage_tokens: int = 256,
+    ) -> None:
+        if max_tokens <= 0:
+            raise ValueError("max_tokens must be positive.")
+        self.max_tokens = max_tokens
+        self.section_shares = section_shares or {KG_SECTION: 0.4, TEXT_SECTION: 0.6}
+        self.max_passage_tokens = max_passage_tokens
+
+    def assemble_text(self, context: str) -> AssembledContext:
+        """Assemble the tagged string produced by the retrieval strategies."""
+        items = parse_context(context)
+        if not items:
+            text = truncate_to_tokens(context.strip(), self.max_tokens)
+            return AssembledContext(text=text, tokens_by_section={"raw": estimate_tokens(text)})
+        return self.assemble(items)
+
+    def assemble(self, items: Iterable[ContextItem]) -> AssembledContext:
+        unique, dropped_duplicates = _deduplicate(items)
+        by_section: Dict[str, List[ContextItem]] = {}
+        for item in sorted(unique, key=lambda candidate: candidate.score, reverse=True):
+            by_section.setdefault(item.section, []).append(item)
+
+        budgets = self._section_budgets(by_section)
+        selected: Dict[str, List[ContextItem]] = {section: [] for section in by_section}
+        used = {section: 0 for section in by_section}
+        pending = {section: list(section_items) for section, section_items in by_section.items()}
+        truncated = 0
+
+        # First pass honours each section's share; the second pass hands any
+        # budget left over by sparse sections to the remaining candidates.
+        for spare_pass in (False, True):
+            spare = self.max_tokens - sum(used.values())
+            for section, candidates in pending.items():
+                remaining: List[ContextItem] = []
+                for item in candidates:
+                    allowance = spare if spare_pass else budgets[section] - used[section]
+                    text = truncate_to_tokens(item.text, min(self.max_passage_tokens, allowance))
+                    cost = estimate_tokens(text)
+                    if not text or cost > allowance or (text != item.text and allowance < 16):
+                        remaining.append(item)
+                        continue
+                    truncated += text != item.text
+                    selected[section].append(ContextItem(text=text, section=section, score=item.score))
+                    used[section] += cost
+                    if spare_pass:
+                        spare -= cost
+                pending[section] = remaining
+
+        kept = [item for section_items in selected.values() for item in section_items]
+        return AssembledContext(
+            text=_render(selected),
+            items=kept,
+            tokens_by_section={section: tokens for section, tokens in used.items()},
+            dropped_duplicates=dropped_duplicates,
+            dropped_over_budget=sum(len(candidates) for candidates in pending.values()),
+            truncated=truncated,
+        )
+
+    def _section_budgets(self, by_section: Dict[str, List[ContextItem]]) -> Dict[str, int]:
+        shares = {section: self.section_shares.get(section, 0.0) for section in by_section}
+        total_share = sum(shares.values())
+        if total_share <= 0:
+            return {section: self.max_tokens // max(len(by_section), 1) for section in by_section}
+        return {section: int(self.max_tokens * share / total_share) for section, share in shares.items()}
+
+
+def parse_context(context: str) -> List[ContextItem]:
+    """Split a strategy's context string into tagged items scored by their rank."""
+    items: List[ContextItem] = []
+    ranks = {KG_SECTION: 0, TEXT_SECTION: 0}
+    for line in context.splitlines():
+        stripped = line.strip()
+        match = _TAG_PATTERN.match(stripped)
+        if not match:
+            continue
+        section = KG_SECTION if match.group(1).upper() == "KG" else TEXT_SECTION
+        ranks[section] += 1
+        items.append(ContextItem(text=stripped, section=section, score=1.0 / ranks[section]))
+    return items
+
+
+def strip_tag(text: str) -> str:
+    return _TAG_PATTERN.sub("", text.strip()).strip()
+
+
+def parse_kg_fact(text: str) -> Optional[tuple[str, str, str]]:
+    """Split ``[KG] [a] -[:REL]-> [b]`` (either bracket style) into ``(a, REL, b)``."""
+    match = _KG_FACT_PATTERN.match(strip_tag(text))
+    if not match:
+        return None
+    return (
+        match.group("source").strip(),
+        match.group("relation").strip().upper(),
+        match.group("target").strip(),
+    )
+
+
+def _dedup_key(item: ContextItem) -> tuple:
+    if item.section == KG_SECTION:
+        fact = parse_kg_fact(item.text)
+        if fact:
+            # KG lookups are undirected, so (a)-[R]-(b) and (b)-[R]-(a) are the same fact.
+            source, relation, target = fact
+            return (item.section, relation, frozenset((source.lower(), target.lower())))
+    return (item.section, _WHITESPACE_PATTERN.sub(" ", strip_tag(item.text)).lower())
+
+
+def _deduplicate(items: Iterable[ContextItem]) -> tuple[List[ContextItem], int]:
+    best: Dict[tuple, ContextItem] = {}
+    total = 0
+    for item in items:
+        total += 1
+        key = _dedup_key(item)
+        current = best.get(key)
+        if current is None or item.score > current.score:
+            best[key] = item
+    return list(best.values()), total - len(best)
+
+
+def _render(selected: Dict[str, List[ContextItem]]) -> str:
+    blocks: List[str] = []
+    order = [section for section in SECTION_HEADERS if section in selected]
+    order.extend(section for section in selected if section not in SECTION_HEADERS)
+    for section in order:
+        section_items = selected[section]
+        if not section_items:
+            continue
+        header = SECTION_HEADERS.get(section, f"--- {section} ---")
+        blocks.append("\n".join([header, *(item.text for item in section_items)]))
+    return "\n\n".join(blocks)
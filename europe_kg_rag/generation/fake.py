@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, Optional, Union
+
+_QUESTION_PATTERN = re.compile(r"QUESTION:\s*(.*?)\s*ANSWER:", flags=re.DOTALL)
+
+
+@dataclass(slots=True)
+class FakeResponse:
+    text: str
+
+
+class FakeGenerativeModel:
+    """Offline stand-in for ``genai.GenerativeModel`` with deterministic, optionally slow output."""
+
+    def __init__(
+        self,
+        responses: Union[Dict[str, str], Callable[[str], str], None] = None,
+        words_per_chunk: int = 4,
+        first_token_delay: float = 0.0,
+        chunk_delay: float = 0.0,
+        model_name: str = "fake-llm",
+    ) -> None:
+        self.responses = responses
+        self.words_per_chunk = max(1, words_per_chunk)
+        self.first_token_delay = first_token_delay
+        self.chunk_delay = chunk_delay
+        self.model_name = model_name
+        self.calls = 0
+
+    def generate_content(self, prompt: str, stream: bool = False, **_: object):
+        self.calls += 1
+        text = self._reply(prompt)
+        if stream:
+            return self._stream(text)
+        time.sleep(self.first_token_delay + self.chunk_delay * len(self._chunks(text)))
+        return FakeResponse(text=text)
+
+    def _reply(self, prompt: str) -> str:
+        if callable(self.responses):
+            return self.responses(prompt)
+        question = _extract_question(prompt)
+        if isinstance(self.responses, dict) and question in self.responses:
+            return self.responses[question]
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+        return f"Fake answer {digest} to: {question or prompt[:80]}"
+
+    def _chunks(self, text: str) -> list[str]:
+        words = text.split(" ")
+        size = self.words_per_chunk
+        chunks = [" ".join(words[start:start + size]) for start in range(0, len(words), size)]
+        return [chunk + " " for chunk in chunks[:-1]] + chunks[-1:]
+
+    def _stream(self, text: str) -> Iterator[FakeResponse]:
+        time.sleep(self.first_token_delay)
+        for index, chunk in enumerate(self._chunks(text)):
+            if index and self.chunk_delay:
+                time.sleep(self.chunk_delay)
+            yield FakeResponse(text=chunk)
+
+
+def _extract_question(prompt: str) -> Optional[str]:
+    match = _QUESTION_PATTERN.search(prompt)
+    return match.group(1).strip() if match else None
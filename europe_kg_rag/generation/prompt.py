@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+
+def build_answer_prompt(context_text: str, question: str) -> str:
+    return f"""
+    You are a meticulous and fact-grounded AI assistant. Your task is to answer the user's question with high accuracy and clarity.
+
+    To do this, you must strictly adhere to the following rules:
+    1.  Synthesize your answer by drawing information from the provided CONTEXT below.
+    2.  Base your entire answer ONLY on the information given in the context. Do not use any external knowledge.
+    3.  If you use a fact from the context, you can optionally cite it (e.g., using [KG] or [Text]).
+    4.  If the provided context is insufficient to answer the question, you must state that clearly.
+
+    --- CONTEXT ---
+    {context_text}
+    --- END OF CONTEXT ---
+
+    QUESTION:
+    {question}
+
+    ANSWER:
+    """
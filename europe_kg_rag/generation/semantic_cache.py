@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Sequence, Tuple
+
+import faiss
+import numpy as np
+
+_SAME_QUESTION = 0.9999
+# Fallback entity key without an extractor: capitalised words after the first one.
+_PROPER_NOUN = re.compile(r"(?<=\s)[A-Z][\w'-]*")
+
+
+def data_version(paths: Iterable[str | Path], extra: str = "") -> str:
+    """Fingerprint data files by path, size and mtime; any rebuild changes the version."""
+    digest = hashlib.sha256(extra.encode("utf-8"))
+    for path in sorted(Path(path) for path in paths):
+        digest.update(str(path).encode("utf-8"))
+        if path.is_dir():
+            files = sorted(child for child in path.rglob("*") if child.is_file())
+        else:
+            files = [path] if path.exists() else []
+        for file in files:
+            stat = file.stat()
+            digest.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+@dataclass(slots=True)
+class SemanticCacheEntry:
+    question: str
+    strategy: str
+    context: str
+    answer: Optional[str] = None
+    entities: FrozenSet[str] = frozenset()
+
+
+@dataclass(slots=True)
+class SemanticCacheHit:
+    entry: SemanticCacheEntry
+    similarity: float
+
+
+class SemanticCache:
+    """Serve near-duplicate questions from earlier results via cosine similarity in FAISS.
+
+    Similar wording is not enough: a hit also needs exactly the same entities, so "borders of
+    Germany" never answers "borders of Poland". Entities come from the caller, else ``extractor``.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        threshold: float = 0.92,
+        max_entries: int = 1024,
+        version: str = "",
+        version_source: Callable[[], str] | None = None,
+        version_check_interval: float = 30.0,
+        search_k: int = 4,
+        extractor=None,
+    ) -> None:
+        self.embedder = embedder
+        self.extractor = extractor
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.version = version_source() if version_source and not version else version
+        self.version_source = version_source
+        self.version_check_interval = version_check_interval
+        self.search_k = search_k
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[int, SemanticCacheEntry]" = OrderedDict()
+        self._indexes: Dict[str, faiss.IndexIDMap2] = {}
+        self._next_id = 0
+        self._version_checked_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set_version(self, version: str) -> bool:
+        """Drop every entry when the graph/corpus version changes; returns True if it did."""
+        with self._lock:
+            if version == self.version:
+                return False
+            self.version = version
+            self._clear()
+            return True
+
+    def pin_version(self, version: str) -> bool:
+        """Switch to an externally managed version (a hot swap): stop polling ``version_source``."""
+        with self._lock:
+            self.version_source = None
+        return self.set_version(version)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def lookup(
+        self,
+        question: str,
+        strategy: str,
+        need_answer: bool = False,
+        entities: Sequence[str | Tuple[str, Optional[str]]] | None = None,
+    ) -> Optional[SemanticCacheHit]:
+        self._check_version()
+        key = self._entity_key(question, entities)
+        vector = self._embed(question)
+        with self._lock:
+            index = self._indexes.get(strategy)
+            if index is None or index.ntotal == 0:
+                self.misses += 1
+                return None
+            scores, ids = index.search(vector, min(self.search_k, index.ntotal))
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id < 0 or score < self.threshold:
+                    break
+                entry = self._entries.get(int(entry_id))
+                if entry is None or entry.entities != key or (need_answer and entry.answer is None):
+                    continue
+                self._entries.move_to_end(int(entry_id))
+                self.hits += 1
+                return SemanticCacheHit(entry=entry, similarity=float(score))
+            self.misses += 1
+            return None
+
+    def store(
+        self,
+        question: str,
+        strategy: str,
+        context: str,
+        answer: Optional[str] = None,
+        version: Optional[str] = None,
+        entities: Sequence[str | Tuple[str, Optional[str]]] | None = None,
+    ) -> None:
+        """Cache a result; one computed against ``version`` is dropped if the cache has moved past it."""
+        self._check_version()
+        key = self._entity_key(question, entities)
+        vector = self._embed(question)
+        with self._lock:
+            if version is not None and version != self.version:
+                return
+            index = self._indexes.get(strategy)
+            if index is None:
+                index = self._indexes[strategy] = faiss.IndexIDMap2(faiss.IndexFlatIP(vector.shape[1]))
+            elif index.ntotal:
+                scores, ids = index.search(vector, 1)
+                existing_id = int(ids[0][0])
+                same = existing_id >= 0 and scores[0][0] >= _SAME_QUESTION
+                if same and self._entries[existing_id].entities == key:
+                    # Re-asking the same question refreshes its entry instead of adding a twin.
+                    if answer is None:
+                        answer = self._entries[existing_id].answer
+                    self._entries[existing_id] = SemanticCacheEntry(question, strategy, context, answer, key)
+                    self._entries.move_to_end(existing_id)
+                    return
+            entry_id = self._next_id
+            self._next_id += 1
+            index.add_with_ids(vector, np.array([entry_id], dtype=np.int64))
+            self._entries[entry_id] = SemanticCacheEntry(question, strategy, context, answer, key)
+            while len(self._entries) > self.max_entries:
+                evicted_id, evicted = self._entries.popitem(last=False)
+                self._indexes[evicted.strategy].remove_ids(np.array([evicted_id], dtype=np.int64))
+
+    def _check_version(self) -> None:
+        source = self.version_source
+        if source is None:
+            return
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_interval:
+            return
+        self._version_checked_at = now
+        version = source()
+        with self._lock:
+            # A hot swap pinned while we fingerprinted the files takes precedence.
+            if self.version_source is source and version != self.version:
+                self.version = version
+                self._clear()
+
+    def _entity_key(
+        self, question: str, entities: Sequence[str | Tuple[str, Optional[str]]] | None
+    ) -> FrozenSet[str]:
+        if entities is None:
+            if self.extractor is not None:
+                entities = self.extractor.extract_entities(question)
+            else:
+                entities = _PROPER_NOUN.findall(question)
+        names = (entity if isinstance(entity, str) else entity[0] for entity in entities)
+        return frozenset(name.casefold().removeprefix("the ").strip() for name in names)
+
+    def _embed(self, question: str) -> np.ndarray:
+        vector = np.asarray(self.embedder.embed([question], "RETRIEVAL_QUERY"), dtype=np.float32)
+        vector = vector.reshape(1, -1).copy()
+        faiss.normalize_L2(vector)
+        return vector
+
+    def _clear(self) -> None:
+        self._entries.clear()
+        self._indexes.clear()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+from europe_kg_rag.observability import tracer
+
+from .context import estimate_tokens
+
+
+@dataclass(slots=True)
+class StreamStats:
+    time_to_first_token: Optional[float] = None
+    total_seconds: float = 0.0
+    chunks: int = 0
+    tokens: int = 0
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Output rate after the first token arrived (decode speed)."""
+        if self.time_to_first_token is None:
+            return 0.0
+        decode_seconds = self.total_seconds - self.time_to_first_token
+        if decode_seconds <= 0:
+            return float(self.tokens)
+        return self.tokens / decode_seconds
+
+
+class AnswerStream:
+    """Iterate over answer chunks as the model produces them, recording latency stats."""
+
+    def __init__(self, llm, prompt: str, **generate_kwargs: Any) -> None:
+        self.llm = llm
+        self.prompt = prompt
+        self.generate_kwargs = generate_kwargs
+        self.stats = StreamStats()
+        self._parts: List[str] = []
+        self._consumed = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._consumed:
+            raise RuntimeError("AnswerStream can only be iterated once.")
+        self._consumed = True
+
+        started = time.perf_counter()
+        try:
+            for chunk in self.llm.generate_content(self.prompt, stream=True, **self.generate_kwargs):
+                text = getattr(chunk, "text", "") or ""
+                if not text:
+                    continue
+                if self.stats.time_to_first_token is None:
+                    self.stats.time_to_first_token = time.perf_counter() - started
+                self.stats.chunks += 1
+                self.stats.tokens += estimate_tokens(text)
+                self._parts.append(text)
+                yield text
+        finally:
+            self.stats.total_seconds = time.perf_counter() - started
+            if self.stats.time_to_first_token is not None:
+                tracer.observe("generation.first_token", self.stats.time_to_first_token)
+            tracer.observe("generation.stream", self.stats.total_seconds, tokens=self.stats.tokens)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        # The Gemini client is blocking, so chunks are pumped from a worker thread.
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def produce() -> None:
+            try:
+                for chunk in self:
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+            except BaseException as exc:  # surface client errors to the consumer
+                loop.call_soon_threadsafe(queue.put_nowait, exc)
+
+        threading.Thread(target=produce, name="answer-stream", daemon=True).start()
+        while True:
+            item = await queue.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+def stream_answer(llm, prompt: str, **generate_kwargs: Any) -> AnswerStream:
+    """Start a streamed generation; iterate it with ``for`` or ``async for``."""
+    return AnswerStream(llm, prompt, **generate_kwargs)
@@ -1,4 +1,12 @@
 from .builder import KnowledgeGraphBuilder
+from .memory import InMemoryGraphQuerier
 from .querier import KnowledgeGraphQuerier
+from .rivers import RiverNetwork, retrieve_river_facts
 
-__all__ = ["KnowledgeGraphBuilder", "KnowledgeGraphQuerier"]
+__all__ = [
+    "InMemoryGraphQuerier",
+    "KnowledgeGraphBuilder",
+    "KnowledgeGraphQuerier",
+    "RiverNetwork",
+    "retrieve_river_facts",
+]
@@ -1,142 +1,239 @@
 from __future__ import annotations
 
+from collections import defaultdict
+from dataclasses import asdict
+from typing import Dict, Iterable, Iterator, List, Tuple, TypeVar
+
 from neo4j import GraphDatabase
 
 from europe_kg_rag.data.loader import DatabaseLoader
 from europe_kg_rag.data.models import Country, GraphDataset, River
+from europe_kg_rag.data.schema import ValidationReport, is_identifier
+
+from .rivers import RiverNetwork
+
+DEFAULT_BATCH_SIZE = 500
+# Node labels for the id prefixes written by data/normalize_data.py ("country:FRANCE").
+LABELS_BY_PREFIX = {
+    "country": "Country",
+    "city": "City",
+    "river": "River",
+    "sea": "WaterBody",
+    "mountain": "Mountain",
+}
+
+T = TypeVar("T")
+
+COUNTRY_BATCH_QUERY = """
+UNWIND $rows AS row
+MERGE (c:Country {name: row.name})
+SET c.capital = row.capital,
+    c.eu_member = row.eu_member,
+    c.population = row.population,
+    c.area_km2 = row.area_km2,
+    c.density = row.density
+FOREACH (_ IN CASE WHEN row.capital <> '' THEN [1] ELSE [] END |
+    MERGE (city:City {name: row.capital})
+    MERGE (c)-[:HAS_CAPITAL]->(city)
+)
+FOREACH (neighbor_name IN [x IN row.borders_with WHERE x <> ''] |
+    MERGE (n:Country {name: neighbor_name})
+    MERGE (c)-[:BORDERS_WITH]->(n)
+)
+"""
+
+RIVER_BATCH_QUERY = """
+UNWIND $rows AS row
+MERGE (r:River {name: row.name})
+SET r.length = row.length,
+    r.basin = row.basin,
+    r.flow = row.flow,
+    r.mouth = row.mouth,
+    r.rank_of_length = row.rank_of_length,
+    r.rank_of_area = row.rank_of_area,
+    r.rank_of_flow = row.rank_of_flow
+FOREACH (country_name IN [x IN row.countries WHERE x <> ''] |
+    MERGE (c:Country {name: country_name})
+    MERGE (r)-[:FLOWS_THROUGH]->(c)
+)
+"""
+
+RIVER_PARENT_BATCH_QUERY = """
+UNWIND $rows AS row
+MATCH (child:River {name: row.name})
+OPTIONAL MATCH (parentRiver:River {name: row.parent})
+FOREACH (_ IN CASE WHEN parentRiver IS NOT NULL THEN [1] ELSE [] END |
+    MERGE (child)-[:TRIBUTES_TO]->(parentRiver)
+)
+FOREACH (_ IN CASE WHEN parentRiver IS NULL THEN [1] ELSE [] END |
+    MERGE (water:WaterBody {name: row.parent})
+    MERGE (child)-[:FLOWS_INTO]->(water)
+)
+"""
+
+ENTITY_BATCH_QUERY = """
+UNWIND $rows AS row
+OPTIONAL MATCH (existing:{label} {{name: row.name}})
+WHERE existing.id IS NULL
+FOREACH (_ IN CASE WHEN existing IS NULL THEN [] ELSE [1] END | SET existing.id = row.id)
+WITH DISTINCT row
+MERGE (n:{label} {{id: row.id}})
+SET n += row
+"""
+
+RIVER_NETWORK_BATCH_QUERY = """
+UNWIND $rows AS row
+MATCH (r:River {name: row.name})
+SET r.euler_in = row.euler_in,
+    r.euler_out = row.euler_out,
+    r.network_depth = row.network_depth,
+    r.outlet = row.outlet,
+    r.tributary_count = row.tributary_count,
+    r.system_length = row.system_length,
+    r.basin_countries = row.basin_countries
+"""
+
+RIVER_NETWORK_INDEX = "CREATE INDEX river_euler_in IF NOT EXISTS FOR (r:River) ON (r.euler_in)"
+
+
+def _batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Consume ``items`` lazily in lists of at most ``size``."""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _label_for(node_id: str) -> str:
+    prefix = node_id.split(":", 1)[0]
+    label = LABELS_BY_PREFIX.get(prefix, prefix.capitalize())
+    if not is_identifier(label):
+        raise ValueError(f"Cannot derive a node label from id {node_id!r}")
+    return label
 
 
 class KnowledgeGraphBuilder:
     """Create the Europe knowledge graph inside Neo4j."""
 
-    def __init__(self, uri: str, user: str, password: str) -> None:
+    def __init__(
+        self,
+        uri: str,
+        user: str,
+        password: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        database: str | None = None,
+    ) -> None:
         self.driver = GraphDatabase.driver(uri, auth=(user, password), encrypted=False)
+        self.batch_size = batch_size
+        self.database = database
 
     def close(self) -> None:
         self.driver.close()
 
+    def create_database(self) -> None:
+        """Create ``database`` if missing (needs a Neo4j edition with multiple databases)."""
+        if not is_identifier((self.database or "").replace("-", "_").replace(".", "_")):
+            raise ValueError(f"Invalid database name: {self.database!r}")
+        with self.driver.session(database="system") as session:
+            session.run(f"CREATE DATABASE `{self.database}` IF NOT EXISTS WAIT")
+
     def clear_database(self) -> None:
-        with self.driver.session() as session:
+        with self._session() as session:
             session.run("MATCH (n) DETACH DELETE n")
 
     def build_from_loader(self, loader: DatabaseLoader) -> None:
-        dataset = loader.load()
-        self.build(dataset)
+        """Stream the loader's iterators straight into batched writes; no full dataset is materialized.
+
+        River parents need every river node to exist first, so rivers are read again (and once more for
+        the river-network index); later passes validate into a throwaway report to keep
+        ``loader.report`` counts per record.
+        """
+        self.ingest_countries(loader.iter_countries())
+        self.ingest_rivers(loader.iter_rivers())
+        self.link_river_parents(loader.iter_rivers(report=ValidationReport()))
+        network = RiverNetwork.from_rivers(loader.iter_rivers(report=ValidationReport()))
+        self.materialize_river_network(network)
 
     def build(self, dataset: GraphDataset) -> None:
-        with self.driver.session() as session:
-            for country in dataset.countries:
-                session.execute_write(self._upsert_country, country)
-
-            for country in dataset.countries:
-                self._create_country_relationships(session, country)
-
-            for river in dataset.rivers:
-                session.execute_write(self._upsert_river, river)
-
-            for river in dataset.rivers:
-                self._create_river_relationships(session, river)
-
-    @staticmethod
-    def _upsert_country(tx, country: Country) -> None:
-        tx.run(
-            """
-            MERGE (c:Country {name: $name})
-            SET c.capital = $capital,
-                c.eu_member = $eu_member
-            """,
-            name=country.name,
-            capital=country.capital,
-            eu_member=country.eu_member,
-        )
-
-        if country.capital:
-            tx.run(
-                """
-                MATCH (c:Country {name: $name})
-                MERGE (city:City {name: $capital})
-                MERGE (c)-[:HAS_CAPITAL]->(city)
-                """,
-                name=country.name,
-                capital=country.capital,
-            )
-
-    def _create_country_relationships(self, session, country: Country) -> None:
-        for neighbor in country.borders_with:
-            session.execute_write(self._link_neighbors, country.name, neighbor)
-
-    @staticmethod
-    def _link_neighbors(tx, country_name: str, neighbor_name: str) -> None:
-        if not neighbor_name:
-            return
-        tx.run(
-            """
-            MERGE (c:Country {name: $country_name})
-            MERGE (n:Country {name: $neighbor_name})
-            MERGE (c)-[:BORDERS_WITH]->(n)
-            """,
-            country_name=country_name,
-            neighbor_name=neighbor_name,
-        )
-
-    @staticmethod
-    def _upsert_river(tx, river: River) -> None:
-        tx.run(
-            """
-            MERGE (r:River {name: $name})
-            SET r.length = $length,
-                r.basin = $basin,
-                r.flow = $flow,
-                r.mouth = $mouth,
-                r.rank_of_length = $rank_of_length,
-                r.rank_of_area = $rank_of_area,
-                r.rank_of_flow = $rank_of_flow
-            """,
-            name=river.name,
-            length=river.length,
-            basin=river.basin,
-            flow=river.flow,
-            mouth=river.mouth,
-            rank_of_length=river.rank_of_length,
-            rank_of_area=river.rank_of_area,
-            rank_of_flow=river.rank_of_flow,
-        )
-
-    def _create_river_relationships(self, session, river: River) -> None:
-        for country_name in river.countries:
-            session.execute_write(self._link_river_country, river.name, country_name)
-
-        if river.parent:
-            session.execute_write(self._link_river_parent, river.name, river.parent)
-
-    @staticmethod
-    def _link_river_country(tx, river_name: str, country_name: str) -> None:
-        if not country_name:
-            return
-        tx.run(
-            """
-            MERGE (r:River {name: $river_name})
-            MERGE (c:Country {name: $country_name})
-            MERGE (r)-[:FLOWS_THROUGH]->(c)
-            """,
-            river_name=river_name,
-            country_name=country_name,
-        )
+        self.ingest_countries(dataset.countries)
+        self.ingest_rivers(dataset.rivers)
+        self.link_river_parents(dataset.rivers)
+        self.materialize_river_network(RiverNetwork.from_dataset(dataset))
+
+    def ingest_countries(self, countries: Iterable[Country]) -> int:
+        """Upsert countries with their capitals and borders; returns the number written."""
+        return self._write_batches(COUNTRY_BATCH_QUERY, (asdict(country) for country in countries))
+
+    def ingest_rivers(self, rivers: Iterable[River]) -> int:
+        """Upsert rivers and the countries they flow through."""
+        return self._write_batches(RIVER_BATCH_QUERY, (asdict(river) for river in rivers))
+
+    def link_river_parents(self, rivers: Iterable[River]) -> int:
+        """Link rivers to a parent river (TRIBUTES_TO) or, failing that, a water body (FLOWS_INTO)."""
+        rows = ({"name": river.name, "parent": river.parent} for river in rivers if river.parent)
+        return self._write_batches(RIVER_PARENT_BATCH_QUERY, rows)
+
+    def materialize_river_network(self, network: RiverNetwork) -> int:
+        """Store the tour interval, outlet and system aggregates on each ``(:River)`` node.
+
+        Tributary closure then becomes an indexed range scan (``TRIBUTARIES_QUERY``) instead of a
+        variable-length ``TRIBUTES_TO*`` traversal.
+        """
+        with self._session() as session:
+            session.run(RIVER_NETWORK_INDEX)
+        return self._write_batches(RIVER_NETWORK_BATCH_QUERY, network.node_properties())
+
+    def ingest_entities(self, label: str, records: Iterable[dict]) -> int:
+        """Upsert normalized entities (``loader.iter_entities``) keyed by ``id``, copying their properties.
+
+        A node ``build_from_loader`` already wrote under the same name (and without an id) is adopted
+        rather than duplicated; entities sharing a name (two cities called Newport) stay distinct.
+        """
+        if not is_identifier(label):
+            raise ValueError(f"Invalid node label: {label!r}")
+        return self._write_batches(ENTITY_BATCH_QUERY.format(label=label), records)
+
+    def ingest_relations(self, relations: Iterable[dict]) -> int:
+        """Create ``{source_id, target_id, type}`` edges between entities written by ``ingest_entities``.
+
+        Labels come from the id prefixes (``LABELS_BY_PREFIX``); each batch is grouped by
+        (type, source label, target label) since Cypher cannot parameterize either.
+        """
+        written = 0
+        for batch in _batched(relations, self.batch_size):
+            groups: Dict[Tuple[str, str, str], List[dict]] = defaultdict(list)
+            for relation in batch:
+                if not is_identifier(relation["type"]):
+                    raise ValueError(f"Invalid relationship type: {relation['type']!r}")
+                key = (relation["type"], _label_for(relation["source_id"]), _label_for(relation["target_id"]))
+                groups[key].append({"source_id": relation["source_id"], "target_id": relation["target_id"]})
+            with self._session() as session:
+                for (relation_type, source_label, target_label), rows in groups.items():
+                    query = (
+                        "UNWIND $rows AS row "
+                        f"MATCH (a:{source_label} {{id: row.source_id}}) "
+                        f"MATCH (b:{target_label} {{id: row.target_id}}) "
+                        f"MERGE (a)-[:{relation_type}]->(b)"
+                    )
+                    session.execute_write(self._run_batch, query, rows)
+            written += len(batch)
+        return written
+
+    def _session(self):
+        return self.driver.session(database=self.database)
+
+    def _write_batches(self, query: str, rows: Iterable[dict]) -> int:
+        written = 0
+        with self._session() as session:
+            for batch in _batched(rows, self.batch_size):
+                session.execute_write(self._run_batch, query, batch)
+                written += len(batch)
+        return written
 
     @staticmethod
-    def _link_river_parent(tx, river_name: str, parent_name: str) -> None:
-        tx.run(
-            """
-            MATCH (child:River {name: $river_name})
-            OPTIONAL MATCH (parentRiver:River {name: $parent_name})
-            FOREACH (_ IN CASE WHEN parentRiver IS NOT NULL THEN [1] ELSE [] END |
-                MERGE (child)-[:TRIBUTES_TO]->(parentRiver)
-            )
-            FOREACH (_ IN CASE WHEN parentRiver IS NULL THEN [1] ELSE [] END |
-                MERGE (water:WaterBody {name: $parent_name})
-                MERGE (child)-[:FLOWS_INTO]->(water)
-            )
-            """,
-            river_name=river_name,
-            parent_name=parent_name,
-        )
+    def _run_batch(tx, query: str, rows: List[dict]) -> None:
+        tx.run(query, rows=rows)
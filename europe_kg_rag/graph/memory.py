@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from europe_kg_rag.data.models import GraphDataset
+from europe_kg_rag.observability import span
+
+from .queries import NEIGHBOUR_BATCH_QUERY, NEIGHBOUR_QUERY
+
+
+class InMemoryGraphQuerier:
+    """Dictionary-backed stand-in for ``KnowledgeGraphQuerier`` (neighbour lookups only)."""
+
+    def __init__(self, edges: Iterable[Tuple[str, str, str]] = ()) -> None:
+        self._adjacency: Dict[str, List[Tuple[str, str]]] = defaultdict(list)
+        self.edge_count = 0
+        for source, relation, target in edges:
+            self.add_edge(source, relation, target)
+
+    @classmethod
+    def from_dataset(cls, dataset: GraphDataset) -> "InMemoryGraphQuerier":
+        """Mirror the edges ``KnowledgeGraphBuilder`` would create for ``dataset``."""
+        querier = cls()
+        river_names = {river.name for river in dataset.rivers}
+        for country in dataset.countries:
+            if country.capital:
+                querier.add_edge(country.name, "HAS_CAPITAL", country.capital)
+            for neighbour in country.borders_with:
+                querier.add_edge(country.name, "BORDERS_WITH", neighbour)
+        for river in dataset.rivers:
+            for country_name in river.countries:
+                querier.add_edge(river.name, "FLOWS_THROUGH", country_name)
+            if river.parent:
+                relation = "TRIBUTES_TO" if river.parent in river_names else "FLOWS_INTO"
+                querier.add_edge(river.name, relation, river.parent)
+        return querier
+
+    def add_edge(self, source: str, relation: str, target: str) -> None:
+        if not source or not target:
+            return
+        # Neighbour lookups match (e)-[r]-(n) in either direction.
+        self._adjacency[source].append((relation, target))
+        self._adjacency[target].append((relation, source))
+        self.edge_count += 1
+
+    def close(self) -> None:
+        pass
+
+    def query(self, cypher_query: str, parameters: dict | None = None) -> list[dict]:
+        """Answer ``NEIGHBOUR_QUERY``/``NEIGHBOUR_BATCH_QUERY``; any other Cypher raises ``ValueError``."""
+        parameters = parameters or {}
+        with span("kg.query"):
+            if cypher_query == NEIGHBOUR_QUERY:
+                return self._neighbours(parameters.get("entity"))
+            if cypher_query == NEIGHBOUR_BATCH_QUERY:
+                return [
+                    {"entity": entity, **record}
+                    for entity in parameters.get("entities", [])
+                    for record in self._neighbours(entity)
+                ]
+        raise ValueError(f"unsupported query for InMemoryGraphQuerier: {cypher_query.strip()[:60]!r}")
+
+    def query_neighbours_batch(self, entities: Iterable[str]) -> dict[str, list[dict]]:
+        unique_entities = list(dict.fromkeys(entity for entity in entities if entity))
+        with span("kg.query_batch", entities=len(unique_entities)):
+            return {entity: self._neighbours(entity) for entity in unique_entities}
+
+    def _neighbours(self, entity: str | None) -> list[dict]:
+        return [
+            {"e.name": entity, "type(r)": relation, "n.name": neighbour}
+            for relation, neighbour in self._adjacency.get(entity, ())
+        ]
@@ -1,18 +1,37 @@
 from __future__ import annotations
 
+from typing import Iterable
+
 from neo4j import GraphDatabase
 
+from europe_kg_rag.observability import span
+
+from .queries import NEIGHBOUR_BATCH_QUERY
+
 
 class KnowledgeGraphQuerier:
-    """Thin Neo4j wrapper for running arbitrary Cypher queries."""
+    """Thin Neo4j wrapper for running arbitrary Cypher queries; ``database=None`` uses the server default."""
 
-    def __init__(self, uri: str, user: str, password: str) -> None:
+    def __init__(self, uri: str, user: str, password: str, database: str | None = None) -> None:
         self.driver = GraphDatabase.driver(uri, auth=(user, password), encrypted=False)
+        self.database = database
 
     def close(self) -> None:
         self.driver.close()
 
     def query(self, cypher_query: str, parameters: dict | None = None) -> list[dict]:
-        with self.driver.session() as session:
+        with span("kg.query"), self.driver.session(database=self.database) as session:
             result = session.run(cypher_query, parameters or {})
             return [record.data() for record in result]
+
+    def query_neighbours_batch(self, entities: Iterable[str]) -> dict[str, list[dict]]:
+        """Fetch the neighbourhood of many entities in a single round-trip."""
+        unique_entities = list(dict.fromkeys(entity for entity in entities if entity))
+        neighbours: dict[str, list[dict]] = {entity: [] for entity in unique_entities}
+        if not unique_entities:
+            return neighbours
+        with span("kg.query_batch", entities=len(unique_entities)):
+            for record in self.query(NEIGHBOUR_BATCH_QUERY, {"entities": unique_entities}):
+                entity = record.pop("entity")
+                neighbours[entity].append(record)
+        return neighbours
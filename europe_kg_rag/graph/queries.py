@@ -0,0 +1,19 @@
+"""
+Cypher statements shared by the querier and the retrieval strategies.
+"""
+
+NEIGHBOUR_QUERY = "MATCH (e)-[r]-(n) WHERE e.name = $entity RETURN e.name, type(r), n.name"
+
+NEIGHBOUR_BATCH_QUERY = """
+UNWIND $entities AS entity
+MATCH (e)-[r]-(n) WHERE e.name = entity
+RETURN entity, e.name, type(r), n.name
+"""
+
+# Needs the properties written by ``KnowledgeGraphBuilder.materialize_river_network``.
+TRIBUTARIES_QUERY = """
+MATCH (a:River {name: $river})
+MATCH (d:River) WHERE a.euler_in < d.euler_in < a.euler_out
+RETURN d.name, d.network_depth - a.network_depth AS depth
+ORDER BY d.euler_in
+"""
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+from europe_kg_rag.data.models import GraphDataset, River
+from europe_kg_rag.observability import span
+
+DEFAULT_FACT_LIMIT = 20
+
+_TRIBUTARY = re.compile(r"\btributar(y|ies)\b", re.IGNORECASE)
+_FLOWS_INTO = re.compile(
+    r"\b(rivers?|streams?)\b.*\b(flow|drain|empty|feed)s?\s+(?:directly\s+)?into\b", re.IGNORECASE
+)
+_OUTLET = re.compile(
+    r"\b(sea|ocean|gulf|bay|outlet|ultimately|end up)\b|\bwhere does\b.*\b(drain|flow|empty|end)s?\b",
+    re.IGNORECASE,
+)
+_BASIN = re.compile(r"\b(basin|catchment|watershed|river system|drainage area)\b", re.IGNORECASE)
+_DIRECT = re.compile(r"\bdirect(ly)?\b", re.IGNORECASE)
+
+
+def _key(name: str) -> str:
+    key = name.strip().casefold()
+    if key.startswith("the "):
+        key = key[4:].lstrip()
+    if key.endswith(" river"):
+        key = key[:-6].rstrip()
+    return key
+
+
+def _aliases(name: str) -> List[str]:
+    # Source names carry the headwater chain and alternate spellings: "Drava/Drau <- Isel".
+    head = name.split(" <- ", 1)[0]
+    return [head, *head.split("/")]
+
+
+def _tour(
+    roots: Iterable[int], children: List[List[int]], euler_in: List[int], depth: List[int], order: List[int]
+) -> None:
+    """Iterative pre-order walk; ``euler_in`` doubles as the visited set."""
+    for root in roots:
+        stack = [(root, 0)]
+        while stack:
+            row, level = stack.pop()
+            if euler_in[row] >= 0:
+                continue
+            euler_in[row] = len(order)
+            order.append(row)
+            depth[row] = level
+            stack.extend((child, level + 1) for child in reversed(children[row]))
+
+
+@dataclass(slots=True)
+class RiverQuery:
+    kind: str  # tributaries, outlet, basin or drainage
+    anchor: str
+    max_depth: Optional[int] = None
+
+
+class RiverNetwork:
+    """Interval-labelled river forest: a river's whole tributary system is one slice of a pre-order tour.
+
+    ``euler_in[r] < euler_in[d] < euler_out[r]`` holds exactly when ``d`` drains into ``r``, so ancestor
+    checks are O(1) and tributary listings O(k). Roots are toured grouped by outlet (the sea or lake a
+    root river flows into), which makes every outlet's drainage a contiguous slice as well.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        parents: Sequence[Optional[str]],
+        lengths: Sequence[Optional[float]],
+        countries: Sequence[Sequence[str]],
+    ) -> None:
+        self.names = list(names)
+        self._rows: Dict[str, int] = {}
+        for row, name in enumerate(self.names):
+            self._rows.setdefault(_key(name), row)
+        for row, name in enumerate(self.names):
+            for alias in _aliases(name):
+                self._rows.setdefault(_key(alias), row)
+        size = len(self.names)
+
+        parent = [-1] * size
+        children: List[List[int]] = [[] for _ in range(size)]
+        root_outlets: Dict[int, str] = {}
+        for row, parent_name in enumerate(parents):
+            parent_row = self._rows.get(_key(parent_name)) if parent_name else None
+            if parent_row is not None and parent_row != row:
+                parent[row] = parent_row
+                children[parent_row].append(row)
+            else:
+                root_outlets[row] = "" if parent_row == row else parent_name or ""
+
+        euler_in, depth, order = [-1] * size, [0] * size, []
+        roots = sorted(root_outlets, key=lambda row: (_key(root_outlets[row]), row))
+        _tour(roots, children, euler_in, depth, order)
+        # Rows left unvisited sit on a parent cycle; cut each cycle at its first row.
+        for row in range(size):
+            if euler_in[row] < 0:
+                children[parent[row]].remove(row)
+                parent[row] = -1
+                root_outlets[row] = ""
+                _tour([row], children, euler_in, depth, order)
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.euler_in = np.asarray(euler_in, dtype=np.int64)
+        self.depth = np.asarray(depth, dtype=np.int64)
+        self.order = np.asarray(order, dtype=np.int64)
+
+        # Subtree aggregates are pushed up one depth level at a time, deepest first.
+        by_depth = np.argsort(self.depth, kind="stable")
+        boundaries = np.searchsorted(self.depth[by_depth], np.arange(1, self.depth.max(initial=0) + 1))
+        levels = np.split(by_depth, boundaries)
+        subtree = np.ones(size, dtype=np.int64)
+        for rows in reversed(levels[1:]):
+            np.add.at(subtree, self.parent[rows], subtree[rows])
+        self.euler_out = self.euler_in + subtree
+
+        self.outlets: List[str] = []
+        self._outlet_ranges: Dict[str, tuple] = {}
+        self.outlet = np.full(size, -1, dtype=np.int64)
+        for row in self.order[self.parent[self.order] < 0].tolist():
+            name = root_outlets[row]
+            if not name:
+                continue
+            key = _key(name)
+            if key not in self._outlet_ranges:
+                self._outlet_ranges[key] = (len(self.outlets), int(self.euler_in[row]), 0)
+                self.outlets.append(name)
+            index, start, _ = self._outlet_ranges[key]
+            self._outlet_ranges[key] = (index, start, int(self.euler_out[row]))
+            self.outlet[row] = index
+        for rows in levels[1:]:
+            self.outlet[rows] = self.outlet[self.parent[rows]]
+
+        self.length = np.asarray([np.nan if value is None else value for value in lengths], dtype=np.float64)
+        self._length_prefix = np.concatenate(([0.0], np.cumsum(np.nan_to_num(self.length[self.order]))))
+
+        self.countries = sorted({name for items in countries for name in items})
+        country_index = {name: column for column, name in enumerate(self.countries)}
+        self.basin = np.zeros((size, len(self.countries)), dtype=bool)
+        member_rows = [row for row, items in enumerate(countries) for _ in items]
+        member_columns = [country_index[name] for items in countries for name in items]
+        self.basin[member_rows, member_columns] = True
+        for rows in reversed(levels[1:]):
+            np.logical_or.at(self.basin, self.parent[rows], self.basin[rows])
+
+    @classmethod
+    def from_rivers(cls, rivers: Iterable[River]) -> "RiverNetwork":
+        """Index streamed rivers; records sharing a name merge into one node as they do in Neo4j."""
+        rows: Dict[str, int] = {}
+        names: List[str] = []
+        parents: List[Optional[str]] = []
+        lengths: List[Optional[float]] = []
+        countries: List[List[str]] = []
+        for river in rivers:
+            row = rows.get(river.name)
+            if row is None:
+                rows[river.name] = len(names)
+                names.append(river.name)
+                parents.append(river.parent)
+                lengths.append(river.length)
+                countries.append(list(river.countries))
+                continue
+            # The first record's parent and length win; the countries are unioned.
+            countries[row].extend(name for name in river.countries if name not in countries[row])
+        return cls(names, parents, lengths, countries)
+
+    @classmethod
+    def from_dataset(cls, dataset: GraphDataset) -> "RiverNetwork":
+        return cls.from_rivers(dataset.rivers)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def locate(self, name: str) -> Optional[int]:
+        return self._rows.get(_key(name))
+
+    def is_outlet(self, name: str) -> bool:
+        return _key(name) in self._outlet_ranges
+
+    def is_tributary(self, river: str, of: str) -> bool:
+        """Whether ``river`` drains (directly or not) into ``of``; O(1)."""
+        row, ancestor = self.locate(river), self.locate(of)
+        if row is None or ancestor is None or row == ancestor:
+            return False
+        return bool(self.euler_in[ancestor] < self.euler_in[row] < self.euler_out[ancestor])
+
+    def tributaries(self, name: str, max_depth: Optional[int] = None) -> List[str]:
+        """Every river draining into ``name`` in tour order (parents before their tributaries)."""
+        return [self.names[row] for row in self._descendants(name, max_depth).tolist()]
+
+    def _descendants(self, name: str, max_depth: Optional[int] = None) -> np.ndarray:
+        row = self.locate(name)
+        if row is None:
+            return np.empty(0, dtype=np.int64)
+        rows = self.order[self.euler_in[row] + 1 : self.euler_out[row]]
+        if max_depth is not None:
+            rows = rows[self.depth[rows] - self.depth[row] <= max_depth]
+        return rows
+
+    def ancestors(self, name: str) -> List[str]:
+        """Rivers ``name`` flows through on its way to the outlet, nearest first."""
+        row = self.locate(name)
+        path: List[str] = []
+        while row is not None and self.parent[row] >= 0:
+            row = int(self.parent[row])
+            path.append(self.names[row])
+        return path
+
+    def outlet_of(self, name: str) -> Optional[str]:
+        """The sea, lake or ocean the river system of ``name`` ultimately drains into; O(1)."""
+        row = self.locate(name)
+        if row is None or self.outlet[row] < 0:
+            return None
+        return self.outlets[self.outlet[row]]
+
+    def tributary_count(self, name: str) -> int:
+        row = self.locate(name)
+        return 0 if row is None else int(self.euler_out[row] - self.euler_in[row] - 1)
+
+    def system_length(self, name: str) -> float:
+        """Summed length of ``name`` and all its tributaries (unknown lengths count as 0); O(1)."""
+        row = self.locate(name)
+        if row is None:
+            return float("nan")
+        return float(self._length_prefix[self.euler_out[row]] - self._length_prefix[self.euler_in[row]])
+
+    def basin_countries(self, name: str) -> List[str]:
+        """Countries crossed by ``name`` or any of its tributaries."""
+        row = self.locate(name)
+        if row is None:
+            return []
+        return [self.countries[column] for column in np.flatnonzero(self.basin[row]).tolist()]
+
+    def drainage(self, outlet: str, max_depth: Optional[int] = None) -> List[str]:
+        """Rivers draining into ``outlet``; ``max_depth=0`` keeps only those flowing into it directly."""
+        span_ = self._outlet_ranges.get(_key(outlet))
+        if span_ is None:
+            return []
+        rows = self.order[span_[1] : span_[2]]
+        if max_depth is not None:
+            rows = rows[self.depth[rows] <= max_depth]
+        return [self.names[row] for row in rows.tolist()]
+
+    def node_properties(self) -> Iterator[dict]:
+        """Per-river rows ``KnowledgeGraphBuilder.materialize_river_network`` stores on ``(:River)`` nodes."""
+        for row, name in enumerate(self.names):
+            yield {
+                "name": name,
+                "euler_in": int(self.euler_in[row]),
+                "euler_out": int(self.euler_out[row]),
+                "network_depth": int(self.depth[row]),
+                "outlet": self.outlet_of(name),
+                "tributary_count": self.tributary_count(name),
+                "system_length": self.system_length(name),
+                "basin_countries": self.basin_countries(name),
+            }
+
+    def parse(self, query: str, entities: Iterable[str]) -> Optional[RiverQuery]:
+        """Recognise tributary, outlet, basin and "rivers flowing into the <sea>" questions."""
+        entities = list(entities)
+        river = next((entity for entity in entities if self.locate(entity) is not None), None)
+        outlet = next((entity for entity in entities if self.is_outlet(entity)), None)
+        max_depth = 1 if _DIRECT.search(query) else None
+        if river is not None:
+            if _TRIBUTARY.search(query):
+                return RiverQuery("tributaries", river, max_depth)
+            if _OUTLET.search(query):
+                return RiverQuery("outlet", river)
+            if _FLOWS_INTO.search(query):
+                return RiverQuery("tributaries", river, max_depth)
+            if _BASIN.search(query):
+                return RiverQuery("basin", river)
+        drainage = _TRIBUTARY.search(query) or _FLOWS_INTO.search(query) or _BASIN.search(query)
+        if outlet is not None and drainage:
+            return RiverQuery("drainage", outlet, 0 if max_depth else None)
+        return None
+
+    def answer(self, request: RiverQuery, limit: int = DEFAULT_FACT_LIMIT) -> List[str]:
+        """Run a parsed river question and format the result as ``[KG]`` facts."""
+        if request.kind == "outlet":
+            return self._outlet_facts(request.anchor)
+        if request.kind == "drainage":
+            return self._drainage_facts(request.anchor, request.max_depth, limit)
+        facts = [self._system_fact(request.anchor)]
+        if request.kind == "basin":
+            name = self.names[self.locate(request.anchor)]
+            facts.extend(
+                f"[KG] [{country}] -[:IN_BASIN_OF]-> [{name}]" for country in self.basin_countries(name)
+            )
+            return facts
+        row = self.locate(request.anchor)
+        rows = self._descendants(request.anchor, request.max_depth)
+        # Main stems first: shallow tributaries, longest within a level.
+        ranked = sorted(rows.tolist(), key=lambda r: (self.depth[r], -np.nan_to_num(self.length[r])))[:limit]
+        facts.extend(
+            f"[KG] [{self.names[r]}] -[:TRIBUTARY_OF {{depth: {int(self.depth[r] - self.depth[row])}}}]-> "
+            f"[{self.names[row]}]"
+            for r in ranked
+        )
+        return facts
+
+    def _system_fact(self, name: str) -> str:
+        row = self.locate(name)
+        name = self.names[row]
+        return (
+            f"[KG] [{name}] -[:RIVER_SYSTEM {{tributaries: {self.tributary_count(name)}, "
+            f"total_length_km: {self.system_length(name):.0f}, countries: {int(self.basin[row].sum())}}}]-> "
+            f"[{self.outlet_of(name) or name}]"
+        )
+
+    def _outlet_facts(self, name: str) -> List[str]:
+        name = self.names[self.locate(name)]
+        outlet = self.outlet_of(name)
+        if outlet is None:
+            return []
+        via = self.ancestors(name)
+        properties = f' {{via: "{" > ".join(via)}"}}' if via else ""
+        return [f"[KG] [{name}] -[:DRAINS_INTO{properties}]-> [{outlet}]"]
+
+    def _drainage_facts(self, outlet: str, max_depth: Optional[int], limit: int) -> List[str]:
+        outlet = self.outlets[self._outlet_ranges[_key(outlet)][0]]
+        rivers = sorted(self.drainage(outlet, max_depth), key=self.system_length, reverse=True)[:limit]
+        return [
+            f"[KG] [{river}] -[:DRAINS_INTO {{tributaries: {self.tributary_count(river)}}}]-> [{outlet}]"
+            for river in rivers
+        ]
+
+
+def retrieve_river_facts(query: str, network: RiverNetwork | None, entities: Iterable[str]) -> List[str]:
+    """River-network facts for ``query`` (empty when it is not a tributary/outlet/basin question)."""
+    if network is None:
+        return []
+    request = network.parse(query, entities)
+    if request is None:
+        return []
+    with span("rivers", kind=request.kind, anchor=request.anchor) as river_span:
+        facts = network.answer(request)
+        river_span.set(facts=len(facts))
+    return facts
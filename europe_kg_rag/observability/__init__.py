@@ -0,0 +1,31 @@
+"""
+Lightweight tracing and latency metrics for the retrieval pipeline.
+"""
+
+from .tracing import (
+    Histogram,
+    JsonLinesSink,
+    SpanRecord,
+    Tracer,
+    current_trace_id,
+    enable_tracing,
+    serve_metrics,
+    span,
+    trace_request,
+    traced,
+    tracer,
+)
+
+__all__ = [
+    "Histogram",
+    "JsonLinesSink",
+    "SpanRecord",
+    "Tracer",
+    "current_trace_id",
+    "enable_tracing",
+    "serve_metrics",
+    "span",
+    "trace_request",
+    "traced",
+    "tracer",
+]
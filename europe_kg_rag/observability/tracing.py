@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import bisect
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# Upper bounds (seconds) of the Prometheus histogram buckets; spans range from
+# sub-millisecond FAISS searches to multi-second Gemini calls.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+_current_trace_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "europe_kg_rag_trace_id", default=None
+)
+_current_span_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "europe_kg_rag_span_id", default=None
+)
+
+
+def current_trace_id() -> Optional[str]:
+    return _current_trace_id.get()
+
+
+class Histogram:
+    """Bucketed latency histogram with a bounded sample window for exact percentiles."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, window: int = 10_000) -> None:
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self.bucket_counts[bisect.bisect_left(self.buckets, seconds)] += 1
+            self.count += 1
+            self.total += seconds
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return 0.0
+        index = min(len(samples) - 1, max(0, round(q / 100.0 * (len(samples) - 1))))
+        return samples[index]
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+        }
+
+
+@dataclass(slots=True)
+class SpanRecord:
+    trace_id: Optional[str]
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start: float
+    duration: float
+    attributes: Dict[str, Any]
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000.0, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class JsonLinesSink:
+    """Append finished spans to a JSON-lines log file."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def __call__(self, record: SpanRecord) -> None:
+        line = json.dumps(record.to_dict(), ensure_ascii=False, default=str)
+        with self._lock:
+            self._handle.write(line + "\n")
+            self._handle.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._handle.close()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        return False
+
+    def set(self, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "attributes", "span_id", "parent_id", "_started", "_wall", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attributes: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id: Optional[str] = None
+
+    def __enter__(self) -> "_Span":
+        self.parent_id = _current_span_id.get()
+        self._token = _current_span_id.set(self.span_id)
+        self._wall = time.time()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> bool:
+        duration = time.perf_counter() - self._started
+        _current_span_id.reset(self._token)
+        self.tracer._finish(
+            SpanRecord(
+                trace_id=_current_trace_id.get(),
+                span_id=self.span_id,
+                parent_id=self.parent_id,
+                name=self.name,
+                start=self._wall,
+                duration=duration,
+                attributes=self.attributes,
+                error=f"{exc_type.__name__}: {exc}" if exc_type else None,
+            )
+        )
+        return False
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+
+class Tracer:
+    """Collect per-stage spans, aggregate latency histograms and export them."""
+
+    def __init__(self, enabled: bool = False, sink: Callable[[SpanRecord], None] | None = None) -> None:
+        self.enabled = enabled
+        self.sink = sink
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def span(self, name: str, **attributes: Any):
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, attributes)
+
+    def traced(self, name: str | None = None) -> Callable[[F], F]:
+        def decorator(func: F) -> F:
+            span_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Span(self, span_name, {}):
+                    return func(*args, **kwargs)
+
+            return wrapper  # type: ignore[return-value]
+
+        return decorator
+
+    @contextmanager
+    def trace(self, trace_id: str | None = None) -> Iterator[str]:
+        """Scope a request: spans opened inside share one trace id."""
+        trace_id = trace_id or uuid.uuid4().hex
+        token = _current_trace_id.set(trace_id)
+        try:
+            yield trace_id
+        finally:
+            _current_trace_id.reset(token)
+
+    def observe(self, name: str, seconds: float, **attributes: Any) -> None:
+        """Record a duration measured elsewhere (e.g. time-to-first-token)."""
+        if not self.enabled:
+            return
+        self._finish(
+            SpanRecord(
+                trace_id=_current_trace_id.get(),
+                span_id=uuid.uuid4().hex[:16],
+                parent_id=_current_span_id.get(),
+                name=name,
+                start=time.time() - seconds,
+                duration=seconds,
+                attributes=attributes,
+            )
+        )
+
+    def histogram(self, name: str) -> Histogram:
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram()
+            return histogram
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            names = sorted(self._histograms)
+        return {name: self.histogram(name).summary() for name in names}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self, metric: str = "europe_kg_rag_stage_duration_seconds") -> str:
+        lines: List[str] = [
+            f"# HELP {metric} Latency of retrieval pipeline stages.",
+            f"# TYPE {metric} histogram",
+        ]
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+        for name, histogram in histograms:
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f'{metric}_bucket{{stage="{label}",le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{metric}_sum{{stage="{label}"}} {histogram.total}')
+            lines.append(f'{metric}_count{{stage="{label}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def _finish(self, record: SpanRecord) -> None:
+        self.histogram(record.name).observe(record.duration)
+        if self.sink is not None:
+            self.sink(record)
+
+
+tracer = Tracer(enabled=os.environ.get("EUROPE_KG_RAG_TRACING", "").lower() in {"1", "true", "yes"})
+
+
+def span(name: str, **attributes: Any):
+    return tracer.span(name, **attributes)
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    return tracer.traced(name)
+
+
+def trace_request(trace_id: str | None = None):
+    return tracer.trace(trace_id)
+
+
+def enable_tracing(log_path: str | Path | None = None) -> Tracer:
+    """Turn on the shared tracer, optionally writing spans to a JSON-lines file."""
+    if log_path is not None:
+        tracer.sink = JsonLinesSink(log_path)
+    tracer.enabled = True
+    return tracer
+
+
+def serve_metrics(port: int = 9464, host: str = "127.0.0.1", source: Tracer | None = None) -> ThreadingHTTPServer:
+    """Expose ``/metrics`` in Prometheus text format from a daemon thread."""
+    metrics_tracer = source or tracer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics_tracer.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
@@ -2,13 +2,52 @@
 Retrieval utilities that power the hybrid KG + vector search pipeline.
 """
 
+from .attributes import AttributeQuery, AttributeStore, ColumnTable, retrieve_attribute_facts
+from .embeddings import BatchingEmbedder, CachedEmbedder, GeminiEmbedder, HashingEmbedder
 from .entity_extraction import EntityExtractor, entity_driven_retrieval
 from .fusion import rank_fusion_retrieval
-from .vector_retriever import VectorRetriever
+from .geo import GeoIndex, GeoMatch, KDTree, format_geo_facts, haversine_km, retrieve_geo_facts
+from .router import KG_ROUTE, QueryRouter, RoutingDecision, default_router
+from .strategies import (
+    STRATEGIES,
+    RetrievalBackends,
+    retrieve_hybrid_naive,
+    retrieve_kg_only,
+    retrieve_routed,
+    retrieve_text_only,
+    run_strategy,
+)
+from .vector_retriever import VectorRetriever, corpus_digest
 
 __all__ = [
     "EntityExtractor",
     "VectorRetriever",
+    "corpus_digest",
+    "BatchingEmbedder",
+    "CachedEmbedder",
+    "GeminiEmbedder",
+    "HashingEmbedder",
     "rank_fusion_retrieval",
     "entity_driven_retrieval",
+    "RetrievalBackends",
+    "GeoIndex",
+    "AttributeStore",
+    "AttributeQuery",
+    "ColumnTable",
+    "retrieve_attribute_facts",
+    "GeoMatch",
+    "KDTree",
+    "haversine_km",
+    "format_geo_facts",
+    "retrieve_geo_facts",
+    "KG_ROUTE",
+    "QueryRouter",
+    "RoutingDecision",
+    "default_router",
+    "STRATEGIES",
+    "retrieve_kg_only",
+    "retrieve_text_only",
+    "retrieve_hybrid_naive",
+    "retrieve_routed",
+    "run_strategy",
 ]
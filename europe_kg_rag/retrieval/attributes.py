@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from europe_kg_rag.data.models import GraphDataset
+from europe_kg_rag.observability import span
+
+COUNTRY_TABLE = "countries"
+RIVER_TABLE = "rivers"
+AGGREGATES = ("count", "sum", "mean", "min", "max")
+EUROPE = "Europe"
+EUROPEAN_UNION = "European Union"
+
+# Bare size superlatives need a country/area subject next to them, so "the largest employer in
+# Germany" or "the biggest lake in Finland" is not read as a Europe-wide area ranking.
+_SIZE_SUBJECT = r"(?:countr(?:y|ies)|nations?|states|members|rivers?|area|size)"
+
+
+def _size_superlative(words: str) -> str:
+    return (
+        rf"\b{words}\s+(?:\S+\s+){{0,2}}{_SIZE_SUBJECT}\b"
+        rf"|\b{_SIZE_SUBJECT}\s+(?:is|are)\s+(?:the\s+)?{words}\b"
+    )
+
+
+# (pattern, table, column, descending); the first match wins, so specific wording comes first.
+_RANKINGS = (
+    (r"\b(most|highest|largest|greatest|biggest) (flow|discharge)\b", RIVER_TABLE, "flow", True),
+    (r"\b(least|lowest|smallest) (flow|discharge)\b", RIVER_TABLE, "flow", False),
+    (r"\b(largest|biggest) (drainage )?basin\b", RIVER_TABLE, "basin", True),
+    (r"\b(smallest) (drainage )?basin\b", RIVER_TABLE, "basin", False),
+    (r"\blongest\b", RIVER_TABLE, "length", True),
+    (r"\bshortest\b", RIVER_TABLE, "length", False),
+    (r"\b(most densely|densest|(highest|largest) (population )?density)\b", COUNTRY_TABLE, "density", True),
+    (r"\b(least densely|sparsest|(lowest|smallest) (population )?density)\b", COUNTRY_TABLE, "density",
+     False),
+    (r"\b(most|highest|largest) population\b|\bmost (populous|people)\b", COUNTRY_TABLE, "population", True),
+    (r"\b(least|lowest|smallest) population\b|\bleast populous\b|\bfewest people\b", COUNTRY_TABLE,
+     "population", False),
+    (_size_superlative(r"(?:largest|biggest)"), COUNTRY_TABLE, "area_km2", True),
+    (_size_superlative(r"smallest"), COUNTRY_TABLE, "area_km2", False),
+)
+_AGGREGATE_WORDS = (
+    (r"\bhow many (people|inhabitants)\b", "sum"),
+    (r"\b(total|combined|sum of|overall)\b", "sum"),
+    (r"\b(average|mean)\b", "mean"),
+    (r"\bhow many\b|\bnumber of\b", "count"),
+)
+# Density first: "population density" names the density column, not population.
+_COLUMN_WORDS = (
+    (r"\bdensity\b|\bdensely\b", COUNTRY_TABLE, "density"),
+    (r"\bpopulation\b|\bpeople\b|\binhabitants\b", COUNTRY_TABLE, "population"),
+    (r"\barea\b|\bsize\b", COUNTRY_TABLE, "area_km2"),
+    (r"\bflow\b|\bdischarge\b", RIVER_TABLE, "flow"),
+    (r"\bbasin\b", RIVER_TABLE, "basin"),
+    (r"\blength\b|\blong\b", RIVER_TABLE, "length"),
+)
+_TOP_K = re.compile(
+    r"\b(?:top|first)\s+(\d+)\b|\b(\d+)\s+(?:most|least|largest|smallest|longest|shortest|biggest)\b",
+    re.IGNORECASE,
+)
+# Generic size words pick the column the question names, else area (countries) / basin (rivers).
+_GENERIC_SIZE_COLUMNS = {"area_km2", "basin"}
+_EU = re.compile(r"\b(eu|european union)\b", re.IGNORECASE)
+_NON_EU = re.compile(
+    r"\b(non-eu|outside the (eu|european union)|not in the (eu|european union))\b", re.IGNORECASE
+)
+_RIVER = re.compile(r"\brivers?\b", re.IGNORECASE)
+# Counts are only answered for the entity types the tables hold.
+_COUNTED = re.compile(
+    r"\b(?:how many|number of)\s+(?:\w+\s+)?(countries|states|nations|members|rivers)\b", re.IGNORECASE
+)
+# River-network and threshold questions look like rankings but are not answerable here.
+_UNSUPPORTED = re.compile(
+    r"\btributar(y|ies)\b|\b(more|less|fewer|greater|larger|smaller|longer|shorter) than\b"
+    r"|\b(over|under|above|below|at least|at most)\s+\d",
+    re.IGNORECASE,
+)
+# Entity names that only restate the default scope.
+_SCOPE_NAMES = frozenset({"europe", "eu", "european union"})
+# A capitalised place after "in"/"of" the extractor missed, e.g. "How many people live in Atlantis?".
+_NAMED_PLACE = re.compile(r"\b(?:in|of) (?!(?:Europe|EU|European)\b)[A-Z]\w+")
+_CITY = re.compile(r"\bcit(y|ies)\b", re.IGNORECASE)
+_BORDER = re.compile(r"\b(border(s|ing)?|neighbou?r(s|ing)?)\b", re.IGNORECASE)
+
+_UNITS = {"length": "km", "basin": "km2", "flow": "m3_s", "area_km2": "km2", "density": "per_km2"}
+
+
+@dataclass(slots=True)
+class ColumnTable:
+    """One entity type stored column-wise: names, numeric columns (NaN = missing) and bitmaps."""
+
+    names: List[str]
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+    # relation -> (target names, bool matrix of shape (rows, targets))
+    memberships: Dict[str, tuple] = field(default_factory=dict)
+    flags: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def member_of(self, relation: str, target: str) -> np.ndarray:
+        targets, bitmap = self.memberships[relation]
+        try:
+            return bitmap[:, targets.index(target)].copy()
+        except ValueError:
+            return np.zeros(len(self.names), dtype=bool)
+
+
+@dataclass(slots=True)
+class AttributeQuery:
+    table: str
+    column: str
+    descending: bool = True
+    k: int = 5
+    aggregate: Optional[str] = None
+    scope: str = EUROPE
+    relation: Optional[str] = None
+    target: Optional[str] = None
+    eu_member: Optional[bool] = None
+    # Restricts the query to this one row (e.g. "How many people live in France?").
+    name: Optional[str] = None
+
+
+class AttributeStore:
+    """Vectorised filter / top-k / aggregate over numeric attributes of countries and rivers."""
+
+    def __init__(self, tables: Dict[str, ColumnTable]) -> None:
+        self.tables = tables
+        self._country_names = {name.casefold(): name for name in tables[COUNTRY_TABLE].names}
+        names = sorted(tables[COUNTRY_TABLE].names, key=len, reverse=True)
+        self._country_pattern = re.compile(r"\b(" + "|".join(map(re.escape, names)) + r")\b", re.IGNORECASE)
+
+    @classmethod
+    def from_dataset(cls, dataset: GraphDataset) -> "AttributeStore":
+        country_names = [country.name for country in dataset.countries]
+        country_index = {name: row for row, name in enumerate(country_names)}
+
+        borders = np.zeros((len(country_names), len(country_names)), dtype=bool)
+        for row, country in enumerate(dataset.countries):
+            for neighbour in country.borders_with:
+                if neighbour in country_index:
+                    borders[row, country_index[neighbour]] = True
+                    borders[country_index[neighbour], row] = True
+        countries = ColumnTable(
+            names=country_names,
+            columns={
+                "population": _column(country.population for country in dataset.countries),
+                "area_km2": _column(country.area_km2 for country in dataset.countries),
+                "density": _column(country.density for country in dataset.countries),
+            },
+            memberships={"BORDERS_WITH": (country_names, borders)},
+            flags={"eu_member": np.asarray([country.eu_member for country in dataset.countries], dtype=bool)},
+        )
+
+        flows_through = np.zeros((len(dataset.rivers), len(country_names)), dtype=bool)
+        for row, river in enumerate(dataset.rivers):
+            for country_name in river.countries:
+                if country_name in country_index:
+                    flows_through[row, country_index[country_name]] = True
+        rivers = ColumnTable(
+            names=[river.name for river in dataset.rivers],
+            columns={
+                name: _column(getattr(river, name) for river in dataset.rivers)
+                for name in ("length", "basin", "flow", "rank_of_length", "rank_of_area", "rank_of_flow")
+            },
+            memberships={"FLOWS_THROUGH": (country_names, flows_through)},
+        )
+        # A river inherits EU membership when any country it flows through is a member.
+        rivers.flags["eu_member"] = (flows_through & countries.flags["eu_member"]).any(axis=1)
+        return cls({COUNTRY_TABLE: countries, RIVER_TABLE: rivers})
+
+    def mask(self, request: AttributeQuery) -> np.ndarray:
+        table = self.tables[request.table]
+        selected = np.ones(len(table), dtype=bool)
+        if request.relation and request.target:
+            selected &= table.member_of(request.relation, request.target)
+        if request.eu_member is not None:
+            selected &= table.flags["eu_member"] == request.eu_member
+        if request.name is not None:
+            selected &= np.asarray(table.names, dtype=object) == request.name
+        return selected
+
+    def top_k(
+        self,
+        table_name: str,
+        column: str,
+        k: int = 5,
+        mask: np.ndarray | None = None,
+        descending: bool = True,
+    ) -> List[tuple]:
+        """``(name, value, rank)`` for the k best rows with a known value, best first."""
+        table = self.tables[table_name]
+        values = table.columns[column]
+        rows = np.flatnonzero(~np.isnan(values) if mask is None else mask & ~np.isnan(values))
+        if not len(rows) or k <= 0:
+            return []
+        keys = -values[rows] if descending else values[rows]
+        k = min(k, len(rows))
+        best = np.argpartition(keys, k - 1)[:k] if k < len(rows) else np.arange(len(rows))
+        best = best[np.argsort(keys[best], kind="stable")]
+        return [(table.names[rows[i]], float(values[rows[i]]), rank) for rank, i in enumerate(best, 1)]
+
+    def aggregate(self, table_name: str, column: str, op: str, mask: np.ndarray | None = None) -> tuple:
+        """``(value, count)`` of ``op`` over rows with a known value."""
+        if op not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate: {op}")
+        values = self.tables[table_name].columns[column]
+        known = ~np.isnan(values) if mask is None else mask & ~np.isnan(values)
+        selected = values[known]
+        if op == "count":
+            count = int(known.sum()) if mask is None else int(mask.sum())
+            return float(count), count
+        if not len(selected):
+            return float("nan"), 0
+        return float(getattr(np, op)(selected)), len(selected)
+
+    def answer(self, request: AttributeQuery) -> List[str]:
+        """Run a parsed question and format the result as facts."""
+        mask = self.mask(request)
+        if request.aggregate:
+            value, count = self.aggregate(request.table, request.column, request.aggregate, mask)
+            if request.aggregate == "count":
+                relation = f"COUNT_{request.table.upper()}"
+                return [f"[KG] [{request.scope}] -[:{relation} {{value: {count}}}]-> [{request.table}]"]
+            if np.isnan(value):
+                return []
+            if request.name is not None:
+                unit = _UNITS.get(request.column, "")
+                unit_part = f", unit: {unit}" if unit else ""
+                return [
+                    f"[KG] [{request.name}] -[:{request.column.upper()} "
+                    f"{{value: {_format_value(value)}{unit_part}}}]-> [{request.table}]"
+                ]
+            relation = f"{request.aggregate.upper()}_{request.column.upper()}"
+            return [
+                f"[KG] [{request.scope}] -[:{relation} {{value: {_format_value(value)}, count: {count}}}]-> "
+                f"[{request.table}]"
+            ]
+        ranked = self.top_k(request.table, request.column, request.k, mask, request.descending)
+        return format_attribute_facts(ranked, request.column, request.scope, request.descending)
+
+    def parse(self, query: str, entities: Iterable[str] = ()) -> Optional[AttributeQuery]:
+        """Recognise ranking ("top 5 most populous EU members") and aggregate questions.
+
+        Returns None unless every named entity is a known country (or Europe / the EU) the
+        query can be scoped to, so questions about other entities fall through to the graph.
+        """
+        if _CITY.search(query) or _UNSUPPORTED.search(query):
+            return None  # city rankings are proximity questions for the geo index
+        request = self._parse_ranking(query) or self._parse_aggregate(query)
+        if request is None:
+            return None
+
+        countries = []
+        for entity in entities:
+            key = _entity_key(entity)
+            if key in self._country_names:
+                countries.append(self._country_names[key])
+            elif key not in _SCOPE_NAMES:
+                return None
+        if not countries:
+            # Fall back to country names in the text when extraction missed them.
+            matches = self._country_pattern.findall(query)
+            countries = [self._country_names[match.casefold()] for match in matches]
+        if not countries and _NAMED_PLACE.search(query):
+            return None
+        country = countries[0] if countries else None
+        if country:
+            if request.table == RIVER_TABLE:
+                request.relation, request.target = "FLOWS_THROUGH", country
+                request.scope = country
+            elif _BORDER.search(query):
+                request.relation, request.target = "BORDERS_WITH", country
+                request.scope = f"neighbours of {country}"
+            elif request.aggregate and request.aggregate != "count":
+                request.name = request.scope = country
+            elif request.aggregate:
+                return None
+        if _NON_EU.search(query):
+            request.eu_member = False
+            request.scope = f"non-EU {request.scope}" if request.scope != EUROPE else "non-EU Europe"
+        elif _EU.search(query):
+            request.eu_member = True
+            request.scope = EUROPEAN_UNION if request.scope == EUROPE else f"{request.scope} (EU)"
+        return request
+
+    def _parse_ranking(self, query: str) -> Optional[AttributeQuery]:
+        for pattern, table, column, descending in _RANKINGS:
+            if re.search(pattern, query, re.IGNORECASE):
+                if column in _GENERIC_SIZE_COLUMNS:
+                    table, column = self._size_column(query, table, column)
+                top = _TOP_K.search(query)
+                k = int(top.group(1) or top.group(2)) if top else 5
+                return AttributeQuery(table, column, descending, k=k)
+        return None
+
+    @staticmethod
+    def _size_column(query: str, table: str, column: str) -> tuple:
+        for pattern, named_table, named_column in _COLUMN_WORDS:
+            if re.search(pattern, query, re.IGNORECASE):
+                return named_table, named_column
+        if _RIVER.search(query):
+            return RIVER_TABLE, "basin"
+        return table, column
+
+    def _parse_aggregate(self, query: str) -> Optional[AttributeQuery]:
+        op = next((op for pattern, op in _AGGREGATE_WORDS if re.search(pattern, query, re.IGNORECASE)), None)
+        if op is None:
+            return None
+        if op == "count":
+            counted = _COUNTED.search(query)
+            if counted is None:
+                return None
+            table = RIVER_TABLE if counted.group(1).lower() == "rivers" else COUNTRY_TABLE
+            return AttributeQuery(table, "length" if table == RIVER_TABLE else "population", aggregate=op)
+        for pattern, table, column in _COLUMN_WORDS:
+            if re.search(pattern, query, re.IGNORECASE):
+                return AttributeQuery(table, column, aggregate=op)
+        return None
+
+
+def format_attribute_facts(
+    ranked: Sequence[tuple], column: str, scope: str, descending: bool = True
+) -> List[str]:
+    """Render ``(name, value, rank)`` rows as ``[KG]`` facts ranked within ``scope``."""
+    direction = "TOP" if descending else "BOTTOM"
+    unit = _UNITS.get(column, "")
+    unit_part = f", unit: {unit}" if unit else ""
+    return [
+        f"[KG] [{name}] -[:{direction}_{column.upper()} "
+        f"{{rank: {rank}, value: {_format_value(value)}{unit_part}}}]-> [{scope}]"
+        for name, value, rank in ranked
+    ]
+
+
+def retrieve_attribute_facts(query: str, store: AttributeStore | None, entities: Iterable[str]) -> List[str]:
+    """Ranking/aggregate facts for ``query`` (empty when it asks for neither)."""
+    if store is None:
+        return []
+    request = store.parse(query, entities)
+    if request is None:
+        return []
+    with span("attributes", table=request.table, column=request.column) as attribute_span:
+        facts = store.answer(request)
+        attribute_span.set(facts=len(facts))
+    return facts
+
+
+def _entity_key(entity: str) -> str:
+    key = entity.casefold().strip()
+    return key[4:] if key.startswith("the ") else key
+
+
+def _column(values: Iterable[Optional[float]]) -> np.ndarray:
+    return np.asarray([np.nan if value is None else value for value in values], dtype=np.float64)
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.2f}"
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import re
+from typing import Iterable, List
+
+from europe_kg_rag.generation.context import estimate_tokens
+
+SUMMARY_GRANULARITY = "summary"
+PASSAGE_GRANULARITY = "passage"
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_SECTION_BREAK = re.compile(r"\n\s*\n+")
+
+
+def split_sentences(text: str) -> List[str]:
+    sentences: List[str] = []
+    for block in _SECTION_BREAK.split(text):
+        block = " ".join(block.split())
+        if block:
+            sentences.extend(sentence for sentence in _SENTENCE_BOUNDARY.split(block) if sentence)
+    return sentences
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> List[str]:
+    words = sentence.split()
+    pieces: List[str] = []
+    current: List[str] = []
+    for word in words:
+        if current and estimate_tokens(" ".join(current + [word])) > max_tokens:
+            pieces.append(" ".join(current))
+            current = []
+        current.append(word)
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def split_passages(text: str, max_tokens: int = 128, overlap_tokens: int = 32) -> List[str]:
+    """Pack whole sentences into passages of at most ``max_tokens``.
+
+    Each passage after the first repeats trailing sentences (up to ``overlap_tokens``)
+    of the previous one, so a fact spanning a boundary is retrievable from either side.
+    """
+    sentences: List[str] = []
+    for sentence in split_sentences(text):
+        if estimate_tokens(sentence) > max_tokens:
+            sentences.extend(_split_long_sentence(sentence, max_tokens))
+        else:
+            sentences.append(sentence)
+
+    passages: List[str] = []
+    current: List[str] = []
+    fresh = 0
+    for sentence in sentences:
+        if current and fresh and estimate_tokens(" ".join(current + [sentence])) > max_tokens:
+            passages.append(" ".join(current))
+            overlap: List[str] = []
+            for previous in reversed(current):
+                if estimate_tokens(" ".join([previous] + overlap)) > overlap_tokens:
+                    break
+                overlap.insert(0, previous)
+            # Never carry so much overlap that the next sentence would not fit.
+            while overlap and estimate_tokens(" ".join(overlap + [sentence])) > max_tokens:
+                overlap.pop(0)
+            current, fresh = overlap, 0
+        current.append(sentence)
+        fresh += 1
+    if current and fresh:
+        passages.append(" ".join(current))
+    return passages
+
+
+def chunk_document(
+    entity: str,
+    text: str,
+    summary: str | None = None,
+    max_tokens: int = 128,
+    overlap_tokens: int = 32,
+) -> List[dict]:
+    """Turn one entity's article into corpus records with stable, entity-linked ids.
+
+    The summary (if any) becomes ``{entity}#summary``; body passages are ``{entity}#p000``,
+    ``{entity}#p001``, ... in document order.
+    """
+    records: List[dict] = []
+    if summary:
+        records.append(
+            {
+                "id": f"{entity}#summary",
+                "entity": entity,
+                "granularity": SUMMARY_GRANULARITY,
+                "position": -1,
+                "text": " ".join(summary.split()),
+            }
+        )
+    for position, passage in enumerate(split_passages(text, max_tokens, overlap_tokens)):
+        records.append(
+            {
+                "id": f"{entity}#p{position:03d}",
+                "entity": entity,
+                "granularity": PASSAGE_GRANULARITY,
+                "position": position,
+                "text": passage,
+            }
+        )
+    return records
+
+
+def collapse_by_entity(documents: Iterable[dict], k: int) -> List[dict]:
+    """Keep the best-ranked record per entity (falls back to ``id`` for unchunked corpora)."""
+    seen = set()
+    collapsed: List[dict] = []
+    for document in documents:
+        entity = document.get("entity", document.get("id"))
+        if entity in seen:
+            continue
+        seen.add(entity)
+        collapsed.append(document)
+        if len(collapsed) >= k:
+            break
+    return collapsed
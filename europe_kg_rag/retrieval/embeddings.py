@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import contextvars
+import hashlib
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import google.generativeai as genai
+import numpy as np
+
+from europe_kg_rag.observability import span, tracer
+
+_TOKEN_PATTERN = re.compile(r"\w+", flags=re.UNICODE)
+
+
+class GeminiEmbedder:
+    """Batch embedding client backed by ``genai.embed_content``."""
+
+    def __init__(self, model_name: str, api_key: str | None = None) -> None:
+        self.model_name = model_name
+        self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
+        if not self.api_key:
+            raise EnvironmentError("GOOGLE_API_KEY is required for GeminiEmbedder.")
+        genai.configure(api_key=self.api_key)
+
+    def embed(self, texts: Sequence[str], task_type: str = "RETRIEVAL_QUERY") -> np.ndarray:
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        with span("embedding", batch_size=len(texts)):
+            response = genai.embed_content(
+                model=self.model_name,
+                content=list(texts),
+                task_type=task_type,
+            )
+        return np.array(response["embedding"], dtype=np.float32).reshape(len(texts), -1)
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder: hashed bag-of-words vectors, L2-normalised.
+
+    Texts sharing words land close together, so retrieval behaves plausibly
+    in benchmarks and tests without any network access.
+    """
+
+    def __init__(self, dim: int = 128, model_name: str = "hashing") -> None:
+        self.dim = dim
+        self.model_name = model_name
+
+    def embed(self, texts: Sequence[str], task_type: str = "RETRIEVAL_QUERY") -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in _TOKEN_PATTERN.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                vectors[row, bucket] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class CachedEmbedder:
+    """Persist embeddings in SQLite so repeated runs (and index rebuilds) skip the API."""
+
+    def __init__(self, embedder, path: str | Path = "data/cache/embeddings.sqlite") -> None:
+        self.embedder = embedder
+        self.model_name = getattr(embedder, "model_name", type(embedder).__name__)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._connection.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+    def embed(self, texts: Sequence[str], task_type: str = "RETRIEVAL_QUERY") -> np.ndarray:
+        keys = [self._key(text, task_type) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._connection.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+
+        first_missing: Dict[str, int] = {}
+        for idx, key in enumerate(keys):
+            if key not in found and key not in first_missing:
+                first_missing[key] = idx
+        missing: List[int] = list(first_missing.values())
+        self.hits += len(keys) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            fresh = self.embedder.embed([texts[idx] for idx in missing], task_type)
+            with self._lock:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [
+                        (keys[idx], np.asarray(vector, dtype=np.float32).tobytes())
+                        for idx, vector in zip(missing, fresh)
+                    ],
+                )
+                self._connection.commit()
+            for idx, vector in zip(missing, fresh):
+                found[keys[idx]] = np.asarray(vector, dtype=np.float32)
+
+        if not keys:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack([found[key] for key in keys])
+
+    def _key(self, text: str, task_type: str) -> str:
+        payload = f"{self.model_name}\x1f{task_type}\x1f{text}".encode("utf-8")
+        return hashlib.sha256(payload).hexdigest()
+
+
+@dataclass(slots=True)
+class _PendingText:
+    text: str
+    task_type: str
+    future: Future
+    queued_at: float
+    # The submitter's context, so its trace gets the queue wait recorded on the worker thread.
+    context: contextvars.Context
+
+
+class BatchingEmbedder:
+    """Coalesce concurrent ``embed`` calls from many threads into batched calls on ``embedder``.
+
+    ``submit`` queues one text and returns a ``Future``. A background thread flushes the queue once
+    ``max_batch_size`` texts are waiting or ``max_wait`` seconds after the first one arrived, and
+    embeds each distinct (text, task type) once per flush. Calls with at least ``max_batch_size``
+    texts (index builds) go straight to ``embedder``.
+    """
+
+    def __init__(self, embedder, max_batch_size: int = 32, max_wait: float = 0.005) -> None:
+        self.embedder = embedder
+        self.model_name = getattr(embedder, "model_name", type(embedder).__name__)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batches = 0
+        self.items = 0
+        self.unique = 0
+        self._queue: "queue.SimpleQueue[Optional[_PendingText]]" = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, text: str, task_type: str = "RETRIEVAL_QUERY") -> Future:
+        future: Future = Future()
+        self._start()
+        pending = _PendingText(text, task_type, future, time.perf_counter(), contextvars.copy_context())
+        self._queue.put(pending)
+        return future
+
+    def embed(self, texts: Sequence[str], task_type: str = "RETRIEVAL_QUERY") -> np.ndarray:
+        if not texts or len(texts) >= self.max_batch_size:
+            return self.embedder.embed(texts, task_type)
+        # The wrapped embedder's own span runs on the worker thread outside any request trace;
+        # this one covers queueing plus the shared call in the caller's trace.
+        with span("embedding.batched", texts=len(texts)):
+            futures = [self.submit(text, task_type) for text in texts]
+            return np.vstack([future.result() for future in futures])
+
+    def close(self) -> None:
+        """Flush what is queued and stop the worker; a later ``submit`` starts a new one."""
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            self._queue.put(None)
+            worker.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            stopping = False
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    pending = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if pending is None:
+                    stopping = True
+                    break
+                batch.append(pending)
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch: List[_PendingText]) -> None:
+        # Cancelled futures are dropped rather than computed.
+        batch = [pending for pending in batch if pending.future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        started = time.perf_counter()
+        waiters: Dict[Tuple[str, str], List[Future]] = {}
+        for pending in batch:
+            pending.context.run(tracer.observe, "embedding.queue_wait", started - pending.queued_at)
+            waiters.setdefault((pending.task_type, pending.text), []).append(pending.future)
+        by_task: Dict[str, List[str]] = {}
+        for task_type, text in waiters:
+            by_task.setdefault(task_type, []).append(text)
+
+        for task_type, texts in by_task.items():
+            try:
+                vectors = self.embedder.embed(texts, task_type)
+                if len(vectors) != len(texts):
+                    raise ValueError(f"Embedder returned {len(vectors)} vectors for {len(texts)} texts")
+            except Exception as exc:
+                for text in texts:
+                    for future in waiters[task_type, text]:
+                        future.set_exception(exc)
+                continue
+            for text, vector in zip(texts, vectors):
+                for future in waiters[task_type, text]:
+                    future.set_result(vector)
+        tracer.observe("embedding.batch", time.perf_counter() - started, size=len(batch), unique=len(waiters))
+        with self._lock:
+            self.batches += 1
+            self.items += len(batch)
+            self.unique += len(waiters)
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+from typing import Iterable, List, Tuple
 
 import spacy
 
+from europe_kg_rag.graph.queries import NEIGHBOUR_QUERY
+from europe_kg_rag.observability import span
+
 
 class EntityExtractor:
     """Wrapper around spaCy for lightweight entity extraction."""
@@ -15,9 +18,48 @@ class EntityExtractor:
     def extract_entities(self, text: str) -> List[str]:
         if not text:
             return []
-        doc = self.nlp(text)
+        with span("extraction"):
+            doc = self.nlp(text)
+            return self._entities_from_doc(doc)
+
+    def extract_entities_batch(self, texts: Iterable[str], batch_size: int = 64) -> List[List[str]]:
+        """Run spaCy over many texts at once via ``nlp.pipe``."""
+        texts = list(texts)
+        entities: List[List[str]] = [[] for _ in texts]
+        non_empty = [idx for idx, text in enumerate(texts) if text]
+        with span("extraction.batch", size=len(non_empty)):
+            docs = self.nlp.pipe((texts[idx] for idx in non_empty), batch_size=batch_size)
+            for idx, doc in zip(non_empty, docs):
+                entities[idx] = self._entities_from_doc(doc)
+        return entities
+
+    def extract_labelled_entities(self, text: str) -> List[Tuple[str, str]]:
+        """Like ``extract_entities`` but keeps the spaCy label, e.g. ``("Spain", "GPE")``."""
+        if not text:
+            return []
+        with span("extraction"):
+            return self._labelled_entities_from_doc(self.nlp(text))
+
+    def extract_labelled_entities_batch(
+        self, texts: Iterable[str], batch_size: int = 64
+    ) -> List[List[Tuple[str, str]]]:
+        texts = list(texts)
+        entities: List[List[Tuple[str, str]]] = [[] for _ in texts]
+        non_empty = [idx for idx, text in enumerate(texts) if text]
+        with span("extraction.batch", size=len(non_empty)):
+            docs = self.nlp.pipe((texts[idx] for idx in non_empty), batch_size=batch_size)
+            for idx, doc in zip(non_empty, docs):
+                entities[idx] = self._labelled_entities_from_doc(doc)
+        return entities
+
+    @staticmethod
+    def _entities_from_doc(doc) -> List[str]:
+        return [text for text, _ in EntityExtractor._labelled_entities_from_doc(doc)]
+
+    @staticmethod
+    def _labelled_entities_from_doc(doc) -> List[Tuple[str, str]]:
         allowed_labels = {"GPE", "LOC", "PERSON", "FAC", "ORG"}
-        return [ent.text for ent in doc.ents if ent.label_ in allowed_labels]
+        return [(ent.text, ent.label_) for ent in doc.ents if ent.label_ in allowed_labels]
 
 
 def _format_kg_fact(record: dict) -> str:
@@ -40,8 +82,13 @@ def entity_driven_retrieval(
     kg_facts = _fetch_kg_facts(entities, kg_querier)
     retrieved_entity_names = _collect_entities_from_facts(kg_facts)
 
-    augmented_query = query + " " + " ".join(sorted(retrieved_entity_names))
-    docs = vector_retriever.retrieve(augmented_query, k=k)
+    if hasattr(vector_retriever, "retrieve_filtered"):
+        # Restrict the search to documents about the KG neighbourhood instead of embedding
+        # a query padded with every neighbour name.
+        docs = vector_retriever.retrieve_filtered(query, set(entities) | retrieved_entity_names, k=k)
+    else:
+        augmented_query = query + " " + " ".join(sorted(retrieved_entity_names))
+        docs = vector_retriever.retrieve(augmented_query, k=k)
     text_context = "\n".join(f"[TEXT] {doc['text']}" for doc in docs)
 
     kg_context = "\n".join(kg_facts) if kg_facts else "No specific facts found in KG for extracted entities."
@@ -51,10 +98,7 @@ def entity_driven_retrieval(
 def _fetch_kg_facts(entities: Iterable[str], kg_querier) -> list[str]:
     facts: list[str] = []
     for entity in entities:
-        cypher_query = (
-            "MATCH (e)-[r]-(n) WHERE e.name = $entity RETURN e.name, type(r), n.name"
-        )
-        results = kg_querier.query(cypher_query, {"entity": entity})
+        results = kg_querier.query(NEIGHBOUR_QUERY, {"entity": entity})
         facts.extend(_format_kg_fact(result) for result in results)
     return facts
 
@@ -3,9 +3,16 @@ from __future__ import annotations
 from collections import defaultdict
 from typing import Iterable, List, Sequence
 
+from europe_kg_rag.graph.queries import NEIGHBOUR_QUERY
+from europe_kg_rag.graph.rivers import retrieve_river_facts
+from europe_kg_rag.observability import traced
+
+from .attributes import retrieve_attribute_facts
 from .entity_extraction import EntityExtractor
+from .geo import retrieve_geo_facts
 
 
+@traced("fusion")
 def reciprocal_rank_fusion(ranked_lists: Sequence[Sequence[str]], k: int = 60) -> list[str]:
     """Combine ranked lists using Reciprocal Rank Fusion."""
     scores = defaultdict(float)
@@ -21,13 +28,22 @@ def rank_fusion_retrieval(
     vector_retriever,
     extractor: EntityExtractor | None = None,
     k: int = 5,
+    geo_index=None,
+    attribute_store=None,
+    river_network=None,
 ) -> str:
     extractor = extractor or EntityExtractor()
     entities = extractor.extract_entities(query)
     kg_results = _fetch_kg_results(entities, kg_querier) if entities else []
     text_results = [f"[TEXT] {doc['text']}" for doc in vector_retriever.retrieve(query, k=k)]
+    ranked_lists = [kg_results, text_results]
+    tool_results = retrieve_geo_facts(query, geo_index, entities)
+    tool_results += retrieve_attribute_facts(query, attribute_store, entities)
+    tool_results += retrieve_river_facts(query, river_network, entities)
+    if tool_results:
+        ranked_lists.insert(0, tool_results)
 
-    fused = reciprocal_rank_fusion([kg_results, text_results], k=k)
+    fused = reciprocal_rank_fusion(ranked_lists, k=k)
 
     context_parts: list[str] = ["--- Knowledge Graph Facts ---"]
     context_parts.extend(item for item in fused if item.startswith("[KG]"))
@@ -40,10 +56,7 @@ def rank_fusion_retrieval(
 def _fetch_kg_results(entities: Iterable[str], kg_querier) -> List[str]:
     kg_results: list[str] = []
     for entity in entities:
-        cypher_query = (
-            "MATCH (e)-[r]-(n) WHERE e.name = $entity RETURN e.name, type(r), n.name"
-        )
-        results = kg_querier.query(cypher_query, {"entity": entity})
+        results = kg_querier.query(NEIGHBOUR_QUERY, {"entity": entity})
         for record in results:
             kg_results.append(
                 f"[KG] ({record['e.name']}) -[:{record['type(r)']}]-> ({record['n.name']})"
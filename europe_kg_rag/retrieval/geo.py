@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import heapq
+import json
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from europe_kg_rag.observability import span
+
+EARTH_RADIUS_KM = 6371.0088
+DEFAULT_NEAR_RADIUS_KM = 100.0
+
+_RADIUS = re.compile(r"(\d+(?:[.,]\d+)?)\s*(km|kilomet(?:er|re)s?|mi(?:les?)?)\b", re.IGNORECASE)
+_NEAREST = re.compile(r"\b(nearest|closest)\b", re.IGNORECASE)
+_NEAR = re.compile(r"\b(near|nearby|around|close to)\b", re.IGNORECASE)
+_CAPITALS = re.compile(r"\bcapitals?\b", re.IGNORECASE)
+_COUNT = re.compile(r"\b(?:nearest|closest)\s+(\d+)\b", re.IGNORECASE)
+_KM_PER_MILE = 1.609344
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Great-circle distance in km; arguments broadcast like NumPy arrays."""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(value, dtype=np.float64)) for value in (lat1, lon1, lat2, lon2)
+    )
+    a = np.sin((lat2 - lat1) / 2.0) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2.0) ** 2
+    return 2.0 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _unit_vectors(lat, lon) -> np.ndarray:
+    lat, lon = np.radians(np.asarray(lat, dtype=np.float64)), np.radians(np.asarray(lon, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.stack([cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def _chord(distance_km: float) -> float:
+    # Chord length on the unit sphere grows monotonically with great-circle distance.
+    return 2.0 * np.sin(min(distance_km, np.pi * EARTH_RADIUS_KM) / (2.0 * EARTH_RADIUS_KM))
+
+
+class KDTree:
+    """Array-backed k-d tree over 3-D points with leaf buckets (no per-node Python objects)."""
+
+    def __init__(self, points: np.ndarray, leaf_size: int = 16) -> None:
+        self.points = np.ascontiguousarray(points, dtype=np.float64)
+        self.leaf_size = max(1, leaf_size)
+        order = np.arange(len(self.points))
+        starts: List[int] = []
+        ends: List[int] = []
+        children: List[List[int]] = []
+        lower: List[np.ndarray] = []
+        upper: List[np.ndarray] = []
+
+        stack = [(0, len(order), -1, 0)]
+        while stack:
+            start, end, parent, side = stack.pop()
+            node = len(starts)
+            if parent >= 0:
+                children[parent][side] = node
+            block = self.points[order[start:end]]
+            starts.append(start)
+            ends.append(end)
+            children.append([-1, -1])
+            lower.append(block.min(axis=0) if len(block) else np.zeros(3))
+            upper.append(block.max(axis=0) if len(block) else np.zeros(3))
+            if end - start <= self.leaf_size:
+                continue
+            axis = int(np.argmax(upper[-1] - lower[-1]))
+            middle = (end - start) // 2
+            partition = np.argpartition(block[:, axis], middle)
+            order[start:end] = order[start:end][partition]
+            stack.append((start + middle, end, node, 1))
+            stack.append((start, start + middle, node, 0))
+
+        self.order = order
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.ends = np.asarray(ends, dtype=np.int64)
+        self.children = np.asarray(children, dtype=np.int64).reshape(-1, 2)
+        self.lower = np.asarray(lower).reshape(-1, 3)
+        self.upper = np.asarray(upper).reshape(-1, 3)
+        self.sorted_points = self.points[order]
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _box_distance(self, node: int, point: np.ndarray) -> float:
+        gap = np.maximum(self.lower[node] - point, 0.0) + np.maximum(point - self.upper[node], 0.0)
+        return float(np.sqrt(gap @ gap))
+
+    def query_radius(self, point: np.ndarray, radius: float) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (point indices, euclidean distances) within ``radius`` of ``point``."""
+        if not len(self.points):
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        hits: List[np.ndarray] = []
+        distances: List[np.ndarray] = []
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if self._box_distance(node, point) > radius:
+                continue
+            left, right = self.children[node]
+            if left < 0:
+                start, end = self.starts[node], self.ends[node]
+                delta = self.sorted_points[start:end] - point
+                found = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+                mask = found <= radius
+                hits.append(self.order[start:end][mask])
+                distances.append(found[mask])
+            else:
+                stack.extend((left, right))
+        if not hits:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return np.concatenate(hits), np.concatenate(distances)
+
+    def query_nearest(
+        self, point: np.ndarray, k: int, exclude: Optional[int] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the ``k`` nearest (indices, distances), closest first; best-first search."""
+        if not len(self.points) or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        best: List[Tuple[float, int]] = []  # max-heap via negated distances
+        frontier = [(0.0, 0)]
+        while frontier:
+            bound, node = heapq.heappop(frontier)
+            if len(best) == k and bound > -best[0][0]:
+                break
+            left, right = self.children[node]
+            if left >= 0:
+                for child in (left, right):
+                    heapq.heappush(frontier, (self._box_distance(child, point), child))
+                continue
+            start, end = self.starts[node], self.ends[node]
+            delta = self.sorted_points[start:end] - point
+            found = np.sqrt(np.einsum("ij,ij->i", delta, delta))
+            for distance, index in zip(found.tolist(), self.order[start:end].tolist()):
+                if index == exclude:
+                    continue
+                if len(best) < k:
+                    heapq.heappush(best, (-distance, index))
+                elif distance < -best[0][0]:
+                    heapq.heapreplace(best, (-distance, index))
+        ranked = sorted((-negated, index) for negated, index in best)
+        return (
+            np.asarray([index for _, index in ranked], dtype=np.int64),
+            np.asarray([distance for distance, _ in ranked]),
+        )
+
+
+@dataclass(slots=True)
+class GeoMatch:
+    name: str
+    country: str
+    population: int
+    distance_km: float
+    capital: bool
+
+
+@dataclass(slots=True)
+class ProximityQuery:
+    anchor: str
+    radius_km: Optional[float] = None
+    nearest: int = 0
+    capitals_only: bool = False
+
+
+class GeoIndex:
+    """Proximity search over city coordinates; answers come back as KG-style facts."""
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        latitudes: Sequence[float],
+        longitudes: Sequence[float],
+        populations: Sequence[int],
+        countries: Sequence[str],
+        capitals: Sequence[bool],
+        leaf_size: int = 16,
+    ) -> None:
+        self.names = list(names)
+        self.lat = np.asarray(latitudes, dtype=np.float64)
+        self.lon = np.asarray(longitudes, dtype=np.float64)
+        self.population = np.asarray(populations, dtype=np.int64)
+        self.countries = list(countries)
+        self.capital = np.asarray(capitals, dtype=bool)
+        points = _unit_vectors(self.lat, self.lon)
+        self._tree = KDTree(points, leaf_size)
+        self._capital_rows = np.flatnonzero(self.capital)
+        self._capital_tree = KDTree(points[self._capital_rows], leaf_size)
+        self._rows_by_name: Dict[str, int] = {}
+        # Largest city wins when names repeat across countries.
+        for row in np.argsort(-self.population, kind="stable").tolist():
+            self._rows_by_name.setdefault(self.names[row].casefold(), row)
+        self._capital_by_country = {
+            self.countries[row].casefold(): row for row in self._capital_rows.tolist()
+        }
+
+    @classmethod
+    def from_database(cls, base_path: str | Path = "data/database", leaf_size: int = 16) -> "GeoIndex":
+        """Load ``entities/europe_cities.json`` joined with country membership and capitals."""
+        base = Path(base_path)
+        cities = _load_json(base / "entities" / "europe_cities.json").get("cities", [])
+        countries = {
+            item["id"]: item.get("name", "")
+            for item in _load_json(base / "entities" / "europe_countries.json").get("countries", [])
+        }
+        located_in: Dict[str, str] = {}
+        capital_ids = set()
+        for path in sorted((base / "relations").glob("*.json")):
+            for relation in _load_json(path).get("relations", []):
+                if not str(relation.get("source_id", "")).startswith("city:"):
+                    continue
+                if relation.get("type") == "LOCATED_IN":
+                    located_in[relation["source_id"]] = countries.get(relation["target_id"], "")
+                elif relation.get("type") == "CAPITAL_OF":
+                    capital_ids.add(relation["source_id"])
+
+        rows = [city for city in cities if city.get("lat") is not None and city.get("lon") is not None]
+        return cls(
+            names=[city["name"] for city in rows],
+            latitudes=[city["lat"] for city in rows],
+            longitudes=[city["lon"] for city in rows],
+            populations=[int(city.get("population") or 0) for city in rows],
+            countries=[located_in.get(city["id"], "") for city in rows],
+            capitals=[city["id"] in capital_ids for city in rows],
+            leaf_size=leaf_size,
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def locate(self, name: str) -> Optional[int]:
+        """Row of a city, or of a country's capital when ``name`` is a country."""
+        key = name.strip().casefold()
+        row = self._rows_by_name.get(key)
+        return row if row is not None else self._capital_by_country.get(key)
+
+    def within(
+        self, origin: str, radius_km: float, limit: int = 10, capitals_only: bool = False
+    ) -> List[GeoMatch]:
+        """Cities within ``radius_km`` of ``origin``, largest population first."""
+        row = self.locate(origin)
+        if row is None:
+            return []
+        point = self._tree.points[row]
+        if capitals_only:
+            local, _ = self._capital_tree.query_radius(point, _chord(radius_km))
+            rows = self._capital_rows[local]
+        else:
+            rows, _ = self._tree.query_radius(point, _chord(radius_km))
+        rows = rows[rows != row]
+        rows = rows[np.argsort(-self.population[rows], kind="stable")][:limit]
+        return self._matches(row, rows)
+
+    def nearest(self, origin: str, k: int = 1, capitals_only: bool = False) -> List[GeoMatch]:
+        """The ``k`` closest cities (or capitals) to ``origin``, excluding ``origin`` itself."""
+        row = self.locate(origin)
+        if row is None:
+            return []
+        point = self._tree.points[row]
+        if capitals_only:
+            local_self = np.flatnonzero(self._capital_rows == row)
+            exclude = int(local_self[0]) if len(local_self) else None
+            local, _ = self._capital_tree.query_nearest(point, k, exclude=exclude)
+            rows = self._capital_rows[local]
+        else:
+            rows, _ = self._tree.query_nearest(point, k, exclude=row)
+        return self._matches(row, rows)
+
+    def _matches(self, origin: int, rows: np.ndarray) -> List[GeoMatch]:
+        distances = haversine_km(self.lat[origin], self.lon[origin], self.lat[rows], self.lon[rows])
+        return [
+            GeoMatch(
+                name=self.names[row],
+                country=self.countries[row],
+                population=int(self.population[row]),
+                distance_km=float(distance),
+                capital=bool(self.capital[row]),
+            )
+            for row, distance in zip(rows.tolist(), np.atleast_1d(distances).tolist())
+        ]
+
+    def answer(self, request: ProximityQuery, limit: int = 10) -> List[str]:
+        """Run a parsed proximity question and format the matches as facts."""
+        if request.nearest:
+            matches = self.nearest(request.anchor, request.nearest, request.capitals_only)
+            relation = "NEAREST_CAPITAL" if request.capitals_only else "NEAREST_CITY"
+        else:
+            radius_km = request.radius_km or DEFAULT_NEAR_RADIUS_KM
+            matches = self.within(request.anchor, radius_km, limit, request.capitals_only)
+            relation = "NEAR"
+        return format_geo_facts(request.anchor, matches, relation)
+
+    def parse(self, query: str, entities: Iterable[str]) -> Optional[ProximityQuery]:
+        """Recognise "within N km of X" / "nearest capital to Y" questions over known places."""
+        anchor = next((entity for entity in entities if self.locate(entity) is not None), None)
+        if anchor is None:
+            return None
+        capitals_only = bool(_CAPITALS.search(query))
+        radius = _RADIUS.search(query)
+        if radius:
+            value = float(radius.group(1).replace(",", "."))
+            if radius.group(2).lower().startswith("mi"):
+                value *= _KM_PER_MILE
+            return ProximityQuery(anchor, radius_km=value, capitals_only=capitals_only)
+        if _NEAREST.search(query):
+            count = _COUNT.search(query)
+            nearest = int(count.group(1)) if count else 1
+            return ProximityQuery(anchor, nearest=nearest, capitals_only=capitals_only)
+        if _NEAR.search(query):
+            return ProximityQuery(anchor, radius_km=DEFAULT_NEAR_RADIUS_KM, capitals_only=capitals_only)
+        return None
+
+
+def format_geo_facts(anchor: str, matches: Iterable[GeoMatch], relation: str = "NEAR") -> List[str]:
+    """Render matches in the ``[KG]`` line format so they fuse and dedupe like graph facts."""
+    return [
+        f"[KG] [{match.name}] -[:{relation} {{distance_km: {match.distance_km:.0f}, "
+        f"population: {match.population}}}]-> [{anchor}]"
+        for match in matches
+    ]
+
+
+def retrieve_geo_facts(query: str, geo_index: GeoIndex | None, entities: Iterable[str]) -> List[str]:
+    """Proximity facts for ``query`` (empty when it is not a proximity question)."""
+    if geo_index is None:
+        return []
+    request = geo_index.parse(query, entities)
+    if request is None:
+        return []
+    with span("geo", anchor=request.anchor) as geo_span:
+        facts = geo_index.answer(request)
+        geo_span.set(facts=len(facts))
+    return facts
+
+
+def _load_json(path: Path) -> dict:
+    if not path.exists():
+        raise FileNotFoundError(f"Expected data file is missing: {path}")
+    with path.open("r", encoding="utf-8") as handle:
+        return json.load(handle)
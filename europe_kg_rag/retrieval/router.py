@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from europe_kg_rag.observability import span
+
+KG_ROUTE = "KG-Only"
+TEXT_ROUTE = "Text-Only"
+FUSION_ROUTE = "Hybrid-Fusion"
+
+# Questions the graph answers on its own: borders, capitals, river courses, EU membership,
+# and proximity (served from the geo index alongside KG facts).
+RELATIONAL_PATTERNS = (
+    r"\bborder(s|ed|ing)?\b",
+    r"\bneighbou?r(s|ing)?\b",
+    r"\bcapital\b",
+    r"\bflows?\b",
+    r"\brivers?\b",
+    r"\btributar(y|ies)\b",
+    r"\bmouth\b",
+    r"\bdrains?\b",
+    r"\b(eu|european union)\b",
+    r"\bmember\b",
+    r"\bwhich (countries|country|cities|city|rivers?)\b",
+    r"\bhow many\b",
+    r"\b(nearest|closest|near|nearby)\b",
+    r"\bwithin \d+",
+)
+
+# Ranking and aggregate questions the attribute store answers without a named entity. Each
+# pattern needs an attribute or table word, so "the largest festival" or "average winter" don't match.
+_ATTRIBUTE_SUBJECTS = (
+    r"(countr(y|ies)|nations?|states|members|rivers?|basins?|population|area|density|flow|discharge)"
+)
+ATTRIBUTE_PATTERNS = (
+    r"\b(longest|shortest)\b.*\brivers?\b",
+    rf"\b(largest|biggest|smallest|densest)\b.*\b{_ATTRIBUTE_SUBJECTS}\b",
+    r"\b(most|least) (populous|densely)\b",
+    r"\b(highest|lowest|most|least) (population|density|flow|discharge)\b",
+    rf"\btop \d+\b.*\b{_ATTRIBUTE_SUBJECTS}\b",
+    r"\b(total|combined|average|mean)\b.*\b(population|area|density|length|flow|discharge|basin)\b",
+    r"\bhow many (people|inhabitants)\b",
+)
+
+# Questions that need prose: descriptions, history, culture, geography.
+DESCRIPTIVE_PATTERNS = (
+    r"\bdescribe\b",
+    r"\btell (me|us) about\b",
+    r"\bwhat is .+ like\b",
+    r"\bexplain\b",
+    r"\boverview\b",
+    r"\bhistory\b",
+    r"\bhistorical\b",
+    r"\bcultur(e|al)\b",
+    r"\bgeography\b",
+    r"\bclimate\b",
+    r"\beconom(y|ic)\b",
+    r"\bknown for\b",
+    r"\bfamous\b",
+    r"\bwhy\b",
+)
+
+# spaCy labels the knowledge graph can resolve (countries, cities, rivers).
+GRAPH_ENTITY_LABELS = frozenset({"GPE", "LOC", "FAC"})
+
+
+@dataclass(slots=True)
+class RoutingDecision:
+    strategy: str
+    reason: str
+    entities: List[str] = field(default_factory=list)
+    relational: bool = False
+    descriptive: bool = False
+    seconds: float = 0.0
+
+
+class QueryRouter:
+    """Pick the cheapest strategy that can answer a question from its wording and entities."""
+
+    def __init__(
+        self,
+        relational_patterns: Sequence[str] = RELATIONAL_PATTERNS,
+        descriptive_patterns: Sequence[str] = DESCRIPTIVE_PATTERNS,
+        attribute_patterns: Sequence[str] = ATTRIBUTE_PATTERNS,
+        graph_entity_labels: frozenset = GRAPH_ENTITY_LABELS,
+    ) -> None:
+        self._relational = [re.compile(pattern, re.IGNORECASE) for pattern in relational_patterns]
+        self._descriptive = [re.compile(pattern, re.IGNORECASE) for pattern in descriptive_patterns]
+        self._attribute = [re.compile(pattern, re.IGNORECASE) for pattern in attribute_patterns]
+        self.graph_entity_labels = graph_entity_labels
+        self.decisions: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def classify(
+        self, query: str, entities: Sequence[str | Tuple[str, Optional[str]]]
+    ) -> RoutingDecision:
+        """Route from already-extracted entities; plain names are assumed to be graph entities."""
+        labelled = [entity if isinstance(entity, tuple) else (entity, None) for entity in entities]
+        names = [name for name, _ in labelled]
+        graph_entities = [
+            name for name, label in labelled if label is None or label in self.graph_entity_labels
+        ]
+        relational = any(pattern.search(query) for pattern in self._relational)
+        descriptive = any(pattern.search(query) for pattern in self._descriptive)
+        attribute = any(pattern.search(query) for pattern in self._attribute)
+
+        if attribute and not descriptive:
+            strategy, reason = KG_ROUTE, "attribute ranking"
+            relational = True
+        elif not graph_entities:
+            strategy, reason = TEXT_ROUTE, "no graph entities"
+        elif relational and not descriptive:
+            strategy, reason = KG_ROUTE, "relational"
+        elif descriptive and not relational:
+            strategy, reason = TEXT_ROUTE, "descriptive"
+        elif relational:
+            strategy, reason = FUSION_ROUTE, "relational and descriptive"
+        else:
+            strategy, reason = FUSION_ROUTE, "unclassified"
+        return RoutingDecision(strategy, reason, names, relational, descriptive)
+
+    def route(self, query: str, extractor) -> RoutingDecision:
+        """Extract entities, classify and record the decision (span ``routing``)."""
+        with span("routing") as routing_span:
+            started = time.perf_counter()
+            if hasattr(extractor, "extract_labelled_entities"):
+                entities: List[Any] = extractor.extract_labelled_entities(query)
+            else:
+                entities = extractor.extract_entities(query)
+            decision = self.classify(query, entities)
+            decision.seconds = time.perf_counter() - started
+            routing_span.set(strategy=decision.strategy, reason=decision.reason)
+        self.record(decision)
+        return decision
+
+    def record(self, decision: RoutingDecision) -> None:
+        with self._lock:
+            self.decisions[decision.strategy] += 1
+
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.decisions)
+
+
+default_router = QueryRouter()
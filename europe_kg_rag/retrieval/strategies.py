@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+from europe_kg_rag.graph.queries import NEIGHBOUR_QUERY
+from europe_kg_rag.graph.rivers import retrieve_river_facts
+from europe_kg_rag.observability import span
+
+from .attributes import retrieve_attribute_facts
+from .entity_extraction import EntityExtractor, entity_driven_retrieval
+from .fusion import rank_fusion_retrieval
+from .geo import retrieve_geo_facts
+from .router import QueryRouter, RoutingDecision, default_router
+
+NO_KG_FACTS_MESSAGE = "No specific facts found in KG for extracted entities."
+
+
+@dataclass(slots=True)
+class RetrievalBackends:
+    kg_querier: Any
+    vector_retriever: Any
+    entity_extractor: EntityExtractor
+    geo_index: Any = None
+    attribute_store: Any = None
+    river_network: Any = None
+
+
+def retrieve_kg_only(
+    query: str,
+    kg_querier,
+    extractor: EntityExtractor,
+    geo_index=None,
+    attribute_store=None,
+    river_network=None,
+) -> str:
+    facts = []
+    entities = extractor.extract_entities(query)
+    facts.extend(retrieve_geo_facts(query, geo_index, entities))
+    facts.extend(retrieve_attribute_facts(query, attribute_store, entities))
+    facts.extend(retrieve_river_facts(query, river_network, entities))
+    for entity in entities:
+        results = kg_querier.query(NEIGHBOUR_QUERY, {"entity": entity})
+        for result in results:
+            fact = f"[KG] [{result['e.name']}] -[:{result['type(r)']}]-> [{result['n.name']}]"
+            facts.append(fact)
+
+    return "\n".join(facts) if facts else NO_KG_FACTS_MESSAGE
+
+
+def retrieve_text_only(query: str, vector_retriever, k: int = 5) -> str:
+    retrieved_docs = vector_retriever.retrieve(query, k=k)
+    return "\n".join(f"[TEXT] {retrieved_doc['text']}" for retrieved_doc in retrieved_docs)
+
+
+def retrieve_hybrid_naive(query: str, kg_querier, vector_retriever, extractor: EntityExtractor) -> str:
+    kg_facts = retrieve_kg_only(query, kg_querier, extractor)
+    text_facts = retrieve_text_only(query, vector_retriever)
+
+    return f"--- Knowledge Graph Facts ---\n{kg_facts}\n\n--- Related Descriptions ---\n{text_facts}"
+
+
+class _KnownEntities:
+    """Serve the router's entity extraction to the routed strategy instead of re-running spaCy."""
+
+    def __init__(self, extractor, query: str, entities: List[str]) -> None:
+        self._extractor = extractor
+        self._query = query
+        self._entities = entities
+
+    def extract_entities(self, text: str) -> List[str]:
+        if text == self._query:
+            return list(self._entities)
+        return self._extractor.extract_entities(text)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._extractor, name)
+
+
+def retrieve_routed(
+    query: str,
+    backends: RetrievalBackends,
+    router: QueryRouter | None = None,
+    decision: RoutingDecision | None = None,
+) -> str:
+    """Run whichever strategy the router picks, so relational lookups skip embedding and FAISS.
+
+    Pass ``decision`` when the question was already routed (e.g. to consult a cache first).
+    """
+    if decision is None:
+        decision = (router or default_router).route(query, backends.entity_extractor)
+    routed = RetrievalBackends(
+        kg_querier=backends.kg_querier,
+        vector_retriever=backends.vector_retriever,
+        entity_extractor=_KnownEntities(backends.entity_extractor, query, decision.entities),
+        geo_index=backends.geo_index,
+        attribute_store=backends.attribute_store,
+        river_network=backends.river_network,
+    )
+    return STRATEGIES[decision.strategy](query, routed)
+
+
+STRATEGIES: Dict[str, Callable[[str, RetrievalBackends], str]] = {
+    "KG-Only": lambda query, b: retrieve_kg_only(
+        query, b.kg_querier, b.entity_extractor, b.geo_index, b.attribute_store, b.river_network
+    ),
+    "Text-Only": lambda query, b: retrieve_text_only(query, b.vector_retriever),
+    "Hybrid-Naive": lambda query, b: retrieve_hybrid_naive(
+        query, b.kg_querier, b.vector_retriever, b.entity_extractor
+    ),
+    "Entity-Driven": lambda query, b: entity_driven_retrieval(
+        query, b.kg_querier, b.vector_retriever, b.entity_extractor
+    ),
+    "Hybrid-Fusion": lambda query, b: rank_fusion_retrieval(
+        query,
+        b.kg_querier,
+        b.vector_retriever,
+        b.entity_extractor,
+        geo_index=b.geo_index,
+        attribute_store=b.attribute_store,
+        river_network=b.river_network,
+    ),
+    "Auto": lambda query, b: retrieve_routed(query, b),
+}
+
+
+def run_strategy(
+    strategy: str, query: str, backends: RetrievalBackends, decision: RoutingDecision | None = None
+) -> str:
+    try:
+        retrieve = STRATEGIES[strategy]
+    except KeyError:
+        raise ValueError(f"Unknown model name: {strategy}") from None
+    with span("retrieval", strategy=strategy):
+        if decision is not None and strategy == "Auto":
+            return retrieve_routed(query, backends, decision=decision)
+        return retrieve(query, backends)
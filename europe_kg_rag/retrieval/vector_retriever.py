@@ -1,14 +1,35 @@
 from __future__ import annotations
 
+import hashlib
 import json
-import os
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, List, Sequence
 
 import faiss
-import google.generativeai as genai
 import numpy as np
 
+from europe_kg_rag.observability import span
+
+from .chunking import collapse_by_entity
+from .embeddings import GeminiEmbedder
+
+# Sidecar next to a saved index holding the digest of the corpus (and model) it was built from.
+INDEX_DIGEST_SUFFIX = ".digest"
+
+
+def corpus_digest(corpus_path: str | Path, salt: str = "") -> str:
+    """SHA-256 of the corpus bytes; the path is left out so copies (published versions) still match."""
+    sha = hashlib.sha256(salt.encode("utf-8"))
+    with Path(corpus_path).open("rb") as handle:
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def index_digest_path(index_path: str | Path) -> Path:
+    index_path = Path(index_path)
+    return index_path.with_name(index_path.name + INDEX_DIGEST_SUFFIX)
+
 
 class VectorRetriever:
     """Wrapper around FAISS and Gemini embeddings."""
@@ -19,54 +40,127 @@ class VectorRetriever:
         faiss_index_path: str | Path,
         corpus_path: str | Path,
         api_key: str | None = None,
+        embedder=None,
+        index_factory: str = "Flat",
+        index_params: str | None = None,
+        collapse_per_entity: bool = False,
+        overfetch: int = 4,
     ) -> None:
         self.model_name = model_name
         self.faiss_index_path = Path(faiss_index_path)
         self.corpus_path = Path(corpus_path)
-        self.api_key = api_key or os.environ.get("GOOGLE_API_KEY")
-        if not self.api_key:
-            raise EnvironmentError("GOOGLE_API_KEY is required for VectorRetriever.")
-
-        genai.configure(api_key=self.api_key)
+        self.index_factory = index_factory
+        self.index_params = index_params
+        self.collapse_per_entity = collapse_per_entity
+        self.overfetch = overfetch
+        self.embedder = embedder or GeminiEmbedder(model_name, api_key=api_key)
+        self.api_key = getattr(self.embedder, "api_key", api_key)
         self.corpus = self._load_corpus()
+        self.rows_by_entity = self._rows_by_entity()
         self.index = self._get_or_build_index()
+        if index_params:
+            # e.g. "efSearch=64" for HNSW or "nprobe=8" for IVF indexes.
+            faiss.ParameterSpace().set_index_parameters(self.index, index_params)
 
     def _load_corpus(self) -> list[dict]:
         with self.corpus_path.open("r", encoding="utf-8") as file:
             return json.load(file)
 
+    def _rows_by_entity(self) -> Dict[str, List[int]]:
+        # Corpus ids are entity names; passage records name their entity explicitly.
+        rows: Dict[str, List[int]] = {}
+        for row, document in enumerate(self.corpus):
+            rows.setdefault(str(document.get("entity", document.get("id"))), []).append(row)
+        return rows
+
     def _get_or_build_index(self):
+        digest = corpus_digest(self.corpus_path, salt=f"{self.model_name}:{self.index_factory}")
+        digest_path = index_digest_path(self.faiss_index_path)
         if self.faiss_index_path.exists():
-            return faiss.read_index(str(self.faiss_index_path))
-        return self._build_index()
+            stored = digest_path.read_text(encoding="utf-8").strip() if digest_path.exists() else None
+            if stored == digest:
+                index = faiss.read_index(str(self.faiss_index_path))
+                if index.ntotal == len(self.corpus):
+                    return index
+            print(f"FAISS index {self.faiss_index_path} was not built from {self.corpus_path}; rebuilding.")
+        index = self._build_index()
+        digest_path.write_text(digest, encoding="utf-8")
+        return index
 
-    def _build_index(self):
+    def _build_index(self, batch_size: int = 100):
         texts = [item["text"] for item in self.corpus]
-        embeddings = [self._embed_text(text) for text in texts]
-        if not embeddings:
+        if not texts:
             raise ValueError("Corpus is empty; cannot build FAISS index.")
+        embeddings = np.vstack(
+            [
+                self.embedder.embed(texts[start:start + batch_size], "RETRIEVAL_DOCUMENT")
+                for start in range(0, len(texts), batch_size)
+            ]
+        ).astype(np.float32)
 
-        dim = len(embeddings[0])
-        index = faiss.IndexFlatL2(dim)
-        index.add(np.array(embeddings, dtype=np.float32))
+        dim = embeddings.shape[1]
+        if self.index_factory == "Flat":
+            index = faiss.IndexFlatL2(dim)
+        else:
+            index = faiss.index_factory(dim, self.index_factory)
+            if not index.is_trained:
+                index.train(embeddings)
+        index.add(embeddings)
         faiss.write_index(index, str(self.faiss_index_path))
         return index
 
-    def _embed_text(self, text: str) -> np.ndarray:
-        response = genai.embed_content(
-            model=self.model_name,
-            content=text,
-            task_type="RETRIEVAL_DOCUMENT",
+    def retrieve(self, query_text: str, k: int = 5) -> List[dict]:
+        query_embedding = self.embedder.embed([query_text], "RETRIEVAL_QUERY")
+        return self._search(query_embedding, k)[0]
+
+    def retrieve_batch(self, query_texts: Sequence[str], k: int = 5) -> List[List[dict]]:
+        """Embed all queries in one request and answer them with a single FAISS search."""
+        if not query_texts:
+            return []
+        query_embeddings = self.embedder.embed(list(query_texts), "RETRIEVAL_QUERY")
+        return self._search(query_embeddings, k)
+
+    def retrieve_filtered(self, query_text: str, entities: Iterable[str], k: int = 5) -> List[dict]:
+        """Search only documents linked to ``entities``, topped up from the full index if short."""
+        rows = sorted({row for entity in entities for row in self.rows_by_entity.get(entity, ())})
+        query_embedding = np.ascontiguousarray(
+            self.embedder.embed([query_text], "RETRIEVAL_QUERY"), dtype=np.float32
         )
-        embedding = np.array(response["embedding"], dtype=np.float32)
-        return embedding
+        if not rows:
+            return self._search(query_embedding, k)[0]
 
-    def retrieve(self, query_text: str, k: int = 5) -> List[dict]:
-        query_embedding = genai.embed_content(
-            model=self.model_name,
-            content=query_text,
-            task_type="RETRIEVAL_QUERY",
-        )["embedding"]
-        query_embedding = np.array(query_embedding, dtype=np.float32).reshape(1, -1)
-        distances, indices = self.index.search(query_embedding, k)
-        return [self.corpus[idx] for idx in indices[0]]
+        selector = faiss.IDSelectorBatch(np.asarray(rows, dtype=np.int64))
+        search_k = min(len(rows), k * self.overfetch if self.collapse_per_entity else k)
+        with span("index.search_filtered", candidates=len(rows), k=search_k):
+            _, indices = self.index.search(query_embedding, search_k, params=self._search_params(selector))
+        documents = [self.corpus[idx] for idx in indices[0] if idx >= 0]
+        if self.collapse_per_entity:
+            documents = collapse_by_entity(documents, k)
+        if len(documents) < k:
+            seen = {id(document) for document in documents}
+            extra = [document for document in self._search(query_embedding, k)[0] if id(document) not in seen]
+            documents.extend(extra[: k - len(documents)])
+        return documents
+
+    def _search_params(self, selector) -> faiss.SearchParameters:
+        # Index-specific parameter classes keep the tuned efSearch/nprobe while filtering.
+        index = faiss.downcast_index(self.index)
+        if isinstance(index, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+        if isinstance(index, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+        return faiss.SearchParameters(sel=selector)
+
+    def _search(self, query_embeddings: np.ndarray, k: int) -> List[List[dict]]:
+        if len(query_embeddings) == 0:
+            return []
+        # Several passages of one entity can crowd the top k, so over-fetch before collapsing.
+        search_k = k * self.overfetch if self.collapse_per_entity else k
+        with span("index.search", queries=len(query_embeddings), k=search_k):
+            distances, indices = self.index.search(
+                np.ascontiguousarray(query_embeddings, dtype=np.float32), search_k
+            )
+        results = [[self.corpus[idx] for idx in row if idx >= 0] for row in indices]
+        if self.collapse_per_entity:
+            results = [collapse_by_entity(documents, k) for documents in results]
+        return results
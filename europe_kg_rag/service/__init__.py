@@ -0,0 +1,9 @@
+"""
+Long-running HTTP query service with micro-batched retrieval.
+"""
+
+from .batcher import MicroBatcher, Overloaded
+from .server import QueryService, RetrievalResult
+from .versions import VersionedBackends, VersionWatcher
+
+__all__ = ["MicroBatcher", "Overloaded", "QueryService", "RetrievalResult", "VersionedBackends", "VersionWatcher"]
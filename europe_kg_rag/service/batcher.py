@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from typing import Callable, Generic, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class Overloaded(RuntimeError):
+    """Raised when a batcher's queue is full; callers should shed the request."""
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesce concurrent requests into batches handled by one blocking call.
+
+    The first queued item opens a window of ``max_wait`` seconds; everything that
+    arrives within it (up to ``max_batch_size``) goes to ``handler`` together on
+    ``executor``. ``handler`` must return one result per item, in order; an
+    exception instance in place of a result fails only that item.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], Sequence[R]],
+        max_batch_size: int = 16,
+        max_wait: float = 0.005,
+        max_pending: int = 256,
+        executor: Executor | None = None,
+        name: str = "batch",
+    ) -> None:
+        self.handler = handler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.executor = executor
+        self.name = name
+        self.batches = 0
+        self.items = 0
+        self._queue: Optional[asyncio.Queue[Tuple[T, asyncio.Future]]] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self) -> None:
+        if self._worker is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def submit(self, item: T) -> R:
+        self.start()
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        try:
+            self._queue.put_nowait((item, future))
+        except asyncio.QueueFull:
+            raise Overloaded(f"{self.name} queue is full ({self.max_pending} pending)") from None
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Requests that already timed out are dropped rather than computed.
+            batch = [(item, future) for item, future in batch if not future.done()]
+            if not batch:
+                continue
+            self.batches += 1
+            self.items += len(batch)
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.handler, [item for item, _ in batch]
+                )
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -0,0 +1,426 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from europe_kg_rag.experiments.batch import prefetch_backends
+from europe_kg_rag.generation import (
+    AssembledContext,
+    ContextAssembler,
+    SemanticCache,
+    SemanticCacheHit,
+    estimate_tokens,
+)
+from europe_kg_rag.observability import span, trace_request, tracer
+from europe_kg_rag.retrieval.embeddings import BatchingEmbedder
+from europe_kg_rag.retrieval.router import KG_ROUTE, default_router
+from europe_kg_rag.retrieval.strategies import STRATEGIES, RetrievalBackends, run_strategy
+
+from .batcher import MicroBatcher, Overloaded
+from .versions import VersionedBackends
+
+_MAX_BODY_BYTES = 64 * 1024
+_RETRY_LATER = {"Retry-After": "1"}
+
+
+@dataclass(slots=True)
+class RetrievalResult:
+    question: str
+    strategy: str
+    context: str
+    context_tokens: int
+    retrieval_ms: float
+    trace_id: Optional[str] = None
+    version: str = ""
+
+
+class _HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str, headers: Dict[str, str] | None = None) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class QueryService:
+    """Long-running HTTP front end that keeps backends warm and micro-batches retrieval."""
+
+    def __init__(
+        self,
+        backends: RetrievalBackends | VersionedBackends,
+        generate: Callable[[object, str], str],
+        assembler: ContextAssembler | None = None,
+        max_batch_size: int = 16,
+        batch_window: float = 0.005,
+        max_pending: int = 256,
+        request_timeout: float = 30.0,
+        generation_workers: int = 4,
+        retrieval_workers: int = 4,
+        k: int = 5,
+        semantic_cache: SemanticCache | None = None,
+    ) -> None:
+        # Plain backends are wrapped so every request path leases a version the same way.
+        if not isinstance(backends, VersionedBackends):
+            backends = VersionedBackends(backends)
+        self.versions = backends
+        self.semantic_cache = semantic_cache
+        if semantic_cache is not None:
+            self.versions.subscribe(semantic_cache.pin_version)
+        self.generate = generate
+        self.assembler = assembler or ContextAssembler()
+        self.request_timeout = request_timeout
+        self.max_pending = max_pending
+        self.k = k
+        self.started_at = time.time()
+        self.requests = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self._in_flight = 0
+        self._retrieval_pool = ThreadPoolExecutor(retrieval_workers, thread_name_prefix="retrieval")
+        self._generation_pool = ThreadPoolExecutor(generation_workers, thread_name_prefix="generation")
+        self._batchers: Dict[str, MicroBatcher[str, Tuple[RetrievalResult, AssembledContext]]] = {
+            strategy: MicroBatcher(
+                lambda questions, strategy=strategy: self.retrieve_batch(strategy, questions),
+                max_batch_size=max_batch_size,
+                max_wait=batch_window,
+                max_pending=max_pending,
+                executor=self._retrieval_pool,
+                name=f"service.batch.{strategy}",
+            )
+            for strategy in STRATEGIES
+        }
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def retrieve_batch(
+        self, strategy: str, questions: List[str]
+    ) -> List[Tuple[RetrievalResult, AssembledContext] | Exception]:
+        """Run one strategy over a batch with a single bulk lookup per backend, all on one version."""
+        with self.versions.lease() as (version, current):
+            with span("service.prefetch", strategy=strategy, size=len(questions)):
+                backends = prefetch_backends(current, strategy, list(questions), k=self.k)
+            return self._run_batch(strategy, questions, backends, version)
+
+    def _run_batch(
+        self, strategy: str, questions: List[str], backends: RetrievalBackends, version: str
+    ) -> List[Tuple[RetrievalResult, AssembledContext] | Exception]:
+        results: List[Tuple[RetrievalResult, AssembledContext] | Exception] = []
+        for question in questions:
+            with trace_request() as trace_id:
+                started = time.perf_counter()
+                try:
+                    context = run_strategy(strategy, question, backends)
+                except Exception as exc:  # fail this request only, not the whole batch
+                    results.append(exc)
+                    continue
+                assembled = self.assembler.assemble_text(context)
+                result = RetrievalResult(
+                    question=question,
+                    strategy=strategy,
+                    context=assembled.text,
+                    context_tokens=assembled.total_tokens,
+                    retrieval_ms=(time.perf_counter() - started) * 1000.0,
+                    trace_id=trace_id,
+                    version=version,
+                )
+                results.append((result, assembled))
+        return results
+
+    async def retrieve(self, question: str, strategy: str) -> Dict[str, Any]:
+        cached, entities = await self._semantic_lookup(question, strategy, need_answer=False)
+        if cached is not None:
+            return cached
+        retrieved, _ = await self._retrieve(question, strategy)
+        self._semantic_store(
+            question, strategy, retrieved.context, version=retrieved.version, entities=entities
+        )
+        return asdict(retrieved)
+
+    async def answer(self, question: str, strategy: str) -> Dict[str, Any]:
+        cached, entities = await self._semantic_lookup(question, strategy, need_answer=True)
+        if cached is not None:
+            return cached
+        retrieved, assembled = await self._retrieve(question, strategy)
+        started = time.perf_counter()
+        answer = await asyncio.get_running_loop().run_in_executor(
+            self._generation_pool, self.generate, assembled, question
+        )
+        if not answer.startswith("Error:"):
+            self._semantic_store(question, strategy, retrieved.context, answer, retrieved.version, entities)
+        payload = asdict(retrieved)
+        payload["answer"] = answer
+        payload["generation_ms"] = (time.perf_counter() - started) * 1000.0
+        return payload
+
+    async def _semantic_lookup(
+        self, question: str, strategy: str, need_answer: bool
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[List[str]]]:
+        """The cached payload, if any, and the entities keying the cache (None: cache not used)."""
+        if self.semantic_cache is None or strategy not in self._batchers:
+            return None, None
+        entities, hit = await asyncio.get_running_loop().run_in_executor(
+            self._retrieval_pool, self._lookup, question, strategy, need_answer
+        )
+        if hit is None:
+            return None, entities
+        payload: Dict[str, Any] = {
+            "question": question,
+            "strategy": strategy,
+            "context": hit.entry.context,
+            "context_tokens": estimate_tokens(hit.entry.context),
+            "cached_question": hit.entry.question,
+            "similarity": hit.similarity,
+        }
+        if need_answer:
+            payload["answer"] = hit.entry.answer
+        return payload, entities
+
+    def _lookup(
+        self, question: str, strategy: str, need_answer: bool
+    ) -> Tuple[Optional[List[str]], Optional[SemanticCacheHit]]:
+        # Route before the cache: a lookup embeds the question, which KG-only routes never need.
+        extractor = self.versions.backends.entity_extractor
+        if hasattr(extractor, "extract_labelled_entities"):
+            labelled = extractor.extract_labelled_entities(question)
+        else:
+            labelled = extractor.extract_entities(question)
+        route = default_router.classify(question, labelled).strategy if strategy == "Auto" else strategy
+        if route == KG_ROUTE:
+            return None, None
+        entities = [entity if isinstance(entity, str) else entity[0] for entity in labelled]
+        return entities, self.semantic_cache.lookup(question, strategy, need_answer, entities=entities)
+
+    def _semantic_store(
+        self,
+        question: str,
+        strategy: str,
+        context: str,
+        answer: str | None = None,
+        version: str | None = None,
+        entities: List[str] | None = None,
+    ) -> None:
+        if self.semantic_cache is not None and entities is not None:
+            # Storing embeds the question; do it off the request path. Unversioned backends ("") skip
+            # the version check and leave invalidation to the cache's own version source.
+            self._retrieval_pool.submit(
+                self.semantic_cache.store, question, strategy, context, answer, version or None, entities
+            )
+
+    async def _retrieve(self, question: str, strategy: str) -> Tuple[RetrievalResult, AssembledContext]:
+        batcher = self._batchers.get(strategy)
+        if batcher is None:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, f"Unknown strategy: {strategy}")
+        return await batcher.submit(question)
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "uptime_seconds": round(time.time() - self.started_at, 3),
+            "in_flight": self._in_flight,
+            "version": self.versions.version,
+            "pending": {strategy: batcher.pending for strategy, batcher in self._batchers.items()},
+        }
+
+    def render_metrics(self) -> str:
+        lines = [tracer.render_prometheus().rstrip("\n")]
+        counters = {
+            "europe_kg_rag_service_requests_total": self.requests,
+            "europe_kg_rag_service_rejected_total": self.rejected,
+            "europe_kg_rag_service_timeouts_total": self.timeouts,
+            "europe_kg_rag_service_version_swaps_total": self.versions.swaps,
+        }
+        if self.semantic_cache is not None:
+            counters["europe_kg_rag_semantic_cache_hits_total"] = self.semantic_cache.hits
+            counters["europe_kg_rag_semantic_cache_misses_total"] = self.semantic_cache.misses
+        embedder = getattr(self.versions.backends.vector_retriever, "embedder", None)
+        if isinstance(embedder, BatchingEmbedder):
+            counters["europe_kg_rag_embedding_batches_total"] = embedder.batches
+            counters["europe_kg_rag_embedding_batched_texts_total"] = embedder.items
+            counters["europe_kg_rag_embedding_unique_texts_total"] = embedder.unique
+        for metric, value in counters.items():
+            lines.extend([f"# TYPE {metric} counter", f"{metric} {value}"])
+        lines.append("# TYPE europe_kg_rag_service_in_flight gauge")
+        lines.append(f"europe_kg_rag_service_in_flight {self._in_flight}")
+        lines.append("# TYPE europe_kg_rag_service_batches_total counter")
+        for strategy, batcher in self._batchers.items():
+            lines.append(f'europe_kg_rag_service_batches_total{{strategy="{strategy}"}} {batcher.batches}')
+        lines.append("# TYPE europe_kg_rag_service_batched_requests_total counter")
+        for strategy, batcher in self._batchers.items():
+            lines.append(
+                f'europe_kg_rag_service_batched_requests_total{{strategy="{strategy}"}} {batcher.items}'
+            )
+        lines.append("# TYPE europe_kg_rag_routing_decisions_total counter")
+        for strategy, count in sorted(default_router.summary().items()):
+            lines.append(f'europe_kg_rag_routing_decisions_total{{strategy="{strategy}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.AbstractServer:
+        for batcher in self._batchers.values():
+            batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        for batcher in self._batchers.values():
+            await batcher.stop()
+        self._retrieval_pool.shutdown(wait=False)
+        self._generation_pool.shutdown(wait=False)
+
+    def serve_forever(self, host: str = "127.0.0.1", port: int = 8080) -> None:
+        async def main() -> None:
+            server = await self.start(host, port)
+            print(f"Serving on http://{host}:{port} (POST /retrieve, /answer; GET /health, /metrics)")
+            try:
+                async with server:
+                    await server.serve_forever()
+            finally:
+                await self.stop()
+
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            pass
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                status, content_type, payload, extra = await self._dispatch(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                self._write_response(writer, status, content_type, payload, extra, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except _HttpError as exc:
+            self._write_response(writer, exc.status, "application/json", _error_body(exc.message), {}, False)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+        finally:
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length") or 0)
+        except ValueError:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length < 0:
+            raise _HttpError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+        if length > _MAX_BODY_BYTES:
+            raise _HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, headers, body
+
+    async def _dispatch(
+        self, method: str, path: str, body: bytes
+    ) -> Tuple[HTTPStatus, str, bytes, Dict[str, str]]:
+        route = path.split("?", 1)[0]
+        if method == "GET" and route == "/health":
+            return HTTPStatus.OK, "application/json", _json_body(self.health()), {}
+        if method == "GET" and route == "/metrics":
+            return HTTPStatus.OK, "text/plain; version=0.0.4", self.render_metrics().encode("utf-8"), {}
+        if route not in ("/retrieve", "/answer"):
+            return _error(HTTPStatus.NOT_FOUND, f"No route for {route}")
+        if method != "POST":
+            return _error(HTTPStatus.METHOD_NOT_ALLOWED, "Use POST", {"Allow": "POST"})
+
+        # Counters are only touched from the event loop thread, so they need no lock.
+        self.requests += 1
+        if self._in_flight >= self.max_pending:
+            self.rejected += 1
+            return _error(HTTPStatus.SERVICE_UNAVAILABLE, "Server busy", _RETRY_LATER)
+        self._in_flight += 1
+        try:
+            question, strategy = _parse_query(body)
+            handler = self.retrieve if route == "/retrieve" else self.answer
+            payload = await asyncio.wait_for(handler(question, strategy), self.request_timeout)
+            return HTTPStatus.OK, "application/json", _json_body(payload), {}
+        except _HttpError as exc:
+            return _error(exc.status, exc.message, exc.headers)
+        except Overloaded as exc:
+            self.rejected += 1
+            return _error(HTTPStatus.SERVICE_UNAVAILABLE, str(exc), _RETRY_LATER)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            message = f"Request exceeded {self.request_timeout:g}s"
+            return _error(HTTPStatus.GATEWAY_TIMEOUT, message)
+        except Exception as exc:
+            message = f"{type(exc).__name__}: {exc}"
+            return _error(HTTPStatus.INTERNAL_SERVER_ERROR, message)
+        finally:
+            self._in_flight -= 1
+
+    @staticmethod
+    def _write_response(
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        content_type: str,
+        payload: bytes,
+        extra_headers: Dict[str, str],
+        keep_alive: bool,
+    ) -> None:
+        headers = {
+            "Content-Type": content_type,
+            "Content-Length": str(len(payload)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **extra_headers,
+        }
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        head += "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+        writer.write(head.encode("latin-1") + b"\r\n" + payload)
+
+
+def _parse_query(body: bytes) -> Tuple[str, str]:
+    try:
+        payload = json.loads(body or b"{}")
+    except json.JSONDecodeError:
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "Body must be JSON") from None
+    question = payload.get("question") if isinstance(payload, dict) else None
+    if not isinstance(question, str) or not question.strip():
+        raise _HttpError(HTTPStatus.BAD_REQUEST, "Missing 'question'")
+    return question, str(payload.get("strategy", "Auto"))
+
+
+def _error(
+    status: HTTPStatus, message: str, headers: Dict[str, str] | None = None
+) -> Tuple[HTTPStatus, str, bytes, Dict[str, str]]:
+    return status, "application/json", _error_body(message), headers or {}
+
+
+def _json_body(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+
+def _error_body(message: str) -> bytes:
+    return _json_body({"error": message})
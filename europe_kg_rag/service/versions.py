@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from europe_kg_rag.data.artifacts import ArtifactStore, ArtifactVersion
+from europe_kg_rag.observability import span
+from europe_kg_rag.retrieval.strategies import RetrievalBackends
+
+
+@dataclass(slots=True)
+class _Generation:
+    version: str
+    backends: RetrievalBackends
+    leases: int = 0
+    retired: bool = False
+
+
+class VersionedBackends:
+    """The serving ``RetrievalBackends`` behind a swappable reference.
+
+    Each request leases the generation that is current when it starts and keeps it to the end;
+    ``swap`` only flips the reference, and a retired generation's backends are closed once its
+    last lease is returned.
+    """
+
+    def __init__(self, backends: RetrievalBackends, version: str = "") -> None:
+        self._current = _Generation(version, backends)
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str], None]] = []
+        self.swaps = 0
+
+    @property
+    def version(self) -> str:
+        return self._current.version
+
+    @property
+    def backends(self) -> RetrievalBackends:
+        return self._current.backends
+
+    def subscribe(self, listener: Callable[[str], None]) -> None:
+        """Call ``listener(new_version)`` after every swap (e.g. ``SemanticCache.pin_version``)."""
+        self._listeners.append(listener)
+
+    @contextmanager
+    def lease(self) -> Iterator[Tuple[str, RetrievalBackends]]:
+        with self._lock:
+            generation = self._current
+            generation.leases += 1
+        try:
+            yield generation.version, generation.backends
+        finally:
+            with self._lock:
+                generation.leases -= 1
+                drained = generation.retired and generation.leases == 0
+            if drained:
+                self._close(generation)
+
+    def swap(self, backends: RetrievalBackends, version: str) -> str:
+        """Make ``backends`` current; returns the version it replaced."""
+        with self._lock:
+            old = self._current
+            self._current = _Generation(version, backends)
+            old.retired = True
+            drained = old.leases == 0
+            self.swaps += 1
+        for listener in self._listeners:
+            listener(version)
+        if drained:
+            self._close(old)
+        return old.version
+
+    def _close(self, generation: _Generation) -> None:
+        live = {id(getattr(self._current.backends, item.name)) for item in fields(RetrievalBackends)}
+        for item in fields(RetrievalBackends):
+            backend = getattr(generation.backends, item.name)
+            # Backends shared with the new generation (the entity extractor, usually) stay open.
+            if id(backend) not in live and callable(getattr(backend, "close", None)):
+                backend.close()
+
+
+class VersionWatcher:
+    """Poll an ``ArtifactStore`` and, when a new version is activated, load it in the background and swap.
+
+    ``factory`` builds the backends for a version (reading the FAISS index, corpus and graph
+    snapshot) off the request path; ``warmup`` can exercise them before they take traffic. A
+    version that fails to load is logged and retried on the next poll while the old one keeps serving.
+    """
+
+    def __init__(
+        self,
+        store: ArtifactStore,
+        versions: VersionedBackends,
+        factory: Callable[[ArtifactVersion], RetrievalBackends],
+        interval: float = 30.0,
+        warmup: Callable[[RetrievalBackends], None] | None = None,
+    ) -> None:
+        self.store = store
+        self.versions = versions
+        self.factory = factory
+        self.interval = interval
+        self.warmup = warmup
+        self.last_error: Optional[BaseException] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """Load and swap in the active version if it changed; returns True after a swap."""
+        version_id = self.store.current_id()
+        if version_id is None or version_id == self.versions.version:
+            return False
+        try:
+            with span("versions.load", version=version_id):
+                version = self.store.get(version_id)
+                backends = self.factory(version)
+                if self.warmup is not None:
+                    self.warmup(backends)
+        except Exception as exc:
+            self.last_error = exc
+            print(f"Could not load artifact version {version_id}: {type(exc).__name__}: {exc}")
+            return False
+        self.last_error = None
+        previous = self.versions.swap(backends, version.version)
+        print(f"Swapped serving version {previous or '(initial)'} -> {version.version}")
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="version-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
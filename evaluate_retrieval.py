@@ -0,0 +1,134 @@
+"""
+Score every retrieval strategy on the labelled question set, once per FAISS
+index configuration in ``EVAL_INDEX_CONFIGS``:
+
+    python evaluate_retrieval.py --output data/eval/results.jsonl
+"""
+
+import argparse
+import os
+import re
+from pathlib import Path
+
+from config import (
+    COLLAPSE_PASSAGES_PER_ENTITY,
+    CONTEXT_TOKEN_BUDGET,
+    CORPUS_PATH,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MODEL,
+    EVAL_INDEX_CONFIGS,
+    EVAL_QUESTIONS_PATH,
+    FAISS_INDEX_PATH,
+    MAX_PASSAGE_TOKENS,
+    NEO4J_PASSWORD,
+    NEO4J_URI,
+    NEO4J_USERNAME,
+)
+from europe_kg_rag.experiments import (
+    EvalRecord,
+    EvalSummary,
+    evaluate_configurations,
+    load_labelled_questions,
+    summarize,
+    write_results,
+)
+from europe_kg_rag.generation import ContextAssembler
+from europe_kg_rag.graph import KnowledgeGraphQuerier
+from europe_kg_rag.retrieval import (
+    STRATEGIES,
+    CachedEmbedder,
+    EntityExtractor,
+    GeminiEmbedder,
+    RetrievalBackends,
+    VectorRetriever,
+    corpus_digest,
+)
+
+
+def _index_path(factory: str, digest: str) -> Path:
+    if factory == "Flat":
+        return Path(FAISS_INDEX_PATH)
+    # Configurations that differ only in search parameters share one built index; the corpus digest
+    # in the name keeps an index per corpus version (VectorRetriever also checks its .digest sidecar).
+    name = f"{Path(CORPUS_PATH).stem}_{digest[:12]}_{factory}"
+    return Path("data/cache") / f"faiss_{re.sub(r'[^A-Za-z0-9]+', '_', name)}.index"
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency.")
+    parser.add_argument("--questions", default=EVAL_QUESTIONS_PATH, help="Labelled question set (JSONL).")
+    parser.add_argument(
+        "--strategies", nargs="+", default=list(STRATEGIES), choices=list(STRATEGIES), help="Strategies to score."
+    )
+    parser.add_argument(
+        "--configs",
+        nargs="+",
+        default=list(EVAL_INDEX_CONFIGS),
+        choices=list(EVAL_INDEX_CONFIGS),
+        help="Index configurations from EVAL_INDEX_CONFIGS.",
+    )
+    parser.add_argument("--k", type=int, default=5, help="Cut-off for recall@k and MRR.")
+    parser.add_argument("--output", default=None, help="Write per-question records (.jsonl or .csv).")
+    parser.add_argument("--summary", default=None, help="Write per strategy x config summaries (.jsonl or .csv).")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    questions = load_labelled_questions(args.questions)
+    embedder = CachedEmbedder(
+        GeminiEmbedder(EMBEDDING_MODEL, api_key=os.environ.get("GOOGLE_API_KEY")),
+        path=EMBEDDING_CACHE_PATH,
+    )
+    kg_querier = KnowledgeGraphQuerier(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
+    entity_extractor = EntityExtractor()
+
+    digest = corpus_digest(CORPUS_PATH)
+    configurations = {}
+    for name in args.configs:
+        factory, params = EVAL_INDEX_CONFIGS[name]
+        configurations[name] = RetrievalBackends(
+            kg_querier=kg_querier,
+            vector_retriever=VectorRetriever(
+                model_name=EMBEDDING_MODEL,
+                faiss_index_path=_index_path(factory, digest),
+                corpus_path=CORPUS_PATH,
+                embedder=embedder,
+                index_factory=factory,
+                index_params=params,
+                collapse_per_entity=COLLAPSE_PASSAGES_PER_ENTITY,
+            ),
+            entity_extractor=entity_extractor,
+        )
+
+    assembler = ContextAssembler(max_tokens=CONTEXT_TOKEN_BUDGET, max_passage_tokens=MAX_PASSAGE_TOKENS)
+    try:
+        records = evaluate_configurations(configurations, questions, args.strategies, assembler, k=args.k)
+    finally:
+        kg_querier.close()
+
+    summaries = summarize(records)
+    if args.output:
+        write_results(records, args.output, record_type=EvalRecord)
+    if args.summary:
+        write_results(summaries, args.summary, record_type=EvalSummary)
+
+    def fmt(value):
+        return "   n/a" if value is None else f"{value:6.3f}"
+
+    print(
+        f"{'strategy':<22}{'config':<14}{'R@k':>7}{'MRR':>7}{'facts':>7}{'ents':>7}{'prec':>7}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'tokens':>8}{'errors':>7}"
+    )
+    for summary in summaries:
+        print(
+            f"{summary.strategy:<22}{summary.config:<14} {fmt(summary.doc_recall_at_k)} {fmt(summary.mrr)}"
+            f" {fmt(summary.fact_recall)} {fmt(summary.entity_recall)} {fmt(summary.context_precision)}"
+            f"{summary.latency_p50_ms:>9.1f}{summary.latency_p95_ms:>9.1f}"
+            f"{summary.mean_prompt_tokens:>8.0f}{summary.errors:>7}"
+        )
+    print(f"\nEmbedding cache: {embedder.hits} hits, {embedder.misses} misses")
+
+
+if __name__ == "__main__":
+    main()
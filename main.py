@@ -1,110 +1,317 @@
+import argparse
 import os
+from pathlib import Path
+
 import google.generativeai as genai
 from config import (
+    ARTIFACT_CHECK_INTERVAL_SECONDS,
+    ARTIFACT_STORE_PATH,
+    ATTRIBUTE_SOURCE_PATH,
+    COLLAPSE_PASSAGES_PER_ENTITY,
+    CONTEXT_TOKEN_BUDGET,
+    CORPUS_PATH,
+    COUNTRY_ATTRIBUTES_PATH,
+    DATASET_SNAPSHOT_PATH,
+    EMBEDDING_BATCH_WINDOW_MS,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_MAX_BATCH_SIZE,
+    EMBEDDING_MAX_CONCURRENCY,
     EMBEDDING_MODEL,
+    EXPERIMENT_MAX_WORKERS,
     FAISS_INDEX_PATH,
+    GEO_DATABASE_PATH,
+    GEMINI_MAX_CONCURRENCY,
+    LLM_CACHE_ENABLED,
+    LLM_CACHE_PATH,
+    LLM_CACHE_TTL_SECONDS,
+    MAX_PASSAGE_TOKENS,
+    METRICS_PORT,
+    NEO4J_MAX_CONCURRENCY,
     NEO4J_PASSWORD,
     NEO4J_URI,
     NEO4J_USERNAME,
+    SEMANTIC_CACHE_ENABLED,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_THRESHOLD,
+    SERVICE_BATCH_WINDOW_MS,
+    SERVICE_HOST,
+    SERVICE_MAX_BATCH_SIZE,
+    SERVICE_MAX_PENDING,
+    SERVICE_PORT,
+    SERVICE_REQUEST_TIMEOUT_SECONDS,
+    TRACE_LOG_PATH,
+)
+from europe_kg_rag.data import ArtifactStore, ArtifactVersion, DatabaseLoader, GraphSnapshot
+from europe_kg_rag.experiments import BatchAnswerer, ConcurrencyLimits, ExperimentRunner, iter_questions
+from europe_kg_rag.generation import (
+    AssembledContext,
+    CachedGenerativeModel,
+    ContextAssembler,
+    LLMResponseCache,
+    SemanticCache,
+    build_answer_prompt,
+    data_version,
+    stream_answer,
 )
-from europe_kg_rag.graph import KnowledgeGraphQuerier
+from europe_kg_rag.graph import KnowledgeGraphQuerier, RiverNetwork
+from europe_kg_rag.observability import enable_tracing, serve_metrics, span, trace_request, tracer
 from europe_kg_rag.retrieval import (
+    AttributeStore,
+    BatchingEmbedder,
+    CachedEmbedder,
     EntityExtractor,
+    GeminiEmbedder,
+    GeoIndex,
+    KG_ROUTE,
+    RetrievalBackends,
     VectorRetriever,
-    entity_driven_retrieval,
-    rank_fusion_retrieval,
+    default_router,
+    run_strategy,
+    strategies,
 )
+from europe_kg_rag.service import QueryService, VersionedBackends, VersionWatcher
 
 genai.configure(api_key=os.environ["GOOGLE_API_KEY"])
 llm = genai.GenerativeModel('models/gemini-2.5-flash')
+if LLM_CACHE_ENABLED:
+    llm = CachedGenerativeModel(llm, LLMResponseCache(LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS))
 
-kg_querier = KnowledgeGraphQuerier(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
-
-vector_retriever = VectorRetriever(
-    model_name=EMBEDDING_MODEL,
-    faiss_index_path=FAISS_INDEX_PATH,
-    corpus_path="data/text_corpus.json"
+# Cached so the semantic cache and vector search share one embedding per question; batched so
+# concurrent questions share one embedding request.
+embedder = BatchingEmbedder(
+    CachedEmbedder(GeminiEmbedder(EMBEDDING_MODEL), path=EMBEDDING_CACHE_PATH),
+    max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+    max_wait=EMBEDDING_BATCH_WINDOW_MS / 1000.0,
 )
 
 entity_extractor = EntityExtractor()
+geo_index = GeoIndex.from_database(GEO_DATABASE_PATH) if GEO_DATABASE_PATH else None
+artifact_store = ArtifactStore(ARTIFACT_STORE_PATH) if ARTIFACT_STORE_PATH else None
+
 
+def load_backends(version: ArtifactVersion | None = None) -> RetrievalBackends:
+    """Backends over one published artifact version, or over the working-tree paths without one."""
+    if version is not None:
+        corpus_path = version.corpus
+        index_path = version.faiss_index or version.path / Path(FAISS_INDEX_PATH).name
+    else:
+        corpus_path, index_path = CORPUS_PATH, FAISS_INDEX_PATH
+    retriever = VectorRetriever(
+        model_name=EMBEDDING_MODEL,
+        faiss_index_path=index_path,
+        corpus_path=corpus_path,
+        embedder=embedder,
+        collapse_per_entity=COLLAPSE_PASSAGES_PER_ENTITY,
+    )
+
+    attribute_store = river_network = None
+    if ATTRIBUTE_SOURCE_PATH:
+        if version is not None and version.snapshot is not None:
+            with GraphSnapshot(version.snapshot) as snapshot:
+                dataset = snapshot.to_dataset()
+        else:
+            dataset = DatabaseLoader(
+                ATTRIBUTE_SOURCE_PATH,
+                country_attributes_path=COUNTRY_ATTRIBUTES_PATH,
+                snapshot_path=DATASET_SNAPSHOT_PATH,
+            ).load()
+        attribute_store = AttributeStore.from_dataset(dataset)
+        river_network = RiverNetwork.from_dataset(dataset)
 
-def generate_answer(context, question):
-    prompt = f"""
-    You are a meticulous and fact-grounded AI assistant. Your task is to answer the user's question with high accuracy and clarity.
+    return RetrievalBackends(
+        kg_querier=KnowledgeGraphQuerier(
+            NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, database=version.graph_database if version else None
+        ),
+        vector_retriever=retriever,
+        entity_extractor=entity_extractor,
+        geo_index=geo_index,
+        attribute_store=attribute_store,
+        river_network=river_network,
+    )
 
-    To do this, you must strictly adhere to the following rules:
-    1.  Synthesize your answer by drawing information from the provided CONTEXT below.
-    2.  Base your entire answer ONLY on the information given in the context. Do not use any external knowledge.
-    3.  If you use a fact from the context, you can optionally cite it (e.g., using [KG] or [Text]).
-    4.  If the provided context is insufficient to answer the question, you must state that clearly.
 
-    --- CONTEXT ---
-    {context}
-    --- END OF CONTEXT ---
+current_version = artifact_store.current() if artifact_store else None
+backends = load_backends(current_version)
+versioned_backends = VersionedBackends(backends, current_version.version if current_version else "")
+kg_querier = backends.kg_querier
+vector_retriever = backends.vector_retriever
+
+context_assembler = ContextAssembler(
+    max_tokens=CONTEXT_TOKEN_BUDGET,
+    max_passage_tokens=MAX_PASSAGE_TOKENS,
+)
 
-    QUESTION:
-    {question}
+semantic_cache = None
+if SEMANTIC_CACHE_ENABLED:
+    semantic_cache = SemanticCache(
+        embedder,
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        max_entries=SEMANTIC_CACHE_MAX_ENTRIES,
+        extractor=entity_extractor,
+        # Serving a published version, only hot swaps change the cache version. Otherwise rebuilding
+        # the corpus, FAISS index or KG source data invalidates cached answers (until a first swap).
+        version=versioned_backends.version,
+        version_source=None
+        if current_version is not None
+        else lambda: data_version([CORPUS_PATH, FAISS_INDEX_PATH, "data/database"]),
+    )
 
-    ANSWER:
-    """
+
+def generate_answer(context, question, bypass_cache=False):
+    if not isinstance(context, AssembledContext):
+        context = context_assembler.assemble_text(context)
+
+    prompt = build_answer_prompt(context.text, question)
     try:
-        response = llm.generate_content(prompt)
-        return response.text
+        with span("generation", context_tokens=context.total_tokens):
+            if isinstance(llm, CachedGenerativeModel):
+                response = llm.generate_content(prompt, bypass_cache=bypass_cache)
+            else:
+                response = llm.generate_content(prompt)
+            return response.text
     except Exception as e:
         return f"Error: {e}"
-    
 
-def retrieve_kg_only(query):
-    facts = []
-    entities = entity_extractor.extract_entities(query)
-    for entity in entities:
-        cypher_query = (
-            "MATCH (e)-[r]-(n) WHERE e.name = $entity RETURN e.name, type(r), n.name"
-        )
-        results = kg_querier.query(cypher_query, {"entity": entity})
-        for result in results:
-            fact = f"[KG] [{result['e.name']}] -[:{result['type(r)']}]-> [{result['n.name']}]"
-            facts.append(fact)
 
-    return "\n".join(facts) if facts else "No specific facts found in KG for extracted entities."
+def generate_answer_stream(context, question):
+    if not isinstance(context, AssembledContext):
+        context = context_assembler.assemble_text(context)
+    return stream_answer(llm, build_answer_prompt(context.text, question))
+
+
+def retrieve_kg_only(query):
+    return strategies.retrieve_kg_only(
+        query,
+        kg_querier,
+        entity_extractor,
+        backends.geo_index,
+        backends.attribute_store,
+        backends.river_network,
+    )
 
 
 def retrieve_text_only(query):
-    retrieved_docs = vector_retriever.retrieve(query, k=5)
-    retrieved_docs = [f"[TEXT] {retrieved_doc['text']}" for retrieved_doc in retrieved_docs]
-    return "\n".join(retrieved_docs)
+    return strategies.retrieve_text_only(query, vector_retriever, k=5)
 
 
 def retrieve_hybrid_naive(query):
-    kg_facts = retrieve_kg_only(query)
-    text_facts = retrieve_text_only(query)
+    return strategies.retrieve_hybrid_naive(query, kg_querier, vector_retriever, entity_extractor)
 
-    return f"--- Knowledge Graph Facts ---\n{kg_facts}\n\n--- Related Descriptions ---\n{text_facts}"
 
+def run_experiment(model_name, question, stream=False):
+    with trace_request() as trace_id:
+        _run_experiment(model_name, question, stream, trace_id)
 
-def run_experiment(model_name, question):
+
+def _run_experiment(model_name, question, stream, trace_id):
     print(f"\n{'='*20} RUNNING EXPERIMENT: {model_name} {'='*20}\n")
     print(f"QUESTION: {question}")
+    if tracer.enabled:
+        print(f"TRACE ID: {trace_id}")
     print(f"{'-'*50}")
 
-    context = ""
-    if model_name == 'KG-Only':
-        context = retrieve_kg_only(question)
-    elif model_name == 'Text-Only':
-        context = retrieve_text_only(question)
-    elif model_name == 'Hybrid-Naive':
-        context = retrieve_hybrid_naive(question)
-    elif model_name == 'Entity-Driven':
-        context = entity_driven_retrieval(question, kg_querier, vector_retriever, entity_extractor)
-    elif model_name == 'Hybrid-Fusion':
-        context = rank_fusion_retrieval(question, kg_querier, vector_retriever, entity_extractor)
+    # Route before consulting the cache: KG-only questions skip it, since a lookup embeds the question.
+    decision = default_router.route(question, entity_extractor) if model_name == "Auto" else None
+    route = decision.strategy if decision is not None else model_name
+    use_cache = semantic_cache is not None and route != KG_ROUTE
+    entities = decision.entities if decision is not None else None
+    hit = None
+    if use_cache:
+        hit = semantic_cache.lookup(question, model_name, need_answer=True, entities=entities)
+    if hit is not None:
+        print(f"SEMANTIC CACHE HIT ({hit.similarity:.3f}): {hit.entry.question}")
+        print(f"--- RETRIEVED CONTEXT ---\n{hit.entry.context}\n{'-'*50}")
+        print(f"ANSWER: {hit.entry.answer}\n{'=-'*60}\n")
+        return
+
+    context = run_strategy(model_name, question, backends, decision=decision)
+
+    assembled = context_assembler.assemble_text(context)
+    print(f"--- RETRIEVED CONTEXT ---\n{assembled.text}\n{'-'*50}")
+    print(f"CONTEXT TOKENS: {assembled.usage_summary()}")
+    if not stream:
+        answer = generate_answer(assembled, question)
+        if use_cache and not answer.startswith("Error:"):
+            semantic_cache.store(question, model_name, assembled.text, answer, entities=entities)
+        print(f"ANSWER: {answer}\n{'=-'*60}\n")
+        return
+
+    answer_stream = generate_answer_stream(assembled, question)
+    print("ANSWER: ", end="", flush=True)
+    try:
+        for chunk in answer_stream:
+            print(chunk, end="", flush=True)
+    except Exception as e:
+        print(f"Error: {e}", end="")
     else:
-        raise ValueError(f"Unknown model name: {model_name}")
+        if use_cache:
+            semantic_cache.store(question, model_name, assembled.text, answer_stream.text, entities=entities)
+    stats = answer_stream.stats
+    ttft = f"{stats.time_to_first_token:.2f}s" if stats.time_to_first_token is not None else "n/a"
+    print(f"\n(first token {ttft}, {stats.tokens_per_second:.1f} tokens/s)\n{'=-'*60}\n")
+
 
-    print(f"--- RETRIEVED CONTEXT ---\n{context}\n{'-'*50}")
-    answer = generate_answer(context, question)
-    print(f"ANSWER: {answer}\n{'=-'*60}\n")
+def _load_questions(path: str) -> list:
+    """Questions from a JSONL file (``{"question": ...}`` per line) or a text file (one per line)."""
+    if path.endswith(".jsonl"):
+        return [question.question for question, _ in iter_questions(path) if question is not None]
+    with open(path, "r", encoding="utf-8") as handle:
+        return [line.strip() for line in handle if line.strip()]
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Run the retrieval strategy experiments.")
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="Write results to this .jsonl/.csv file using the parallel runner instead of printing.",
+    )
+    parser.add_argument(
+        "--questions",
+        default=None,
+        help="Questions for the experiment grid (.jsonl with a \"question\" field, or one per line) "
+        "instead of the built-in samples.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=EXPERIMENT_MAX_WORKERS,
+        help="Worker threads for the parallel runner.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print answers incrementally as they are generated.",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help=f"Record per-stage spans to {TRACE_LOG_PATH} and serve /metrics on port {METRICS_PORT}.",
+    )
+    parser.add_argument(
+        "--input",
+        default=None,
+        help="Answer questions streamed from this JSONL file (one {\"id\", \"question\"} object per line).",
+    )
+    parser.add_argument(
+        "--strategy",
+        default="Auto",
+        help="Retrieval strategy used in --input batch mode.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=16,
+        help="Questions per batched embedding/KG lookup in --input batch mode.",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the HTTP query service (/retrieve, /answer, /health, /metrics) instead of the experiments.",
+    )
+    parser.add_argument("--host", default=SERVICE_HOST, help="Bind address for --serve.")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help="Port for --serve.")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
@@ -119,11 +326,77 @@ if __name__ == "__main__":
         "Text-Only",
         "Hybrid-Naive",
         "Entity-Driven",
-        "Hybrid-Fusion"
+        "Hybrid-Fusion",
+        "Auto"
     ]
 
-    for question in test_question:
-        for model in models_to_test:
-            run_experiment(model, question)
+    args = _parse_args()
+    if args.questions:
+        test_question = _load_questions(args.questions)
+    if args.trace:
+        enable_tracing(TRACE_LOG_PATH)
+        serve_metrics(METRICS_PORT)
+    if args.serve:
+        service = QueryService(
+            versioned_backends,
+            generate_answer,
+            assembler=context_assembler,
+            max_batch_size=SERVICE_MAX_BATCH_SIZE,
+            batch_window=SERVICE_BATCH_WINDOW_MS / 1000.0,
+            max_pending=SERVICE_MAX_PENDING,
+            request_timeout=SERVICE_REQUEST_TIMEOUT_SECONDS,
+            generation_workers=GEMINI_MAX_CONCURRENCY,
+            semantic_cache=semantic_cache,
+        )
+        watcher = None
+        if artifact_store is not None:
+            watcher = VersionWatcher(
+                artifact_store, versioned_backends, load_backends, interval=ARTIFACT_CHECK_INTERVAL_SECONDS
+            )
+            watcher.start()
+        try:
+            service.serve_forever(args.host, args.port)
+        finally:
+            if watcher is not None:
+                watcher.stop()
+    elif args.input:
+        answerer = BatchAnswerer(
+            backends,
+            generate_answer,
+            args.strategy,
+            assembler=context_assembler,
+            batch_size=args.batch_size,
+            generation_workers=GEMINI_MAX_CONCURRENCY,
+        )
+        output_path = args.output or f"{args.input}.answers.jsonl"
+        written = answerer.run(args.input, output_path)
+        print(f"Wrote {written} answers to {output_path}")
+    elif args.output:
+        runner = ExperimentRunner(
+            backends,
+            generate_answer,
+            limits=ConcurrencyLimits(
+                gemini=GEMINI_MAX_CONCURRENCY,
+                embeddings=EMBEDDING_MAX_CONCURRENCY,
+                neo4j=NEO4J_MAX_CONCURRENCY,
+            ),
+            max_workers=args.workers,
+            assembler=context_assembler,
+        )
+        written = runner.run_to_file(test_question, models_to_test, args.output)
+        print(f"Wrote {written} results to {args.output}")
+    else:
+        for question in test_question:
+            for model in models_to_test:
+                run_experiment(model, question, stream=args.stream)
+
+    if default_router.decisions:
+        print(f"ROUTING: {default_router.summary()}")
+    if tracer.enabled:
+        for stage, stats in tracer.summary().items():
+            print(
+                f"{stage:<24} n={stats['count']:<5} p50={stats['p50'] * 1000:.1f}ms "
+                f"p95={stats['p95'] * 1000:.1f}ms p99={stats['p99'] * 1000:.1f}ms"
+            )
 
-    kg_querier.close()
+    versioned_backends.backends.kg_querier.close()
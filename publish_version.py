@@ -0,0 +1,78 @@
+"""
+Publish the serving artifacts (corpus, FAISS index, graph snapshot) as a new immutable version:
+
+    python publish_version.py                              # publish and activate
+    python publish_version.py --graph-database europe-v2   # also build the graph into its own database
+    python publish_version.py --no-activate                # stage only; activate later with --activate ID
+
+Services started with ``ARTIFACT_STORE_PATH`` set (``python main.py --serve``) load the activated
+version in the background and swap to it without a restart.
+"""
+
+import argparse
+
+from config import (
+    ARTIFACT_KEEP_VERSIONS,
+    ARTIFACT_STORE_PATH,
+    CORPUS_PATH,
+    COUNTRY_ATTRIBUTES_PATH,
+    DATASET_SNAPSHOT_PATH,
+    FAISS_INDEX_PATH,
+    GRAPH_SOURCE_PATH,
+)
+from europe_kg_rag.data import ArtifactStore, DatabaseLoader
+
+
+def publish(graph_database: str | None = None, activate: bool = True, keep: int = ARTIFACT_KEEP_VERSIONS):
+    if graph_database:
+        # Imported here: only this option needs a running Neo4j server.
+        from setup_neo4j_kg import rebuild_europe_graph
+
+        rebuild_europe_graph(database=graph_database)
+    # Refreshes the dataset snapshot if the graph sources changed since it was written.
+    DatabaseLoader(
+        GRAPH_SOURCE_PATH,
+        country_attributes_path=COUNTRY_ATTRIBUTES_PATH,
+        snapshot_path=DATASET_SNAPSHOT_PATH,
+    ).load()
+    store = ArtifactStore(ARTIFACT_STORE_PATH)
+    version = store.publish(
+        CORPUS_PATH,
+        faiss_index=FAISS_INDEX_PATH,
+        snapshot=DATASET_SNAPSHOT_PATH,
+        graph_database=graph_database,
+        activate=activate,
+    )
+    removed = store.prune(keep) if keep else []
+    state = "active" if activate else "staged"
+    print(f"Published version {version.version} ({state}) in {version.path}")
+    if removed:
+        print(f"Pruned old versions: {', '.join(removed)}")
+    return version
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Publish the corpus, FAISS index and graph snapshot.")
+    parser.add_argument(
+        "--graph-database",
+        default=None,
+        help="Build the Neo4j graph into this database first and record it in the version.",
+    )
+    parser.add_argument("--no-activate", action="store_true", help="Publish without switching to it.")
+    parser.add_argument("--activate", metavar="VERSION", help="Only switch the active version to VERSION.")
+    parser.add_argument(
+        "--keep",
+        type=int,
+        default=ARTIFACT_KEEP_VERSIONS,
+        help="Versions to keep on disk (the active one is never removed; 0 keeps all).",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.activate:
+        ArtifactStore(ARTIFACT_STORE_PATH).activate(args.activate)
+        print(f"Activated version {args.activate}")
+    else:
+        publish(args.graph_database, activate=not args.no_activate, keep=args.keep)
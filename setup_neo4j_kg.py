@@ -1,16 +1,37 @@
 """
 Utility entry point for (re)building the Europe knowledge graph in Neo4j.
+
+    python setup_neo4j_kg.py                       # rebuild the default database in place
+    python setup_neo4j_kg.py --database europe-v2  # build a separate database, leaving the live one serving
+
+Pair ``--database`` with ``publish_version.py --graph-database`` to swap graphs without downtime.
 """
 
-from config import NEO4J_PASSWORD, NEO4J_URI, NEO4J_USERNAME
+import argparse
+from typing import Optional
+
+from config import (
+    COUNTRY_ATTRIBUTES_PATH,
+    DATASET_SNAPSHOT_PATH,
+    GRAPH_SOURCE_PATH,
+    NEO4J_PASSWORD,
+    NEO4J_URI,
+    NEO4J_USERNAME,
+)
 from europe_kg_rag.data import DatabaseLoader
 from europe_kg_rag.graph import KnowledgeGraphBuilder
 
 
-def rebuild_europe_graph(clear_existing: bool = True) -> None:
-    loader = DatabaseLoader()
-    builder = KnowledgeGraphBuilder(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD)
+def rebuild_europe_graph(clear_existing: bool = True, database: Optional[str] = None) -> None:
+    loader = DatabaseLoader(
+        GRAPH_SOURCE_PATH,
+        country_attributes_path=COUNTRY_ATTRIBUTES_PATH,
+        snapshot_path=DATASET_SNAPSHOT_PATH,
+    )
+    builder = KnowledgeGraphBuilder(NEO4J_URI, NEO4J_USERNAME, NEO4J_PASSWORD, database=database)
     try:
+        if database:
+            builder.create_database()
         if clear_existing:
             builder.clear_database()
         builder.build_from_loader(loader)
@@ -18,5 +39,21 @@ def rebuild_europe_graph(clear_existing: bool = True) -> None:
         builder.close()
 
 
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Rebuild the Europe knowledge graph in Neo4j.")
+    parser.add_argument(
+        "--database",
+        default=None,
+        help="Build into this Neo4j database (created if missing) instead of the default one.",
+    )
+    parser.add_argument(
+        "--keep-existing",
+        action="store_true",
+        help="Merge into the existing graph instead of clearing it first.",
+    )
+    return parser.parse_args()
+
+
 if __name__ == "__main__":
-    rebuild_europe_graph()
+    args = _parse_args()
+    rebuild_europe_graph(clear_existing=not args.keep_existing, database=args.database)